@@ -13,6 +13,9 @@ from .models.core_models import (
     Portefeuille, Transaction, DocumentVerification, LoueurProfile
 )
 from .models.delivery_models import DeliveryOption, DeliveryRequest
+from .models.webhook_models import EvenementWebhook
+from .models.currency_models import CurrencyRateHistory
+from .models.payout_models import LotVirement, Virement
 from location.notifications.models import Notification
 
 # Configuration de base
@@ -507,7 +510,7 @@ class PortefeuilleAdmin(admin.ModelAdmin):
     solde_display.short_description = "Solde"
 
     def transaction_history(self, obj):
-        transactions = obj.transactions.all().order_by('-date')[:5]
+        transactions = obj.transactions.all().order_by('-date_creation', '-id')[:5]
         if not transactions:
             return "Aucune transaction"
         
@@ -516,7 +519,7 @@ class PortefeuilleAdmin(admin.ModelAdmin):
             color = 'green' if t.montant >= 0 else 'red'
             rows.append(f"""
                 <tr>
-                    <td>{t.date.strftime('%d/%m/%Y %H:%M')}</td>
+                    <td>{t.date_creation.strftime('%d/%m/%Y %H:%M')}</td>
                     <td>{t.get_type_transaction_display()}</td>
                     <td style="color:{color}">{t.montant:.2f} XOF</td>
                     <td>{t.get_statut_display()}</td>
@@ -570,8 +573,25 @@ class TransactionAdmin(admin.ModelAdmin):
     readonly_fields = (
         'date_creation', 
         'date_mise_a_jour',
-        'metadata_preview'  # Ajout du champ readonly personnalisé
+        'metadata_preview',  # Ajout du champ readonly personnalisé
+        # Tenus par WalletService : une validation passe par les actions ci-dessous
+        'statut',
+        'traite_par',
+        'date_traitement',
+        'numero',
+        'solde_apres'
+    )
+    # Figés une fois la transaction créée
+    champs_operation = (
+        'user',
+        'portefeuille',
+        'montant',
+        'currency',
+        'type_transaction',
+        'payment_method',
+        'reference'
     )
+    actions = ['valider_transactions', 'rejeter_transactions']
     
     fieldsets = (
         (None, {
@@ -588,7 +608,8 @@ class TransactionAdmin(admin.ModelAdmin):
                 'statut',
                 'motif_rejet',
                 'traite_par',
-                'date_traitement'
+                'date_traitement',
+                ('numero', 'solde_apres')
             )
         }),
         ('Dates', {
@@ -628,6 +649,44 @@ class TransactionAdmin(admin.ModelAdmin):
         )
     metadata_preview.short_description = "Aperçu des métadonnées"
 
+    def get_readonly_fields(self, request, obj=None):
+        readonly = super().get_readonly_fields(request, obj)
+        if obj is not None:
+            readonly += self.champs_operation
+        return readonly
+
+    def has_change_permission(self, request, obj=None):
+        """Une écriture du journal (numérotée) ne se modifie plus"""
+        if obj is not None and obj.numero is not None:
+            return False
+        return super().has_change_permission(request, obj)
+
+    @admin.action(description="Valider les transactions en attente (hors retraits)", permissions=['change'])
+    def valider_transactions(self, request, queryset):
+        """Inscrit au journal via WalletService ; un retrait est versé par PayoutService"""
+        from location.services.wallet_service import WalletService
+        valides, erreurs = 0, 0
+        a_valider = queryset.filter(statut='en_attente', portefeuille__isnull=False).exclude(type_transaction='retrait')
+        for operation in a_valider.select_related('portefeuille'):
+            try:
+                WalletService.appliquer(operation, request.user)
+                valides += 1
+            except ValueError:
+                erreurs += 1
+        self.message_user(request, f"{valides} transaction(s) validée(s), {erreurs} en erreur")
+
+    @admin.action(description="Rejeter les transactions en attente", permissions=['change'])
+    def rejeter_transactions(self, request, queryset):
+        from location.services.wallet_service import WalletService
+        rejetees = 0
+        for operation in queryset.filter(statut='en_attente'):
+            try:
+                WalletService.rejeter(operation, request.user, "Rejetée depuis l'administration")
+                rejetees += 1
+            except ValueError:
+                pass
+        self.message_user(request, f"{rejetees} transaction(s) rejetée(s)")
+
     def get_fieldsets(self, request, obj=None):
         """Cache le champ metadata brut si en mode visualisation"""
         fieldsets = super().get_fieldsets(request, obj)
@@ -662,3 +721,61 @@ class DeliveryRequestAdmin(admin.ModelAdmin):
     
     
 
+# Configuration Webhooks de paiement
+@admin.register(EvenementWebhook)
+class EvenementWebhookAdmin(admin.ModelAdmin):
+    list_display = ('fournisseur', 'event_id', 'transaction_id', 'type_evenement', 'statut', 'tentatives', 'date_reception')
+    list_filter = ('fournisseur', 'statut')
+    search_fields = ('event_id', 'transaction_id')
+    readonly_fields = ('payload', 'en_tetes', 'erreur', 'date_reception', 'date_traitement')
+    date_hierarchy = 'date_reception'
+
+
+# Historique des taux de change
+@admin.register(CurrencyRateHistory)
+class CurrencyRateHistoryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'source', 'rates')
+    list_filter = ('source',)
+    readonly_fields = ('date', 'rates', 'source')
+    date_hierarchy = 'date'
+
+
+# Versements des retraits (PayoutService) : en lecture seule, l'état est tenu par le service
+@admin.register(LotVirement)
+class LotVirementAdmin(admin.ModelAdmin):
+    list_display = ('id', 'fournisseur', 'statut', 'nb_virements', 'montant_total', 'date_creation', 'date_fin')
+    list_filter = ('fournisseur', 'statut')
+    readonly_fields = ('fournisseur', 'statut', 'nb_virements', 'montant_total', 'date_creation', 'date_fin')
+    date_hierarchy = 'date_creation'
+    actions = ['relancer_virements']
+
+    def has_add_permission(self, request):
+        return False
+
+    def relancer_virements(self, request, queryset):
+        from location.tasks.payout_tasks import executer_virements
+        executer_virements.delay()
+        self.message_user(request, "Versement des lots en attente relancé")
+    relancer_virements.short_description = "Relancer les virements en attente"
+
+
+@admin.register(Virement)
+class VirementAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'lot', 'destinataire', 'montant', 'statut', 'tentatives', 'notifie', 'date_envoi')
+    list_filter = ('statut', 'lot__fournisseur', 'notifie')
+    search_fields = ('reference', 'reference_fournisseur', 'destinataire', 'transaction__reference')
+    raw_id_fields = ('lot', 'transaction')
+    readonly_fields = (
+        'lot', 'transaction', 'montant', 'destinataire', 'reference', 'reference_fournisseur',
+        'statut', 'tentatives', 'erreur', 'notifie', 'date_envoi'
+    )
+    actions = ['renvoyer_virements']
+
+    def has_add_permission(self, request):
+        return False
+
+    def renvoyer_virements(self, request, queryset):
+        from location.services.payout_service import PayoutService
+        renvoyes = PayoutService.renvoyer(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f"{renvoyes} virement(s) à vérifier remis à envoyer (même référence)")
+    renvoyer_virements.short_description = "Renvoyer les virements à vérifier"
@@ -1,8 +1,17 @@
 # location/api.py
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from datetime import datetime
+from django.contrib.admin.views.decorators import staff_member_required
+from datetime import date, datetime
 from .models import Voiture
+from .payments.http_client import ProviderClient
+from .services.availability_service import AvailabilityService
+from .services.calendar_service import CalendarService
+from .services.listing_cache_service import ListingCacheService
+
+# Limites de l'endpoint groupé (une requête SQL, un EXISTS par période)
+MAX_VOITURES_PAR_REQUETE = 100
+MAX_PERIODES_PAR_REQUETE = 12
 
 def check_disponibilite(request, pk):
     """
@@ -53,3 +62,131 @@ def check_disponibilite(request, pk):
             status=400
         )
 
+
+def _parse_periodes(request):
+    """
+    Périodes demandées : ?periode=YYYY-MM-DD:YYYY-MM-DD (répétable)
+    ou, pour une seule période, ?date_debut=...&date_fin=...
+    """
+    brutes = request.GET.getlist('periode')
+    if not brutes and request.GET.get('date_debut') and request.GET.get('date_fin'):
+        brutes = [f"{request.GET['date_debut']}:{request.GET['date_fin']}"]
+    if not brutes:
+        raise ValueError("Au moins une période est requise (periode=YYYY-MM-DD:YYYY-MM-DD)")
+    if len(brutes) > MAX_PERIODES_PAR_REQUETE:
+        raise ValueError(f"{MAX_PERIODES_PAR_REQUETE} périodes maximum par requête")
+
+    periodes = []
+    for brute in brutes:
+        try:
+            debut, fin = brute.split(':')
+            debut = datetime.strptime(debut, '%Y-%m-%d').date()
+            fin = datetime.strptime(fin, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(f"Période invalide '{brute}'. Utilisez YYYY-MM-DD:YYYY-MM-DD")
+        if fin <= debut:
+            raise ValueError(f"La date de fin doit être après la date de début ({brute})")
+        periodes.append((debut, fin))
+    return periodes
+
+
+def check_disponibilites(request):
+    """
+    Disponibilité de plusieurs voitures sur une ou plusieurs périodes
+    URL: /api/voitures/disponibilites/?ids=1,2,3&periode=YYYY-MM-DD:YYYY-MM-DD[&periode=...]
+    Sans `ids`, les voitures sont sélectionnées avec les filtres de la recherche
+    (ville, lat/lon/rayon, prix_min, q, ...).
+    """
+    try:
+        periodes = _parse_periodes(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    ids = [i for chunk in request.GET.getlist('ids') for i in chunk.split(',') if i.strip()]
+    if ids:
+        try:
+            ids = list(dict.fromkeys(int(i) for i in ids))
+        except ValueError:
+            return JsonResponse({'error': 'Identifiants de voiture invalides'}, status=400)
+        if len(ids) > MAX_VOITURES_PAR_REQUETE:
+            return JsonResponse(
+                {'error': f'{MAX_VOITURES_PAR_REQUETE} voitures maximum par requête'},
+                status=400
+            )
+        queryset = Voiture.objects.filter(id__in=ids)
+    else:
+        from .views.voiture_views import RechercheVoitures
+        recherche = RechercheVoitures()
+        recherche.setup(request)
+        ids = list(recherche.get_queryset().values_list('id', flat=True)[:MAX_VOITURES_PAR_REQUETE])
+        queryset = Voiture.objects.filter(id__in=ids)
+
+    resultats = AvailabilityService.disponibilites(queryset, periodes)
+
+    return JsonResponse({
+        'periodes': [
+            {'debut': debut.strftime('%Y-%m-%d'), 'fin': fin.strftime('%Y-%m-%d')}
+            for debut, fin in periodes
+        ],
+        'voitures': [
+            {
+                'id': voiture_id,
+                'nom': resultats[voiture_id]['nom'],
+                'disponibilites': resultats[voiture_id]['disponibilites'],
+                'disponible': all(resultats[voiture_id]['disponibilites']),
+            }
+            for voiture_id in ids if voiture_id in resultats
+        ]
+    })
+
+
+def calendrier_disponibilite(request, pk):
+    """
+    Calendrier de disponibilité par mois (bit n-1 à 1 = jour n occupé)
+    URL: /api/voiture/<id>/calendrier/?debut=YYYY-MM&mois=12
+    """
+    voiture = get_object_or_404(Voiture, pk=pk)
+    try:
+        debut = request.GET.get('debut')
+        debut = datetime.strptime(debut, '%Y-%m').date() if debut else datetime.now().date()
+        nombre = int(request.GET.get('mois', 12))
+    except ValueError:
+        return JsonResponse(
+            {'error': 'Paramètres invalides. Utilisez debut=YYYY-MM et mois=<nombre>'},
+            status=400
+        )
+    if not 1 <= nombre <= CalendarService.MAX_MOIS:
+        return JsonResponse(
+            {'error': f'Le nombre de mois doit être compris entre 1 et {CalendarService.MAX_MOIS}'},
+            status=400
+        )
+    # Le premier jour du mois suivant la période doit rester une date valide
+    if debut.year * 12 + debut.month - 1 + nombre > date.max.year * 12 + date.max.month - 1:
+        return JsonResponse({'error': 'Période hors limites'}, status=400)
+
+    return JsonResponse({
+        'voiture': {
+            'id': voiture.id,
+            'nom': f"{voiture.marque} {voiture.modele}",
+            'disponible': voiture.disponible
+        },
+        'mois': CalendarService.bitmaps(voiture.id, debut.year, debut.month, nombre)
+    })
+
+
+@staff_member_required
+def listing_cache_stats(request):
+    """
+    Compteurs hit/miss du cache des pages de résultats
+    URL: /api/cache/listing/
+    """
+    return JsonResponse(ListingCacheService.stats())
+
+
+@staff_member_required
+def provider_http_stats(request):
+    """
+    Appels, échecs, latence moyenne et état du circuit par fournisseur de paiement
+    URL: /api/paiements/fournisseurs/
+    """
+    return JsonResponse(ProviderClient.metriques())
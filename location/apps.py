@@ -30,7 +30,10 @@ class LocationConfig(AppConfig):
         """Initialisation différée après chargement complet"""
         # Enregistrement des checks système
         register(check_configuration, Tags.compatibility)
-        
+
+        # Agrégats de notes : tenus dans tous les processus (commandes de gestion comprises)
+        from .signals import rating_signals  # noqa: F401
+
         if self._should_initialize():
             # Double stratégie pour couvrir tous les cas
             autoreload_started.connect(self._delayed_init)
@@ -94,6 +97,8 @@ class LocationConfig(AppConfig):
             'policy_signals': None,
             'portefeuille_signals': None,
             'reservation_signals': None,
+            'listing_cache_signals': None,
+            'calendar_signals': None,
             'messaging_signals': {
                 'connect_func': 'connect_messaging_signals',
                 'verify_model': 'location.Message'
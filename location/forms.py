@@ -616,6 +616,15 @@ class AdvancedSearchForm(forms.Form):
         required=False,
         label='Avec climatisation'
     )
+    tri = forms.ChoiceField(
+        choices=[('', 'Prix journalier'), ('prix_total', 'Total du séjour')],
+        required=False,
+        label='Trier par'
+    )
+    avec_chauffeur = forms.BooleanField(
+        required=False,
+        label='Avec chauffeur'
+    )
 
 class DemandeRetraitForm(forms.Form):
     montant = forms.DecimalField(
@@ -624,10 +633,20 @@ class DemandeRetraitForm(forms.Form):
         validators=[MinValueValidator(Decimal('10.00'))],  # Minimum 10€
         label="Montant à retirer"
     )
+    methode = forms.ChoiceField(
+        choices=[('orange', 'Orange Money'), ('wave', 'Wave')],
+        label="Versement sur"
+    )
+    telephone = forms.CharField(
+        max_length=20,
+        validators=[PHONE_VALIDATOR],
+        label="Numéro du compte mobile money"
+    )
     
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user')
         super().__init__(*args, **kwargs)
+        self.fields['telephone'].initial = self.user.phone
     
     def clean_montant(self):
         montant = self.cleaned_data['montant']
@@ -0,0 +1,126 @@
+"""
+Outils géographiques sans service externe : geohash, distance haversine et
+normalisation des noms de ville pour le gazetteer local.
+"""
+import json
+import math
+import unicodedata
+from pathlib import Path
+
+EARTH_RADIUS_KM = 6371.0
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_BASE32_INDEX = {c: i for i, c in enumerate(_BASE32)}
+
+# Dimensions approximatives (largeur, hauteur) d'une cellule par précision, en km
+_CELL_SIZE_KM = {
+    1: (5009.4, 4992.6),
+    2: (1252.3, 624.1),
+    3: (156.5, 156.0),
+    4: (39.1, 19.5),
+    5: (4.89, 4.87),
+    6: (1.22, 0.61),
+    7: (0.153, 0.152),
+}
+
+GEOHASH_PRECISION = 9
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def geohash_bbox(geohash):
+    """Retourne (lat_min, lat_max, lon_min, lon_max) de la cellule"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbors(geohash):
+    """La cellule et ses 8 voisines (même précision)"""
+    lat_min, lat_max, lon_min, lon_max = geohash_bbox(geohash)
+    lat_step, lon_step = lat_max - lat_min, lon_max - lon_min
+    lat_center, lon_center = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+    cells = set()
+    for dlat in (-1, 0, 1):
+        for dlon in (-1, 0, 1):
+            lat = max(-89.999999, min(89.999999, lat_center + dlat * lat_step))
+            lon = (lon_center + dlon * lon_step + 180) % 360 - 180
+            cells.add(geohash_encode(lat, lon, len(geohash)))
+    return sorted(cells)
+
+
+def precision_for_radius(radius_km):
+    """Précision la plus fine dont les cellules couvrent le rayon (avec les voisines)"""
+    best = 1
+    for precision, (width, height) in sorted(_CELL_SIZE_KM.items()):
+        if min(width, height) >= radius_km:
+            best = precision
+    return best
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Préfixes geohash dont l'union contient le cercle (centre, rayon)"""
+    precision = precision_for_radius(radius_km)
+    return geohash_neighbors(geohash_encode(latitude, longitude, precision))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def normalize_place_name(name):
+    """'San-Pédro ' -> 'san pedro'"""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    for separator in ("-", "'", "’", "_", ","):
+        name = name.replace(separator, ' ')
+    return ' '.join(name.lower().split())
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'villes_ci.json'
+
+
+def read_gazetteer(path=GAZETTEER_PATH):
+    """Lignes du jeu de villes embarqué, avec nom normalisé et geohash calculés"""
+    with open(path, encoding='utf-8') as f:
+        rows = json.load(f)
+    for row in rows:
+        row['nom_normalise'] = normalize_place_name(row['nom'])
+        row['alias'] = [normalize_place_name(a) for a in row.get('alias', [])]
+        row['geohash'] = geohash_encode(row['latitude'], row['longitude'])
+    return rows
@@ -0,0 +1,71 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from location.models import Voiture
+from location.services.quote_service import QuoteService
+
+
+class Command(BaseCommand):
+    help = "Mesure le devis vectorisé (NumPy) d'un ensemble de voitures face à une boucle Python"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voitures', type=int, default=10000,
+                            help="Nombre de voitures synthétiques")
+        parser.add_argument('--jours', type=int, default=30,
+                            help="Durée du séjour en jours")
+        parser.add_argument('--repetitions', type=int, default=5,
+                            help="Nombre d'exécutions par mesure")
+        parser.add_argument('--base', action='store_true',
+                            help="Mesurer aussi devis_queryset sur les véhicules disponibles en base")
+
+    def handle(self, *args, **options):
+        nombre, jours = options['voitures'], options['jours']
+        date_debut = date(date.today().year, 6, 15)  # À cheval sur la haute saison
+        date_fin = date_debut + timedelta(days=jours)
+
+        prix_jour = [random.randint(10, 150) * 1000 for _ in range(nombre)]
+        prix_chauffeur = [random.choice([0, 10000, 15000]) for _ in range(nombre)]
+
+        vectorise = self._mesurer(
+            lambda: QuoteService.calculer(prix_jour, prix_chauffeur, date_debut, date_fin),
+            options['repetitions']
+        )
+        boucle = self._mesurer(
+            lambda: [self._devis_python(p, c, date_debut, date_fin) for p, c in zip(prix_jour, prix_chauffeur)],
+            options['repetitions']
+        )
+        self.stdout.write(f"{nombre} voitures x {jours} jours")
+        self.stdout.write(f"{'NumPy (ms)':<20}{vectorise:>10.2f}")
+        self.stdout.write(f"{'boucle Python (ms)':<20}{boucle:>10.2f}")
+
+        if options['base']:
+            queryset = Voiture.objects.filter(disponible=True)
+            en_base = self._mesurer(
+                lambda: QuoteService.trier_par_total(queryset, date_debut, date_fin),
+                options['repetitions']
+            )
+            self.stdout.write(f"{'tri en base (ms)':<20}{en_base:>10.2f}  ({queryset.count()} véhicules)")
+
+    @staticmethod
+    def _devis_python(prix, chauffeur, date_debut, date_fin):
+        """Référence jour par jour, comme get_prix_dynamique"""
+        base = Decimal(0)
+        jour = date_debut
+        while jour < date_fin:
+            majoration = Voiture.MAJORATION_HAUTE_SAISON if jour.month in Voiture.MOIS_HAUTE_SAISON else 1
+            base += prix * majoration
+            jour += timedelta(days=1)
+        base = round(base)
+        montant_chauffeur = chauffeur * (date_fin - date_debut).days
+        return base + montant_chauffeur + round((base + montant_chauffeur) * QuoteService.FRAIS_SERVICE)
+
+    def _mesurer(self, fonction, repetitions):
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            durees.append((time.perf_counter() - debut) * 1000)
+        return statistics.median(durees)
@@ -0,0 +1,38 @@
+import random
+import timeit
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from location.services.currency_service import CurrencyService
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût d'une conversion de devise (table de taux en mémoire) et de convert_many"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversions', type=int, default=200000,
+                            help="Nombre de conversions unitaires mesurées")
+        parser.add_argument('--lot', type=int, default=10000,
+                            help="Taille du lot passé à convert_many")
+
+    def handle(self, *args, **options):
+        CurrencyService.table()  # Chargement initial hors mesure
+        montants = [Decimal(random.randint(10, 150) * 1000) for _ in range(options['lot'])]
+        montant = montants[0]
+
+        nombre = options['conversions']
+        unitaire = min(timeit.repeat(
+            lambda: CurrencyService.convert(montant, 'XOF', 'EUR'), number=nombre, repeat=3
+        )) / nombre
+        brut = min(timeit.repeat(
+            lambda: CurrencyService.convert(montant, 'XOF', 'EUR', round_result=False), number=nombre, repeat=3
+        )) / nombre
+        lot = min(timeit.repeat(
+            lambda: CurrencyService.convert_many(montants, 'XOF', 'EUR'), number=10, repeat=3
+        )) / 10
+
+        self.stdout.write(f"Taux du {CurrencyService.table().date}")
+        self.stdout.write(f"convert (arrondi)      : {unitaire * 1e9:.0f} ns/conversion")
+        self.stdout.write(f"convert (sans arrondi) : {brut * 1e9:.0f} ns/conversion")
+        self.stdout.write(
+            f"convert_many ({len(montants)}) : {lot * 1e3:.2f} ms, {lot / len(montants) * 1e9:.0f} ns/montant"
+        )
@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from location.models import Voiture
+from location.services.search_service import VoitureSearchService
+
+MARQUES = {
+    'Toyota': ['Corolla', 'Yaris', 'RAV4', 'Land Cruiser', 'Hilux'],
+    'Peugeot': ['208', '308', '3008', '508', 'Partner'],
+    'Renault': ['Clio', 'Megane', 'Duster', 'Kangoo', 'Captur'],
+    'Hyundai': ['Tucson', 'Santa Fe', 'i10', 'Accent', 'Elantra'],
+    'Mercedes': ['Classe C', 'Classe E', 'GLE', 'Sprinter', 'Vito'],
+    'Kia': ['Picanto', 'Sportage', 'Rio', 'Sorento', 'Cerato'],
+}
+
+DESCRIPTIONS = [
+    "Véhicule climatisé, entretien régulier, idéal pour la ville",
+    "Parfait pour les longs trajets vers Yamoussoukro ou San Pedro",
+    "Boîte automatique, sièges en cuir, GPS intégré",
+    "Confortable et économique, faible consommation",
+    "Grand coffre, adapté aux familles et aux bagages",
+]
+
+REQUETES = ['Toyota', 'Toyta', 'corolla', 'Peugeot 3008', 'climatisé', 'Mercedez', 'familles']
+
+
+class Command(BaseCommand):
+    help = "Compare la recherche plein texte/trigramme au chemin icontains historique"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Nombre de véhicules factices à créer avant la mesure (ex: 100000)")
+        parser.add_argument('--repetitions', type=int, default=5,
+                            help="Nombre d'exécutions par requête")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self._seed(options['seed'])
+
+        base = Voiture.objects.filter(disponible=True)
+        self.stdout.write(f"{base.count()} véhicules disponibles")
+        self.stdout.write(f"{'requête':<15}{'icontains (ms)':>16}{'plein texte (ms)':>18}{'résultats':>12}")
+
+        for requete in REQUETES:
+            ancien = self._mesurer(
+                lambda: list(VoitureSearchService.rechercher_icontains(base, requete)[:10]),
+                options['repetitions']
+            )
+            nouveau = self._mesurer(
+                lambda: list(VoitureSearchService.rechercher(base, requete)[:10]),
+                options['repetitions']
+            )
+            nb = VoitureSearchService.rechercher(base, requete).count()
+            self.stdout.write(f"{requete:<15}{ancien:>16.2f}{nouveau:>18.2f}{nb:>12}")
+
+    def _mesurer(self, fonction, repetitions):
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            durees.append((time.perf_counter() - debut) * 1000)
+        return statistics.median(durees)
+
+    @transaction.atomic
+    def _seed(self, nombre):
+        User = get_user_model()
+        proprietaire, _ = User.objects.get_or_create(
+            username='benchmark_proprietaire',
+            defaults={'email': 'benchmark@moncaisson.local', 'user_type': 'PROPRIETAIRE'}
+        )
+        marques = list(MARQUES)
+        voitures = []
+        for _ in range(nombre):
+            marque = random.choice(marques)
+            voitures.append(Voiture(
+                proprietaire=proprietaire,
+                marque=marque,
+                modele=random.choice(MARQUES[marque]),
+                annee=random.randint(2005, 2024),
+                type_vehicule=random.choice(Voiture.TYPE_VEHICULE_CHOICES)[0],
+                carburant=random.choice(Voiture.CARBURANT_CHOICES)[0],
+                prix_jour=random.randint(10, 150) * 1000,
+                ville=random.choice(['Abidjan', 'Bouaké', 'Yamoussoukro', 'San Pedro']),
+                description=random.choice(DESCRIPTIONS),
+            ))
+        created = Voiture.objects.bulk_create(voitures, batch_size=5000)
+        VoitureSearchService.mettre_a_jour_index([v.id for v in created])
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} véhicules créés"))
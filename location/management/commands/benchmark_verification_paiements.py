@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from location.models import Paiement
+from location.payments.fournisseur_local import FournisseurLocal
+from location.services.payment_reconciliation_service import PaymentReconciliationService
+
+
+class Command(BaseCommand):
+    help = ("Mesure le débit de la vérification des paiements en attente contre des "
+            "fournisseurs locaux à latence injectée (séquentiel puis parallèle)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paiements', type=int, default=300,
+                            help="Nombre de paiements fictifs (répartis Orange/Wave/PayPal)")
+        parser.add_argument('--latence', type=float, default=0.2,
+                            help="Latence injectée par requête, en secondes")
+        parser.add_argument('--sequentiel', type=int, default=30,
+                            help="Paiements mesurés en séquentiel (extrapolé au total)")
+        parser.add_argument('--sans-debit', action='store_true',
+                            help="Ignorer les débits maximaux par fournisseur (concurrence seule)")
+
+    def handle(self, *args, **options):
+        methodes = ['ORANGE', 'WAVE', 'PAYPAL']
+        # Paiements non enregistrés : seule la partie HTTP est mesurée
+        paiements = [
+            Paiement(id=i, methode=methodes[i % len(methodes)], transaction_id=f'tx-{i}')
+            for i in range(1, options['paiements'] + 1)
+        ]
+        sequentiel = {
+            methode: {'concurrence': 1, 'debit': 0}
+            for methode in PaymentReconciliationService.LIMITES
+        }
+
+        with FournisseurLocal(latence=options['latence']) as fournisseur:
+            with override_settings(**fournisseur.settings()):
+                echantillon = paiements[:options['sequentiel']]
+                with override_settings(PAYMENT_VERIFICATION_LIMITS=sequentiel):
+                    debut = time.perf_counter()
+                    PaymentReconciliationService.verifier(echantillon)
+                    duree_seq = time.perf_counter() - debut
+                debit_seq = len(echantillon) / duree_seq
+
+                limites = {
+                    methode: {'debit': 0} if options['sans_debit'] else {}
+                    for methode in PaymentReconciliationService.LIMITES
+                }
+                fournisseur.max_simultanes = 0
+                with override_settings(PAYMENT_VERIFICATION_LIMITS=limites):
+                    debut = time.perf_counter()
+                    resultats = PaymentReconciliationService.verifier(paiements)
+                    duree_par = time.perf_counter() - debut
+                debit_par = len(resultats) / duree_par
+
+        self.stdout.write(f"Latence injectée : {options['latence'] * 1000:.0f} ms")
+        self.stdout.write(
+            f"Séquentiel (1 appel à la fois par fournisseur) : {debit_seq:.1f} paiements/s "
+            f"(≈ {len(paiements) / debit_seq:.1f}s pour {len(paiements)})"
+        )
+        self.stdout.write(
+            f"Parallèle{' sans débit max' if options['sans_debit'] else ''} : {debit_par:.1f} paiements/s ({len(resultats)} en {duree_par:.2f}s, "
+            f"pic de {fournisseur.max_simultanes} requêtes simultanées)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Gain : x{debit_par / debit_seq:.1f}"))
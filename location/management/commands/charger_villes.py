@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from location.services.geo_service import GeoService
+
+
+class Command(BaseCommand):
+    help = "Charge le gazetteer des villes (location/data/villes_ci.json) et géolocalise les véhicules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fichier', help="Autre fichier JSON au même format")
+        parser.add_argument('--sans-voitures', action='store_true',
+                            help="Ne pas recalculer la localisation des véhicules")
+
+    def handle(self, *args, **options):
+        total = GeoService.charger_gazetteer(options.get('fichier'))
+        self.stdout.write(self.style.SUCCESS(f"{total} villes chargées"))
+
+        if not options['sans_voitures']:
+            localisees = GeoService.localiser_voitures()
+            self.stdout.write(self.style.SUCCESS(f"{localisees} véhicules rattachés à une ville"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from location.services.rating_service import RatingService
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les agrégats de notes des véhicules et des profils à partir des évaluations"
+
+    def handle(self, *args, **options):
+        resultats = RatingService.reconstruire()
+        for cible, total in resultats.items():
+            self.stdout.write(self.style.SUCCESS(f"{total} {cible} recalculés"))
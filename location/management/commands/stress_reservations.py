@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from location.models import Reservation, User, Voiture
+from location.services.booking_service import BookingService, DatesIndisponibles
+
+
+class Command(BaseCommand):
+    help = "Envoie des demandes de réservation concurrentes sur une voiture et vérifie l'absence de chevauchement"
+
+    def add_arguments(self, parser):
+        parser.add_argument('voiture_id', type=int, help="Voiture ciblée")
+        parser.add_argument('--threads', type=int, default=20,
+                            help="Nombre de clients simultanés")
+        parser.add_argument('--demandes', type=int, default=10,
+                            help="Demandes par client")
+        parser.add_argument('--fenetre', type=int, default=60,
+                            help="Nombre de jours sur lesquels tirer les périodes")
+        parser.add_argument('--conserver', action='store_true',
+                            help="Ne pas supprimer les réservations créées")
+
+    def handle(self, *args, **options):
+        try:
+            voiture = Voiture.objects.get(pk=options['voiture_id'])
+        except Voiture.DoesNotExist:
+            raise CommandError(f"Voiture {options['voiture_id']} introuvable")
+        client = User.objects.filter(user_type='LOUEUR').first()
+        if client is None:
+            raise CommandError("Aucun loueur en base")
+
+        debut_fenetre = date.today() + timedelta(days=365)
+        compteurs = {'ok': 0, 'conflit': 0}
+        verrou = threading.Lock()
+        crees = []
+
+        def client_simule():
+            try:
+                for _ in range(options['demandes']):
+                    debut = debut_fenetre + timedelta(days=random.randrange(options['fenetre']))
+                    fin = debut + timedelta(days=random.randint(1, 5))
+                    try:
+                        reservation, _ = BookingService.reserver(voiture, client, debut, fin)
+                        resultat = 'ok'
+                    except DatesIndisponibles:
+                        reservation, resultat = None, 'conflit'
+                    with verrou:
+                        compteurs[resultat] += 1
+                        if reservation:
+                            crees.append(reservation.pk)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client_simule) for _ in range(options['threads'])]
+        depart = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duree = time.perf_counter() - depart
+
+        total = compteurs['ok'] + compteurs['conflit']
+        self.stdout.write(
+            f"{total} demandes en {duree:.2f}s ({total / duree:.0f}/s) : "
+            f"{compteurs['ok']} acceptées, {compteurs['conflit']} refusées"
+        )
+
+        periodes = list(Reservation.objects.filter(pk__in=crees).order_by('date_debut').values_list('date_debut', 'date_fin'))
+        chevauchements = sum(1 for (_, fin), (debut, _) in zip(periodes, periodes[1:]) if fin > debut)
+        if not options['conserver']:
+            Reservation.objects.filter(pk__in=crees).delete()
+
+        if chevauchements:
+            raise CommandError(f"{chevauchements} chevauchement(s) détecté(s)")
+        self.stdout.write(self.style.SUCCESS("Aucun chevauchement"))
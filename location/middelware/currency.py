@@ -1,7 +1,8 @@
 from django.utils.deprecation import MiddlewareMixin
+from location.services.currency_service import CurrencyService
 
 class CurrencyMiddleware(MiddlewareMixin):
-    CURRENCY_CHOICES = ['XOF', 'EUR', 'USD']
+    CURRENCY_CHOICES = list(CurrencyService.SUPPORTED_CURRENCIES)
     DEFAULT_CURRENCY = 'XOF'
     
     def process_request(self, request):
@@ -13,22 +14,11 @@ class CurrencyMiddleware(MiddlewareMixin):
             currency = request.GET['currency']
             request.session['currency'] = currency
             
-        # 3. Vérifier l'en-tête Accept-Language
-        if not currency:
-            lang = request.META.get('HTTP_ACCEPT_LANGUAGE', '')[:2].upper()
-            currency = 'EUR' if lang in ['FR', 'DE'] else self.DEFAULT_CURRENCY
-            
-        # 4. Définir la valeur par défaut
+        # 3. Définir la valeur par défaut : les prix sont saisis en XOF, une autre
+        # devise n'est affichée que si le visiteur l'a choisie
         request.currency = currency or self.DEFAULT_CURRENCY
         
-        # 5. Ajouter le taux de change
-        request.exchange_rates = self.get_exchange_rates()
-
-    def get_exchange_rates(self):
-        # Implémentez une connexion à une API comme fixer.io
-        return {
-            'XOF': 1,
-            'EUR': 655.957,
-            'USD': 600.50
-        }
-
+        # 4. Taux courants (table en mémoire de CurrencyService, non copiée)
+        table = CurrencyService.table()
+        request.exchange_rates = table.taux
+        request.rates_version = table.version
@@ -0,0 +1,50 @@
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+def populate_creneaux(apps, schema_editor):
+    from django.db.backends.postgresql.psycopg_any import DateRange
+
+    Reservation = apps.get_model('location', 'Reservation')
+    CreneauOccupe = apps.get_model('location', 'CreneauOccupe')
+
+    creneaux = [
+        CreneauOccupe(
+            voiture_id=voiture_id,
+            reservation_id=reservation_id,
+            periode=DateRange(date_debut, date_fin, bounds='[)')
+        )
+        for reservation_id, voiture_id, date_debut, date_fin in Reservation.objects.filter(
+            statut='confirme'
+        ).values_list('id', 'voiture_id', 'date_debut', 'date_fin').iterator()
+    ]
+    CreneauOccupe.objects.bulk_create(creneaux, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_populate_transaction_users'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='CreneauOccupe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', django.contrib.postgres.fields.ranges.DateRangeField(verbose_name='Période occupée')),
+                ('reservation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='creneau_occupe', to='location.reservation')),
+                ('voiture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creneaux_occupes', to='location.voiture')),
+            ],
+            options={
+                'verbose_name': 'Créneau occupé',
+                'verbose_name_plural': 'Créneaux occupés',
+                'indexes': [django.contrib.postgres.indexes.GistIndex(fields=['voiture', 'periode'], name='creneau_voiture_periode_gist')],
+            },
+        ),
+        migrations.RunPython(populate_creneaux, migrations.RunPython.noop),
+    ]
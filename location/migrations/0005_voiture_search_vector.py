@@ -0,0 +1,43 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    Voiture = apps.get_model('location', 'Voiture')
+    Voiture.objects.update(search_vector=(
+        SearchVector('marque', weight='A', config='french') +
+        SearchVector('modele', weight='A', config='french') +
+        SearchVector('description', weight='C', config='french')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0004_creneauoccupe'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='voiture',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='voiture',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='voiture_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='voiture',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['marque'], name='voiture_marque_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='voiture',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['modele'], name='voiture_modele_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
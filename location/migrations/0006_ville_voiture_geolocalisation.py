@@ -0,0 +1,108 @@
+import difflib
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+from location.geo import geohash_encode, normalize_place_name, read_gazetteer
+
+
+def charger_villes(apps, schema_editor):
+    Ville = apps.get_model('location', 'Ville')
+    Voiture = apps.get_model('location', 'Voiture')
+
+    rows = read_gazetteer()
+    villes = {
+        row['nom']: Ville.objects.create(
+            nom=row['nom'],
+            nom_normalise=row['nom_normalise'],
+            alias=row['alias'],
+            pays=row.get('pays', 'CI'),
+            latitude=row['latitude'],
+            longitude=row['longitude'],
+            geohash=row['geohash'],
+            rayon_km=row.get('rayon_km', 10),
+        )
+        for row in rows
+    }
+    for row in rows:
+        if row.get('parent') in villes:
+            ville = villes[row['nom']]
+            ville.parent = villes[row['parent']]
+            ville.save(update_fields=['parent'])
+
+    par_nom = {}
+    for ville in villes.values():
+        for alias in ville.alias:
+            par_nom.setdefault(alias, ville)
+    for ville in villes.values():
+        par_nom[ville.nom_normalise] = ville
+
+    voitures = []
+    for voiture in Voiture.objects.only('id', 'ville').iterator():
+        cle = normalize_place_name(voiture.ville)
+        if cle not in par_nom:
+            proches = difflib.get_close_matches(cle, par_nom.keys(), n=1, cutoff=0.8)
+            if not proches:
+                continue
+            cle = proches[0]
+        ville = par_nom[cle]
+        voiture.ville_ref_id = ville.pk
+        voiture.latitude = ville.latitude
+        voiture.longitude = ville.longitude
+        voiture.geohash = geohash_encode(ville.latitude, ville.longitude)
+        voitures.append(voiture)
+    Voiture.objects.bulk_update(voitures, ['ville_ref', 'latitude', 'longitude', 'geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0005_voiture_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ville',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('nom_normalise', models.CharField(max_length=100, unique=True, verbose_name='Nom normalisé')),
+                ('alias', models.JSONField(blank=True, default=list, verbose_name='Autres noms (normalisés)')),
+                ('pays', models.CharField(default='CI', max_length=2, verbose_name='Pays')),
+                ('latitude', models.FloatField(validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)])),
+                ('longitude', models.FloatField(validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)])),
+                ('geohash', models.CharField(db_index=True, max_length=12)),
+                ('rayon_km', models.PositiveSmallIntegerField(default=10, verbose_name='Rayon de recherche par défaut (km)')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='communes', to='location.ville', verbose_name='Ville de rattachement')),
+            ],
+            options={
+                'verbose_name': 'Ville',
+                'verbose_name_plural': 'Villes',
+                'ordering': ['nom'],
+            },
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='ville_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='voitures', to='location.ville', verbose_name='Ville (gazetteer)'),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='voiture',
+            index=models.Index(fields=['geohash'], name='voiture_geohash_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(charger_villes, migrations.RunPython.noop),
+    ]
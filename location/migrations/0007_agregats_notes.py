@@ -0,0 +1,153 @@
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def reconstruire_notes(apps, schema_editor):
+    Evaluation = apps.get_model('location', 'Evaluation')
+    EvaluationLoueur = apps.get_model('location', 'EvaluationLoueur')
+    cibles = [
+        (apps.get_model('location', 'Voiture'), 'pk', Evaluation, 'voiture_id'),
+        (apps.get_model('location', 'ProprietaireProfile'), 'user_id', Evaluation, 'voiture__proprietaire_id'),
+        (apps.get_model('location', 'LoueurProfile'), 'user_id', EvaluationLoueur, 'evalue_id'),
+    ]
+    for modele, cle, evaluations, lien in cibles:
+        agregats = evaluations.objects.order_by().values(lien).annotate(
+            note_nombre=Count('id'),
+            note_somme=Sum('note'),
+            **{f'note_{n}': Count('id', filter=Q(note=n)) for n in range(1, 6)}
+        )
+        for agregat in agregats:
+            valeurs = {k: v for k, v in agregat.items() if k != lien}
+            valeurs['note_moyenne'] = valeurs['note_somme'] / valeurs['note_nombre']
+            modele.objects.filter(**{cle: agregat[lien]}).update(**valeurs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0006_ville_voiture_geolocalisation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voiture',
+            name='note_nombre',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations"),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_somme',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_moyenne',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Note moyenne'),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='voiture',
+            name='note_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_nombre',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations"),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_somme',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_moyenne',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Note moyenne'),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proprietaireprofile',
+            name='note_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_nombre',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations"),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_somme',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_moyenne',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Note moyenne'),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='loueurprofile',
+            name='note_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reconstruire_notes, migrations.RunPython.noop),
+    ]
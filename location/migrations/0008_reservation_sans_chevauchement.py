@@ -0,0 +1,79 @@
+import django.contrib.postgres.constraints
+from django.db import migrations, models
+import location.models.core_models
+
+
+def annuler_chevauchements(apps, schema_editor):
+    """
+    Annule les réservations en attente de paiement qui chevauchent une réservation
+    confirmée, ou une autre réservation active plus ancienne de la même voiture,
+    pour que la contrainte d'exclusion puisse être créée.
+
+    Deux réservations confirmées qui se chevauchent ne sont pas arbitrées
+    automatiquement : la migration s'arrête en listant les paires en conflit.
+    """
+    schema_editor.execute("""
+        UPDATE location_reservation r
+        SET statut = 'annule'
+        WHERE r.statut = 'attente_paiement'
+          AND EXISTS (
+            SELECT 1 FROM location_reservation autre
+            WHERE autre.voiture_id = r.voiture_id
+              AND autre.id <> r.id
+              AND autre.statut IN ('attente_paiement', 'confirme')
+              AND daterange(autre.date_debut, autre.date_fin, '[)')
+                  && daterange(r.date_debut, r.date_fin, '[)')
+              AND (autre.statut = 'confirme' OR autre.id < r.id)
+          )
+    """)
+
+    # Restent les chevauchements entre réservations confirmées : à arbitrer à la main
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT r.voiture_id, r.id, r.date_debut, r.date_fin, autre.id, autre.date_debut, autre.date_fin
+            FROM location_reservation r
+            JOIN location_reservation autre
+              ON autre.voiture_id = r.voiture_id
+             AND autre.id > r.id
+             AND autre.statut = 'confirme'
+             AND daterange(autre.date_debut, autre.date_fin, '[)')
+                 && daterange(r.date_debut, r.date_fin, '[)')
+            WHERE r.statut = 'confirme'
+            ORDER BY r.voiture_id, r.id, autre.id
+        """)
+        conflits = cursor.fetchall()
+    if conflits:
+        lignes = [
+            f"  voiture {voiture_id} : réservation {a} ({debut_a} -> {fin_a}) "
+            f"et réservation {b} ({debut_b} -> {fin_b})"
+            for voiture_id, a, debut_a, fin_a, b, debut_b, fin_b in conflits[:50]
+        ]
+        if len(conflits) > 50:
+            lignes.append(f"  ... et {len(conflits) - 50} autre(s)")
+        raise RuntimeError(
+            f"{len(conflits)} chevauchement(s) entre réservations confirmées empêchent la création "
+            "de la contrainte reservation_sans_chevauchement. Annulez ou déplacez l'une des "
+            "réservations de chaque paire, puis relancez la migration :\n" + "\n".join(lignes)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0007_agregats_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(annuler_chevauchements, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(('statut__in', ['attente_paiement', 'confirme'])),
+                expressions=[
+                    ('voiture', '='),
+                    (location.models.core_models.PlageDates('date_debut', 'date_fin', models.Value('[)')), '&&'),
+                ],
+                name='reservation_sans_chevauchement',
+            ),
+        ),
+    ]
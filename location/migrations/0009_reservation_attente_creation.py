@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0008_reservation_sans_chevauchement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('statut', 'attente_paiement')), fields=['date_creation', 'id'], name='reservation_attente_creation'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0009_reservation_attente_creation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('statut', 'confirme')), fields=['date_fin', 'id'], name='reservation_confirmee_fin'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0011_paiement_reservation_recent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenementWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fournisseur', models.CharField(choices=[('ORANGE', 'Orange Money'), ('WAVE', 'Wave'), ('PAYPAL', 'PayPal'), ('STRIPE', 'Stripe')], max_length=10)),
+                ('event_id', models.CharField(max_length=255, verbose_name='ID événement fournisseur')),
+                ('transaction_id', models.CharField(blank=True, default='', max_length=100, verbose_name='ID Transaction')),
+                ('type_evenement', models.CharField(blank=True, default='', max_length=100)),
+                ('payload', models.JSONField(verbose_name='Corps de la notification')),
+                ('en_tetes', models.JSONField(blank=True, default=dict, verbose_name='En-têtes nécessaires à la vérification')),
+                ('statut', models.CharField(choices=[('recu', 'Reçu, à traiter'), ('traite', 'Appliqué'), ('ignore', 'Sans effet'), ('rejete', 'Rejeté à la vérification'), ('echoue', 'Échec après plusieurs tentatives')], default='recu', max_length=10)),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('erreur', models.TextField(blank=True, default='')),
+                ('date_reception', models.DateTimeField(auto_now_add=True)),
+                ('date_traitement', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Événement webhook',
+                'verbose_name_plural': 'Événements webhook',
+                'indexes': [models.Index(condition=models.Q(('statut', 'recu')), fields=['fournisseur', 'transaction_id', 'id'], name='webhook_a_traiter')],
+                'constraints': [models.UniqueConstraint(fields=('fournisseur', 'event_id'), name='webhook_evenement_unique')],
+            },
+        ),
+    ]
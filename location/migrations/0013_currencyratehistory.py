@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0012_evenementwebhook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrencyRateHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField(unique=True, verbose_name='Date de récupération')),
+                ('rates', models.JSONField(verbose_name='Taux {devise: taux pour 1 XOF}')),
+                ('source', models.CharField(blank=True, default='', max_length=30)),
+            ],
+            options={
+                'verbose_name': 'Historique des taux',
+                'verbose_name_plural': 'Historique des taux',
+                'ordering': ['date'],
+            },
+        ),
+    ]
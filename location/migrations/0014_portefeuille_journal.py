@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+def solde_ouverture(apps, schema_editor):
+    """Les soldes existants deviennent le premier point de contrôle du journal"""
+    Portefeuille = apps.get_model('location', 'Portefeuille')
+    Portefeuille.objects.update(solde_controle=models.F('solde'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0013_currencyratehistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portefeuille',
+            name='nb_ecritures',
+            field=models.PositiveIntegerField(default=0, verbose_name='Écritures au journal'),
+        ),
+        migrations.AddField(
+            model_name='portefeuille',
+            name='solde_controle',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='portefeuille',
+            name='numero_controle',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='portefeuille',
+            name='date_controle',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='numero',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name="N° d'écriture"),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('portefeuille', 'numero'), name='transaction_ecriture_unique'),
+        ),
+        migrations.RunPython(solde_ouverture, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def solde_ouverture(apps, schema_editor):
+    """Solde antérieur au journal : solde actuel moins les écritures numérotées"""
+    Portefeuille = apps.get_model('location', 'Portefeuille')
+    Transaction = apps.get_model('location', 'Transaction')
+    journal = (
+        Transaction.objects.filter(portefeuille=OuterRef('pk'), numero__isnull=False)
+        .order_by().values('portefeuille').annotate(total=Sum('montant')).values('total')
+    )
+    Portefeuille.objects.update(
+        solde_ouverture=F('solde') - Coalesce(
+            Subquery(journal), Value(Decimal('0')), output_field=models.DecimalField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0014_portefeuille_journal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portefeuille',
+            name='solde_ouverture',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['portefeuille', 'date_creation', 'id'], include=('montant', 'numero'), name='transaction_historique'),
+        ),
+        migrations.RunPython(solde_ouverture, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+import uuid
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0015_transaction_historique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LotVirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fournisseur', models.CharField(choices=[('orange', 'Orange Money'), ('wave', 'Wave')], max_length=20)),
+                ('statut', models.CharField(choices=[('debite', 'Portefeuilles débités, envoi en cours'), ('termine', 'Terminé')], default='debite', max_length=10)),
+                ('nb_virements', models.PositiveIntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Lot de virements',
+                'verbose_name_plural': 'Lots de virements',
+                'indexes': [models.Index(condition=models.Q(('statut', 'debite')), fields=['id'], name='lot_virement_a_reprendre')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Virement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('destinataire', models.CharField(blank=True, default='', max_length=20, verbose_name='Téléphone du bénéficiaire')),
+                ('reference', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('reference_fournisseur', models.CharField(blank=True, default='', max_length=100)),
+                ('statut', models.CharField(choices=[('a_envoyer', 'À envoyer'), ('envoye', 'Envoyé'), ('echoue', 'Échoué, portefeuille recrédité'), ('rejete', 'Rejeté avant envoi')], default='a_envoyer', max_length=10)),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('erreur', models.TextField(blank=True, default='')),
+                ('notifie', models.BooleanField(default=False)),
+                ('date_envoi', models.DateTimeField(blank=True, null=True)),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='virements', to='location.lotvirement')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='virement', to='location.transaction')),
+            ],
+            options={
+                'verbose_name': 'Virement',
+                'verbose_name_plural': 'Virements',
+                'indexes': [models.Index(condition=models.Q(('statut', 'a_envoyer')), fields=['lot', 'id'], name='virement_a_envoyer')],
+            },
+        ),
+    ]
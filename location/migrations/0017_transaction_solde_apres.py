@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+TAILLE_LOT = 2000
+
+
+def solde_apres(apps, schema_editor):
+    """Solde après chaque écriture, dans l'ordre du journal (numero)"""
+    Portefeuille = apps.get_model('location', 'Portefeuille')
+    Transaction = apps.get_model('location', 'Transaction')
+    ouvertures = dict(Portefeuille.objects.values_list('pk', 'solde_ouverture'))
+    ecritures = (
+        Transaction.objects.filter(portefeuille__isnull=False, numero__isnull=False)
+        .order_by('portefeuille_id', 'numero')
+        .only('pk', 'portefeuille_id', 'montant')
+    )
+    portefeuille_id, solde, lot = None, None, []
+    for ecriture in ecritures.iterator(chunk_size=TAILLE_LOT):
+        if ecriture.portefeuille_id != portefeuille_id:
+            portefeuille_id = ecriture.portefeuille_id
+            solde = ouvertures[portefeuille_id]
+        solde += ecriture.montant
+        ecriture.solde_apres = solde
+        lot.append(ecriture)
+        if len(lot) >= TAILLE_LOT:
+            Transaction.objects.bulk_update(lot, ['solde_apres'])
+            lot = []
+    if lot:
+        Transaction.objects.bulk_update(lot, ['solde_apres'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0016_lotvirement_virement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='solde_apres',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name="Solde après l'écriture"),
+        ),
+        migrations.RunPython(solde_apres, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_historique',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['portefeuille', 'date_creation', 'id'], include=('montant', 'numero', 'solde_apres'), name='transaction_historique'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0017_transaction_solde_apres'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='virement',
+            name='statut',
+            field=models.CharField(choices=[('a_envoyer', 'À envoyer'), ('envoye', 'Envoyé'), ('echoue', 'Échoué, portefeuille recrédité'), ('rejete', 'Rejeté avant envoi'), ('a_verifier', 'Issue inconnue, à vérifier')], default='a_envoyer', max_length=10),
+        ),
+    ]
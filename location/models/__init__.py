@@ -22,6 +22,11 @@ from .delivery_models import DeliveryOption, DeliveryRequest
 from .policy_models import Policy, PolicyAcceptance
 from .messaging_models import Message, Conversation, MessageAttachment, ConversationArchive
 from .security import IPScore
+from .availability_models import CreneauOccupe
+from .geo_models import Ville
+from .webhook_models import EvenementWebhook
+from .currency_models import CurrencyRateHistory
+from .payout_models import LotVirement, Virement
 
 __all__ = [
     'User',
@@ -49,6 +54,12 @@ __all__ = [
     'Conversation', 
     'MessageAttachment',
     'ConversationArchive',
-    'IPScore'
+    'IPScore',
+    'CreneauOccupe',
+    'Ville',
+    'EvenementWebhook',
+    'CurrencyRateHistory',
+    'LotVirement',
+    'Virement'
 ]
 
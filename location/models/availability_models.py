@@ -0,0 +1,40 @@
+from django.db import models
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GistIndex
+from django.db.backends.postgresql.psycopg_any import DateRange
+from .core_models import Reservation, Voiture
+
+
+class CreneauOccupe(models.Model):
+    """
+    Index de disponibilité : une période réservée par réservation confirmée.
+    La période est stockée en daterange [date_debut, date_fin) et indexée en GiST
+    avec la voiture, ce qui permet de répondre à "libre entre X et Y" en une
+    seule recherche par chevauchement.
+    """
+    voiture = models.ForeignKey(
+        Voiture,
+        on_delete=models.CASCADE,
+        related_name='creneaux_occupes'
+    )
+    reservation = models.OneToOneField(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name='creneau_occupe'
+    )
+    periode = DateRangeField(verbose_name="Période occupée")
+
+    class Meta:
+        verbose_name = "Créneau occupé"
+        verbose_name_plural = "Créneaux occupés"
+        indexes = [
+            GistIndex(fields=['voiture', 'periode'], name='creneau_voiture_periode_gist'),
+        ]
+
+    def __str__(self):
+        return f"{self.voiture} : {self.periode.lower} → {self.periode.upper}"
+
+    @staticmethod
+    def periode_pour(date_debut, date_fin):
+        """Construit la plage semi-ouverte utilisée par l'index"""
+        return DateRange(date_debut, date_fin, bounds='[)')
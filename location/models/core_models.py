@@ -10,7 +10,12 @@ from django.utils import timezone
 from decimal import Decimal
 from django.conf import settings
 from django.db import transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
 import uuid
+from .rating_models import AgregatNotes
 
 PHONE_VALIDATOR = RegexValidator(
     regex=r'^\+?[0-9]{8,15}$',
@@ -181,7 +186,7 @@ class User(AbstractUser):
         )
 
 
-class ProprietaireProfile(models.Model):
+class ProprietaireProfile(AgregatNotes):
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -507,6 +512,7 @@ class Paiement(models.Model):
             models.Index(fields=['transaction_id']),
             models.Index(fields=['statut']),
             models.Index(fields=['methode']),
+            models.Index(fields=['reservation', '-date_creation'], name='paiement_reservation_recent'),
         ]
         permissions = [
             ("refund_payment", "Peut rembourser un paiement"),
@@ -625,7 +631,7 @@ class Paiement(models.Model):
         }
         return methods.get(self.methode, '')
         
-class LoueurProfile(models.Model):
+class LoueurProfile(AgregatNotes):
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -707,7 +713,7 @@ class PageView(models.Model):
     def __str__(self):
         return f"{self.url} - {self.timestamp}"
 
-class Voiture(models.Model):
+class Voiture(AgregatNotes):
     TRANSMISSION_CHOICES = [
         ('A', 'Automatique'),
         ('M', 'Manuelle'),
@@ -724,6 +730,10 @@ class Voiture(models.Model):
         ('sport', 'Voiture de sport'),
     ]
     
+    # Tarification saisonnière (get_prix_dynamique, QuoteService)
+    MOIS_HAUTE_SAISON = [6, 7, 8, 12]  # Juin, Juillet, Août, Décembre
+    MAJORATION_HAUTE_SAISON = Decimal('1.2')
+
     CARBURANT_CHOICES = [
         ('essence', 'Essence'),
         ('diesel', 'Diesel'),
@@ -819,6 +829,31 @@ class Voiture(models.Model):
         max_length=100,
         verbose_name="Ville"
     )
+    ville_ref = models.ForeignKey(
+        'Ville',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='voitures',
+        verbose_name="Ville (gazetteer)"
+    )
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    # Geohash des coordonnées (maintenu par save()), filtré par préfixe
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        default='',
+        editable=False
+    )
     
     # Visuel et description
     photo = models.ImageField(
@@ -841,6 +876,12 @@ class Voiture(models.Model):
         auto_now=True,
         verbose_name="Dernière modification"
     )
+    
+    # Recherche plein texte (maintenu par save())
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = "Véhicule"
@@ -849,6 +890,10 @@ class Voiture(models.Model):
         indexes = [
             models.Index(fields=['ville']),
             models.Index(fields=['prix_jour']),
+            GinIndex(fields=['search_vector'], name='voiture_search_vector_gin'),
+            GinIndex(fields=['marque'], name='voiture_marque_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['modele'], name='voiture_modele_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['geohash'], name='voiture_geohash_prefix', opclasses=['varchar_pattern_ops']),
         ]
         permissions = [
             ("can_manage_cars", "Peut gérer tous les véhicules"),
@@ -858,6 +903,22 @@ class Voiture(models.Model):
     def __str__(self):
         return f"{self.marque} {self.modele} ({self.annee})"
 
+    def save(self, *args, **kwargs):
+        # Rattachement au gazetteer et geohash si la localisation a pu changer
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'ville', 'latitude', 'longitude'} & set(update_fields):
+            from location.services.geo_service import GeoService
+            GeoService.localiser_voiture(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'ville_ref', 'latitude', 'longitude', 'geohash'}
+
+        super().save(*args, **kwargs)
+        
+        # Mise à jour du vecteur de recherche si un champ indexé a pu changer
+        if update_fields is None or {'marque', 'modele', 'description'} & set(update_fields):
+            from location.services.search_service import VoitureSearchService
+            VoitureSearchService.mettre_a_jour_index([self.pk])
+
     def get_absolute_url(self):
         return reverse('voiture_detail', kwargs={'pk': self.pk})
 
@@ -888,13 +949,15 @@ class Voiture(models.Model):
                 ).exists())
 
     def est_disponible_pour_periode(self, date_debut, date_fin):
-        """Vérifie la disponibilité pour une période spécifique"""
+        """Vérifie la disponibilité pour une période spécifique (holds de paiement inclus)"""
+        from location.services.hold_service import HoldService
         return (self.disponible and 
                 not self.reservations.filter(
                     date_debut__lt=date_fin,
                     date_fin__gt=date_debut,
                     statut='confirme'
-                ).exists())
+                ).exists() and
+                self.pk not in HoldService.voitures_retenues(date_debut, date_fin))
 
     @property
     def prix_total(self):
@@ -913,8 +976,14 @@ class Voiture(models.Model):
 
     def get_prix_dynamique(self, date):
         """Calcule un prix basé sur la saisonnalité"""
-        HIGH_SEASON_MONTHS = [6, 7, 8, 12]  # Juin, Juillet, Août, Décembre
-        return self.prix_jour * (1.2 if date.month in HIGH_SEASON_MONTHS else 1.0)
+        majoration = float(self.MAJORATION_HAUTE_SAISON) if date.month in self.MOIS_HAUTE_SAISON else 1.0
+        return self.prix_jour * majoration
+
+class PlageDates(models.Func):
+    """daterange(debut, fin, '[)') pour les contraintes d'exclusion"""
+    function = 'daterange'
+    output_field = DateRangeField()
+
 
 class Reservation(models.Model):
     STATUT_CHOICES = [
@@ -1013,12 +1082,35 @@ class Reservation(models.Model):
         verbose_name = "Réservation"
         verbose_name_plural = "Réservations"
         ordering = ['-date_creation']
+        indexes = [
+            # Balayage des réservations en attente de paiement expirées
+            models.Index(
+                fields=['date_creation', 'id'],
+                name='reservation_attente_creation',
+                condition=models.Q(statut='attente_paiement'),
+            ),
+            # Passage nocturne des locations finies à 'termine'
+            models.Index(
+                fields=['date_fin', 'id'],
+                name='reservation_confirmee_fin',
+                condition=models.Q(statut='confirme'),
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['voiture', 'date_debut', 'date_fin'],
                 name='reservation_unique',
                 condition=models.Q(statut__in=['attente_paiement', 'confirme'])
-            )
+            ),
+            # Aucune période active ne peut en chevaucher une autre sur la même voiture
+            ExclusionConstraint(
+                name='reservation_sans_chevauchement',
+                expressions=[
+                    ('voiture', RangeOperators.EQUAL),
+                    (PlageDates('date_debut', 'date_fin', models.Value('[)')), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(statut__in=['attente_paiement', 'confirme']),
+            ),
         ]
         permissions = [
             ("can_manage_reservations", "Peut gérer toutes les réservations"),
@@ -1046,6 +1138,26 @@ class Reservation(models.Model):
         """Retourne la durée en jours de la réservation"""
         return (self.date_fin - self.date_debut).days
 
+    @property
+    def dernier_paiement(self):
+        """
+        Paiement le plus récent. Construit sans requête si la réservation vient de
+        ReservationListService.avec_dernier_paiement.
+        """
+        if not hasattr(self, '_dernier_paiement'):
+            if hasattr(self, 'dernier_paiement_id'):
+                self._dernier_paiement = Paiement(
+                    id=self.dernier_paiement_id,
+                    reservation=self,
+                    statut=self.dernier_paiement_statut,
+                    methode=self.dernier_paiement_methode,
+                    montant=self.dernier_paiement_montant,
+                    date_creation=self.dernier_paiement_date_creation,
+                ) if self.dernier_paiement_id else None
+            else:
+                self._dernier_paiement = self.paiements.order_by('-date_creation', '-id').first()
+        return self._dernier_paiement
+
     def get_breakdown_payment(self):
         """Retourne le décomposition du paiement"""
         return {
@@ -1096,6 +1208,15 @@ class Reservation(models.Model):
             self.statut = 'confirme'
         super().save(*args, **kwargs)
 
+        # Index de disponibilité utilisé par la recherche
+        from location.services.availability_service import AvailabilityService
+        AvailabilityService.sync_reservation(self)
+
+        # Payée ou annulée : la période n'est plus retenue par un hold
+        if self.statut != 'attente_paiement':
+            from location.services.hold_service import HoldService
+            HoldService.liberer(self)
+
     def generer_facture(self):
         commissions = self.calculer_commissions()
         return {
@@ -1335,6 +1456,11 @@ class Evaluation(models.Model):
         verbose_name_plural = "Évaluations"
         unique_together = ('voiture', 'client', 'reservation')
         ordering = ['-date_creation']
+
+    def save(self, *args, **kwargs):
+        # Agrégats de notes (signals/rating_signals.py) dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
         
 class EvaluationLoueur(models.Model):
     reservation = models.ForeignKey(
@@ -1374,6 +1500,11 @@ class EvaluationLoueur(models.Model):
     def __str__(self):
         return f"Évaluation de {self.evalue} par {self.evaluateur}"
 
+    def save(self, *args, **kwargs):
+        # Agrégats de notes (signals/rating_signals.py) dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 class Favoris(models.Model):
     utilisateur = models.ForeignKey(
         User,
@@ -1468,8 +1599,23 @@ class VoiturePhoto(models.Model):
 
     def __str__(self):
         return f"Photo de {self.voiture.marque} {self.voiture.modele}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Change la version du cache de la page détail (VoitureDetailService)
+        Voiture.objects.filter(pk=self.voiture_id).update(date_modification=timezone.now())
+
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        Voiture.objects.filter(pk=self.voiture_id).update(date_modification=timezone.now())
+        return resultat
         
 class Portefeuille(models.Model):
+    """
+    Portefeuille tenu comme un journal en ajout seul (voir WalletService) :
+    solde est l'instantané du journal, mis à jour dans la même transaction
+    que chaque écriture ; nb_ecritures numérote les écritures.
+    """
     proprietaire = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -1481,36 +1627,33 @@ class Portefeuille(models.Model):
         default=0,
         validators=[MinValueValidator(Decimal('0.00'))]
     )
+    nb_ecritures = models.PositiveIntegerField(default=0, verbose_name="Écritures au journal")
+    # Solde antérieur au journal : solde = solde_ouverture + somme des écritures
+    solde_ouverture = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    # Point de contrôle : solde après l'écriture numero_controle
+    solde_controle = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    numero_controle = models.PositiveIntegerField(default=0)
+    date_controle = models.DateTimeField(null=True, blank=True)
+
     date_creation = models.DateTimeField(auto_now_add=True)
-    
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # Solde d'ouverture : premier point de contrôle
+            self.solde_ouverture = self.solde
+            self.solde_controle = self.solde
+        super().save(*args, **kwargs)
+
     def crediter(self, montant, reference="", type_transaction="depot"):
-        """Crédite le portefeuille de manière atomique"""
-        with transaction.atomic():
-            self.solde += Decimal(montant)
-            self.save()
-            return Transaction.objects.create(
-                portefeuille=self,
-                montant=montant,
-                type_transaction=type_transaction,
-                statut='valide',
-                reference=reference or f"CRD-{timezone.now().timestamp()}"
-            )
-    
+        """Crédite le portefeuille (écriture au journal)"""
+        from location.services.wallet_service import WalletService
+        return WalletService.crediter(self, montant, reference, type_transaction)
+
     def debiter(self, montant, reference="", type_transaction="retrait"):
-        """Débite le portefeuille de manière atomique avec vérification de solde"""
-        if self.solde < Decimal(montant):
-            raise ValueError("Solde insuffisant")
-        
-        with transaction.atomic():
-            self.solde -= Decimal(montant)
-            self.save()
-            return Transaction.objects.create(
-                portefeuille=self,
-                montant=-Decimal(montant),  # Négatif pour les débits
-                type_transaction=type_transaction,
-                statut='valide',
-                reference=reference or f"DBT-{timezone.now().timestamp()}"
-            )
+        """Débite le portefeuille ; lève SoldeInsuffisant (ValueError) si le solde ne couvre pas le montant"""
+        from location.services.wallet_service import WalletService
+        return WalletService.debiter(self, montant, reference, type_transaction)
 
     def __str__(self):
         return f"Portefeuille ({self.proprietaire.username})"
@@ -1592,6 +1735,23 @@ class Transaction(models.Model):
     )
     motif_rejet = models.TextField(blank=True)
     
+    # Journal du portefeuille : position de l'écriture, posée à la validation
+    numero = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="N° d'écriture"
+    )
+    # Solde du portefeuille juste après l'écriture, posé avec numero
+    solde_apres = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Solde après l'écriture"
+    )
+
     # Horodatages
     date_creation = models.DateTimeField(auto_now_add=True)
     date_traitement = models.DateTimeField(null=True, blank=True)
@@ -1605,6 +1765,17 @@ class Transaction(models.Model):
             ("valider_transaction", "Peut valider les transactions"),
             ("annuler_transaction", "Peut annuler les transactions"),
         ]
+        constraints = [
+            models.UniqueConstraint(fields=['portefeuille', 'numero'], name='transaction_ecriture_unique'),
+        ]
+        indexes = [
+            # Historique par curseur (WalletHistoryService)
+            models.Index(
+                fields=['portefeuille', 'date_creation', 'id'],
+                name='transaction_historique',
+                include=['montant', 'numero', 'solde_apres']
+            ),
+        ]
 
     def __str__(self):
         return (f"{self.get_type_transaction_display()} - "
@@ -1612,10 +1783,9 @@ class Transaction(models.Model):
                 f"{self.user.get_full_name() or self.user.username}")
 
     def marquer_comme_valide(self, utilisateur):
-        self.statut = 'valide'
-        self.traite_par = utilisateur
-        self.date_traitement = timezone.now()
-        self.save()
+        """Inscrit la transaction au journal de son portefeuille (WalletService.appliquer)"""
+        from location.services.wallet_service import WalletService
+        return WalletService.appliquer(self, utilisateur)
 
     def marquer_comme_rejete(self, utilisateur, motif):
         self.statut = 'rejete'
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class CurrencyRateHistory(models.Model):
+    """
+    Taux de change d'un rafraîchissement (CurrencyService.refresh_rates) :
+    une ligne par récupération, taux en unités de devise pour 1 XOF stockés
+    en texte pour conserver la précision Decimal.
+
+    Lu en bloc par RateHistoryService pour les conversions à date passée.
+    """
+    date = models.DateTimeField(unique=True, verbose_name="Date de récupération")
+    rates = models.JSONField(verbose_name="Taux {devise: taux pour 1 XOF}")
+    source = models.CharField(max_length=30, blank=True, default='')
+
+    class Meta:
+        verbose_name = "Historique des taux"
+        verbose_name_plural = "Historique des taux"
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Taux du {self.date:%d/%m/%Y %H:%M}"
@@ -0,0 +1,57 @@
+from django.db import models
+from django.core.validators import MinValueValidator, MaxValueValidator
+
+
+class Ville(models.Model):
+    """
+    Gazetteer local des villes et communes (chargé depuis location/data/villes_ci.json).
+    Sert à rattacher les véhicules à une ville canonique et à leurs coordonnées.
+    """
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    nom_normalise = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Nom normalisé"
+    )
+    alias = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Autres noms (normalisés)"
+    )
+    pays = models.CharField(max_length=2, default='CI', verbose_name="Pays")
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='communes',
+        verbose_name="Ville de rattachement"
+    )
+    latitude = models.FloatField(
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, db_index=True)
+    rayon_km = models.PositiveSmallIntegerField(
+        default=10,
+        verbose_name="Rayon de recherche par défaut (km)"
+    )
+
+    class Meta:
+        verbose_name = "Ville"
+        verbose_name_plural = "Villes"
+        ordering = ['nom']
+
+    def __str__(self):
+        return self.nom
+
+    def save(self, *args, **kwargs):
+        from location.geo import geohash_encode, normalize_place_name
+        self.nom_normalise = normalize_place_name(self.nom)
+        self.geohash = geohash_encode(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+        from location.services.geo_service import GeoService
+        GeoService.reset_cache()
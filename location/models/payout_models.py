@@ -0,0 +1,81 @@
+import uuid
+from django.db import models
+from django.db.models import Q
+
+
+class LotVirement(models.Model):
+    """
+    Lot de demandes de retrait versées par un même fournisseur (PayoutService).
+
+    Les portefeuilles sont débités à la création du lot ; un lot 'debite' a des
+    virements encore à envoyer et est repris au passage suivant.
+    """
+    FOURNISSEURS = [
+        ('orange', 'Orange Money'),
+        ('wave', 'Wave'),
+    ]
+
+    STATUT_CHOICES = [
+        ('debite', 'Portefeuilles débités, envoi en cours'),
+        ('termine', 'Terminé'),
+    ]
+
+    fournisseur = models.CharField(max_length=20, choices=FOURNISSEURS)
+    statut = models.CharField(max_length=10, choices=STATUT_CHOICES, default='debite')
+    nb_virements = models.PositiveIntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Lot de virements"
+        verbose_name_plural = "Lots de virements"
+        indexes = [
+            models.Index(fields=['id'], name='lot_virement_a_reprendre', condition=Q(statut='debite')),
+        ]
+
+    def __str__(self):
+        return f"Lot {self.pk} {self.get_fournisseur_display()} ({self.get_statut_display()})"
+
+
+class Virement(models.Model):
+    """
+    Versement d'une demande de retrait. reference sert de clé d'idempotence
+    auprès du fournisseur : un virement renvoyé après une interruption n'est
+    pas payé deux fois. Un virement 'a_verifier' (erreurs temporaires
+    répétées) a peut-être été payé : le portefeuille reste débité jusqu'à ce
+    qu'il soit renvoyé (PayoutService.renvoyer).
+    """
+    STATUT_CHOICES = [
+        ('a_envoyer', 'À envoyer'),
+        ('envoye', 'Envoyé'),
+        ('echoue', 'Échoué, portefeuille recrédité'),
+        ('rejete', 'Rejeté avant envoi'),
+        ('a_verifier', 'Issue inconnue, à vérifier'),
+    ]
+
+    lot = models.ForeignKey(LotVirement, on_delete=models.PROTECT, related_name='virements')
+    transaction = models.OneToOneField(
+        'location.Transaction',
+        on_delete=models.PROTECT,
+        related_name='virement'
+    )
+    montant = models.DecimalField(max_digits=15, decimal_places=2)
+    destinataire = models.CharField(max_length=20, blank=True, default='', verbose_name="Téléphone du bénéficiaire")
+    reference = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    reference_fournisseur = models.CharField(max_length=100, blank=True, default='')
+    statut = models.CharField(max_length=10, choices=STATUT_CHOICES, default='a_envoyer')
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    erreur = models.TextField(blank=True, default='')
+    notifie = models.BooleanField(default=False)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Virement"
+        verbose_name_plural = "Virements"
+        indexes = [
+            models.Index(fields=['lot', 'id'], name='virement_a_envoyer', condition=Q(statut='a_envoyer')),
+        ]
+
+    def __str__(self):
+        return f"Virement {self.reference} ({self.statut})"
@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class AgregatNotes(models.Model):
+    """
+    Agrégats de notes dénormalisés (nombre, somme, moyenne, histogramme 1-5).
+    Maintenus de façon incrémentale par RatingService à chaque création,
+    modification ou suppression d'évaluation ; `reparer_notes` les reconstruit.
+    """
+    note_nombre = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'évaluations")
+    note_somme = models.PositiveIntegerField(default=0, editable=False)
+    note_moyenne = models.FloatField(null=True, blank=True, editable=False, verbose_name="Note moyenne")
+    note_1 = models.PositiveIntegerField(default=0, editable=False)
+    note_2 = models.PositiveIntegerField(default=0, editable=False)
+    note_3 = models.PositiveIntegerField(default=0, editable=False)
+    note_4 = models.PositiveIntegerField(default=0, editable=False)
+    note_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    CHAMPS_NOTES = (
+        'note_nombre', 'note_somme', 'note_moyenne',
+        'note_1', 'note_2', 'note_3', 'note_4', 'note_5',
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Une instance chargée avant une nouvelle évaluation ne doit pas écraser les agrégats
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.CHAMPS_NOTES
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def histogramme_notes(self):
+        """{1: n, 2: n, ..., 5: n}"""
+        return {note: getattr(self, f'note_{note}') for note in range(1, 6)}
+
+    @property
+    def evaluations_positives(self):
+        return self.note_4 + self.note_5
+
+    @property
+    def evaluations_negatives(self):
+        return self.note_1 + self.note_2
@@ -0,0 +1,64 @@
+from django.db import models
+from django.db.models import Q
+
+
+class EvenementWebhook(models.Model):
+    """
+    Notification brute d'un fournisseur de paiement, enregistrée à la réception
+    puis vérifiée et appliquée par Celery (WebhookService).
+
+    (fournisseur, event_id) est unique : une notification renvoyée par le
+    fournisseur n'est enregistrée et traitée qu'une fois.
+    """
+    FOURNISSEURS = [
+        ('ORANGE', 'Orange Money'),
+        ('WAVE', 'Wave'),
+        ('PAYPAL', 'PayPal'),
+        ('STRIPE', 'Stripe'),
+    ]
+
+    STATUT_CHOICES = [
+        ('recu', 'Reçu, à traiter'),
+        ('traite', 'Appliqué'),
+        ('ignore', 'Sans effet'),
+        ('rejete', 'Rejeté à la vérification'),
+        ('echoue', 'Échec après plusieurs tentatives'),
+    ]
+
+    fournisseur = models.CharField(max_length=10, choices=FOURNISSEURS)
+    event_id = models.CharField(max_length=255, verbose_name="ID événement fournisseur")
+    transaction_id = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name="ID Transaction"
+    )
+    type_evenement = models.CharField(max_length=100, blank=True, default='')
+    payload = models.JSONField(verbose_name="Corps de la notification")
+    en_tetes = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="En-têtes nécessaires à la vérification"
+    )
+    statut = models.CharField(max_length=10, choices=STATUT_CHOICES, default='recu')
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    erreur = models.TextField(blank=True, default='')
+    date_reception = models.DateTimeField(auto_now_add=True)
+    date_traitement = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Événement webhook"
+        verbose_name_plural = "Événements webhook"
+        constraints = [
+            models.UniqueConstraint(fields=['fournisseur', 'event_id'], name='webhook_evenement_unique'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['fournisseur', 'transaction_id', 'id'],
+                name='webhook_a_traiter',
+                condition=Q(statut='recu')
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_fournisseur_display()} {self.event_id} ({self.statut})"
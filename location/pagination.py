@@ -0,0 +1,163 @@
+"""
+Pagination par curseur (keyset) pour les listes de véhicules.
+
+Au lieu d'un OFFSET, chaque page repart des valeurs de tri du dernier (ou
+premier) élément affiché, encodées dans un jeton signé. Le total exact n'est
+calculé que pour les petits résultats ; au-delà d'un seuil on affiche
+l'estimation du planificateur PostgreSQL.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import logging
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = 'location.pagination.cursor'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, direction):
+    return signing.dumps({'v': [_serialize(v) for v in values], 'd': direction}, salt=CURSOR_SALT)
+
+
+def decode_cursor(token):
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+        return data['v'], data['d']
+    except (signing.BadSignature, KeyError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def estimate_count(queryset):
+    """Nombre de lignes estimé par le planificateur (EXPLAIN), sans exécuter la requête"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPage:
+    """Page de résultats obtenue par curseur"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count, count_is_estimate):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_estimate = count_is_estimate
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginateur keyset sur un ordre de tri donné, ex: ['-date_creation', '-id'].
+    Le dernier champ doit être unique (id) pour garantir un ordre total.
+    """
+
+    # Au-delà de cette estimation, on n'exécute pas de COUNT(*) exact
+    EXACT_COUNT_THRESHOLD = 1000
+
+    def __init__(self, queryset, ordering, per_page, with_count=True):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.with_count = with_count
+
+    @staticmethod
+    def with_tiebreaker(ordering):
+        """Ajoute id à l'ordre de tri s'il n'y figure pas déjà"""
+        ordering = [o for o in ordering if isinstance(o, str)]
+        if not any(o.lstrip('-') in ('id', 'pk') for o in ordering):
+            ordering.append('-id' if ordering and ordering[0].startswith('-') else 'id')
+        return ordering
+
+    def _fields(self, reverse=False):
+        fields = []
+        for item in self.ordering:
+            descending = item.startswith('-')
+            fields.append((item.lstrip('-'), descending != reverse))
+        return fields
+
+    def _keyset_filter(self, values, fields):
+        """(a, b, c) > (va, vb, vc) en respectant le sens de chaque colonne"""
+        condition = Q()
+        for i, (name, descending) in enumerate(fields):
+            clause = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            for j in range(i):
+                clause &= Q(**{fields[j][0]: values[j]})
+            condition |= clause
+        return condition
+
+    def _values(self, obj):
+        return [getattr(obj, name) for name, _ in self._fields()]
+
+    def count(self):
+        """Retourne (total, est_une_estimation)"""
+        try:
+            estimate = estimate_count(self.queryset)
+        except Exception as e:
+            logger.warning(f"Estimation du nombre de résultats impossible: {e}")
+            estimate = None
+        if estimate is not None and estimate > self.EXACT_COUNT_THRESHOLD:
+            return estimate, True
+        return self.queryset.count(), False
+
+    def page(self, cursor=None):
+        direction = 'next'
+        values = None
+        if cursor:
+            values, direction = decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise InvalidCursor("Curseur incompatible avec le tri")
+
+        reverse = direction == 'prev'
+        fields = self._fields(reverse=reverse)
+        queryset = self.queryset.order_by(*[f"-{n}" if d else n for n, d in fields])
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, fields))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else values is not None
+        has_previous = values is not None if not reverse else has_more
+
+        next_cursor = encode_cursor(self._values(rows[-1]), 'next') if rows and has_next else None
+        previous_cursor = encode_cursor(self._values(rows[0]), 'prev') if rows and has_previous else None
+
+        total, is_estimate = self.count() if self.with_count else (None, False)
+        return KeysetPage(rows, next_cursor, previous_cursor, total, is_estimate)
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FournisseurLocal:
+    """
+    Faux fournisseurs de paiement (Orange Money, Wave, PayPal) sur 127.0.0.1,
+    avec une latence injectée, pour mesurer le débit de la vérification des
+    paiements sans appeler les vraies API.
+
+    Une transaction dont l'id commence par 'attente' reste non payée ; les autres
+    sont réussies. `max_simultanes` donne le pic de requêtes traitées en même temps.
+
+        with FournisseurLocal(latence=0.2) as fournisseur:
+            with override_settings(**fournisseur.settings()):
+                ...
+    """
+
+    def __init__(self, latence=0.1):
+        self.latence = latence
+        self.requetes = 0
+        self.max_simultanes = 0
+        self._en_cours = 0
+        self._verrou = threading.Lock()
+        self._serveur = None
+
+    def _reponse(self, chemin):
+        transaction_id = chemin.rstrip('/').rsplit('/', 1)[-1]
+        payee = not transaction_id.startswith('attente')
+        if chemin.startswith('/orange/'):
+            return {'status': 'SUCCESS' if payee else 'PENDING'}
+        if chemin.startswith('/wave/'):
+            return {'status': 'completed' if payee else 'processing'}
+        if chemin == '/paypal/v1/oauth2/token':
+            return {'access_token': 'token-local', 'expires_in': 32400}
+        if chemin.startswith('/paypal/'):
+            return {'status': 'COMPLETED' if payee else 'APPROVED'}
+        return None
+
+    def _handler(self):
+        fournisseur = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _repondre(self):
+                with fournisseur._verrou:
+                    fournisseur.requetes += 1
+                    fournisseur._en_cours += 1
+                    fournisseur.max_simultanes = max(fournisseur.max_simultanes, fournisseur._en_cours)
+                try:
+                    time.sleep(fournisseur.latence)
+                    longueur = int(self.headers.get('Content-Length') or 0)
+                    donnees = self.rfile.read(longueur) if longueur else b''
+                    chemin = self.path
+                    if chemin == '/orange/verify':
+                        # Orange Money reçoit l'id de transaction dans le corps JSON
+                        chemin = f"/orange/{json.loads(donnees or b'{}').get('transaction_id', '')}"
+                    corps = fournisseur._reponse(chemin)
+                    contenu = json.dumps(corps or {'error': 'not found'}).encode()
+                    self.send_response(200 if corps else 404)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(contenu)))
+                    self.end_headers()
+                    self.wfile.write(contenu)
+                finally:
+                    with fournisseur._verrou:
+                        fournisseur._en_cours -= 1
+
+            do_GET = _repondre
+            do_POST = _repondre
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._serveur = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._serveur.daemon_threads = True
+        threading.Thread(target=self._serveur.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+    @property
+    def url(self):
+        host, port = self._serveur.server_address
+        return f"http://{host}:{port}"
+
+    def settings(self):
+        """Settings à surcharger pour diriger les vérifications vers ce serveur"""
+        return {
+            'ORANGE_MONEY_API_URL': f"{self.url}/orange",
+            'ORANGE_MONEY_API_KEY': 'cle-locale',
+            'WAVE_API_URL': f"{self.url}/wave",
+            'WAVE_API_KEY': 'cle-locale',
+            'PAYPAL_API_URL': f"{self.url}/paypal",
+            'PAYPAL_CLIENT_ID': 'client-local',
+            'PAYPAL_SECRET': 'secret-local',
+        }
@@ -0,0 +1,215 @@
+import logging
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderIndisponible(requests.RequestException):
+    """Circuit ouvert : le fournisseur est considéré hors service, l'appel n'est pas tenté"""
+
+
+class Disjoncteur:
+    """
+    Circuit breaker d'un fournisseur (par processus) :
+    - fermé : les appels passent, les échecs consécutifs sont comptés
+    - ouvert : après SEUIL échecs, tout appel échoue immédiatement pendant DUREE secondes
+    - semi-ouvert : à l'issue de DUREE, un seul appel d'essai referme ou rouvre le circuit
+    """
+
+    def __init__(self, seuil=5, duree=30):
+        self.seuil = seuil
+        self.duree = duree
+        self.echecs = 0
+        self.ouvert_jusqua = 0.0
+        self.essai_en_cours = False
+        self.verrou = threading.Lock()
+
+    @property
+    def etat(self):
+        if self.echecs < self.seuil:
+            return 'ferme'
+        return 'ouvert' if time.monotonic() < self.ouvert_jusqua else 'semi_ouvert'
+
+    def autoriser(self):
+        with self.verrou:
+            etat = self.etat
+            if etat == 'ferme':
+                return True
+            if etat == 'semi_ouvert' and not self.essai_en_cours:
+                self.essai_en_cours = True
+                return True
+            return False
+
+    def succes(self):
+        with self.verrou:
+            self.echecs = 0
+            self.essai_en_cours = False
+
+    def echec(self):
+        with self.verrou:
+            self.echecs += 1
+            self.essai_en_cours = False
+            if self.echecs >= self.seuil:
+                self.ouvert_jusqua = time.monotonic() + self.duree
+
+
+class ProviderClient:
+    """
+    Client HTTP partagé d'un fournisseur de paiement (Orange Money, Wave, PayPal, CinetPay).
+
+    - une Session par fournisseur et par processus : connexions keep-alive réutilisées
+    - timeouts (connexion, lecture) par fournisseur, depuis settings.REQUEST_TIMEOUTS
+    - nouvelles tentatives bornées avec attente exponentielle et jitter, uniquement
+      si la requête peut être rejouée sans risque (GET, ou idempotent=True) ou si
+      la connexion n'a pas pu être établie
+    - disjoncteur : après plusieurs échecs, les appels échouent immédiatement
+      (ProviderIndisponible) au lieu d'immobiliser les workers
+    - latence et issue de chaque appel comptées en cache (metriques())
+
+        ProviderClient.pour('WAVE').get(url, headers=...)
+    """
+
+    FOURNISSEURS = ['ORANGE', 'WAVE', 'PAYPAL', 'CINETPAY']
+    TENTATIVES = 3
+    ATTENTE_BASE = 0.2  # secondes, doublée à chaque tentative
+    ATTENTE_MAX = 2.0
+    TIMEOUT_CONNEXION = 3.05
+    STATUTS_REJOUABLES = {429, 502, 503, 504}
+    METRIQUES_KEY = 'provider_http:{fournisseur}:{compteur}'
+    COMPTEURS = ['appels', 'echecs', 'rejets', 'tentatives', 'latence_ms']
+
+    _clients = {}
+    _verrou = threading.Lock()
+
+    def __init__(self, fournisseur, pool=10):
+        self.fournisseur = fournisseur
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.disjoncteur = Disjoncteur()
+
+    @classmethod
+    def pour(cls, fournisseur):
+        """Client unique (par processus) du fournisseur"""
+        client = cls._clients.get(fournisseur)
+        if client is None:
+            with cls._verrou:
+                client = cls._clients.setdefault(fournisseur, cls(fournisseur))
+        return client
+
+    @property
+    def timeout(self):
+        timeouts = getattr(settings, 'REQUEST_TIMEOUTS', {})
+        return (self.TIMEOUT_CONNEXION, timeouts.get(self.fournisseur, timeouts.get('DEFAULT', 10)))
+
+    def _attente(self, tentative):
+        """Full jitter : uniforme entre 0 et l'attente exponentielle"""
+        return random.uniform(0, min(self.ATTENTE_MAX, self.ATTENTE_BASE * 2 ** tentative))
+
+    def request(self, methode, url, idempotent=None, **kwargs):
+        """
+        Args:
+            idempotent: Autorise les nouvelles tentatives après envoi de la requête
+                (par défaut : vrai pour GET/HEAD, faux sinon)
+
+        Raises:
+            ProviderIndisponible: Si le circuit du fournisseur est ouvert
+            requests.RequestException: Erreur réseau après la dernière tentative
+        """
+        if idempotent is None:
+            idempotent = methode.upper() in ('GET', 'HEAD')
+        if not self.disjoncteur.autoriser():
+            self._compter(rejets=1)
+            raise ProviderIndisponible(f"{self.fournisseur} indisponible (circuit ouvert)")
+
+        kwargs.setdefault('timeout', self.timeout)
+        debut = time.perf_counter()
+        tentative = 0
+        issue_connue = False  # Le disjoncteur a été informé de l'issue
+        try:
+            while True:
+                try:
+                    response = self.session.request(methode, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    # Rejouable si la connexion n'a jamais été établie
+                    non_envoyee = isinstance(e, requests.ConnectTimeout) or (
+                        isinstance(e, requests.ConnectionError) and not isinstance(e, requests.ReadTimeout)
+                    )
+                    if tentative + 1 < self.TENTATIVES and (idempotent or non_envoyee):
+                        tentative += 1
+                        time.sleep(self._attente(tentative))
+                        continue
+                    issue_connue = True
+                    self.disjoncteur.echec()
+                    self._compter(echecs=1)
+                    raise
+
+                if (response.status_code in self.STATUTS_REJOUABLES and idempotent
+                        and tentative + 1 < self.TENTATIVES):
+                    tentative += 1
+                    time.sleep(self._attente(tentative))
+                    continue
+
+                if response.status_code >= 500:
+                    self.disjoncteur.echec()
+                    self._compter(echecs=1)
+                else:
+                    self.disjoncteur.succes()
+                issue_connue = True
+                return response
+        finally:
+            if not issue_connue:
+                # Toute autre exception (ChunkedEncodingError, InvalidURL, arrêt du worker...)
+                # compte comme un échec et libère l'appel d'essai du circuit semi-ouvert
+                self.disjoncteur.echec()
+                self._compter(echecs=1)
+            latence = time.perf_counter() - debut
+            self._compter(appels=1, tentatives=tentative + 1, latence_ms=int(latence * 1000))
+            logger.debug(f"{self.fournisseur} {methode} {url} - {latence * 1000:.0f} ms, {tentative + 1} tentative(s)")
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _compter(self, **compteurs):
+        for compteur, valeur in compteurs.items():
+            key = self.METRIQUES_KEY.format(fournisseur=self.fournisseur, compteur=compteur)
+            try:
+                cache.incr(key, valeur)
+            except ValueError:
+                if not cache.add(key, valeur, timeout=None):
+                    cache.incr(key, valeur)
+
+    @classmethod
+    def metriques(cls):
+        """Compteurs et latence moyenne par fournisseur (tous processus confondus)"""
+        keys = {
+            cls.METRIQUES_KEY.format(fournisseur=fournisseur, compteur=compteur): (fournisseur, compteur)
+            for fournisseur in cls.FOURNISSEURS for compteur in cls.COMPTEURS
+        }
+        valeurs = cache.get_many(list(keys))
+        resultat = {fournisseur: dict.fromkeys(cls.COMPTEURS, 0) for fournisseur in cls.FOURNISSEURS}
+        for key, valeur in valeurs.items():
+            fournisseur, compteur = keys[key]
+            resultat[fournisseur][compteur] = valeur
+        for fournisseur, stats in resultat.items():
+            stats['latence_moyenne_ms'] = round(stats['latence_ms'] / stats['appels'], 1) if stats['appels'] else None
+            client = cls._clients.get(fournisseur)
+            stats['circuit'] = client.disjoncteur.etat if client else 'ferme'
+        return resultat
+
+    @classmethod
+    def reinitialiser_metriques(cls):
+        cache.delete_many([
+            cls.METRIQUES_KEY.format(fournisseur=fournisseur, compteur=compteur)
+            for fournisseur in cls.FOURNISSEURS for compteur in cls.COMPTEURS
+        ])
@@ -1,16 +1,16 @@
-import requests
 from django.conf import settings
+from location.payments.http_client import ProviderClient
 
 class OrangeMoneyCI:
     def __init__(self):
         self.auth_token = self._get_auth_token()
 
     def _get_auth_token(self):
-        response = requests.post(
+        response = ProviderClient.pour('ORANGE').post(
             "https://api.orange.com/oauth/v2/token",
             auth=(settings.OM_CLIENT_ID, settings.OM_CLIENT_SECRET),
             data={"grant_type": "client_credentials"},
-            timeout=10  # Ajouter un timeout de 10 secondes
+            idempotent=True
         )
         return response.json()['access_token']
 
@@ -30,11 +30,10 @@ class OrangeMoneyCI:
             "lang": "fr",
             "phone_number": phone
         }
-        response = requests.post(
+        response = ProviderClient.pour('ORANGE').post(
             "https://api.orange.com/orange-money-webpay/ci/v1/webpayment",
             json=payload,
-            headers=headers,
-            timeout=10
+            headers=headers
         )
         return response.json()['payment_url']  # Redirigez l'utilisateur ici
 
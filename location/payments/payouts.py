@@ -0,0 +1,107 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from location.payments.http_client import ProviderClient
+
+
+class VirementRefuse(Exception):
+    """Refus définitif du fournisseur (numéro inconnu, plafond dépassé...) : le virement n'est pas retenté"""
+
+
+class FournisseurVirement:
+    """
+    Interface d'envoi des virements mobile money (PayoutService).
+
+    envoyer() est appelé depuis un pool de threads, au plus `concurrence`
+    appels simultanés et `debit` appels par seconde. Il doit être idempotent
+    sur virement.reference : un virement renvoyé après une interruption
+    retourne la même référence sans payer deux fois.
+    """
+    concurrence = 4
+    debit = 10
+
+    def envoyer(self, virement):
+        """
+        Returns:
+            str: Référence du virement chez le fournisseur
+        Raises:
+            VirementRefuse: Refus définitif
+            requests.RequestException: Erreur temporaire, retentée au passage suivant
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _refuse(response):
+        # 409 : clé d'idempotence déjà reçue (renvoi après interruption), le
+        # virement a pu être payé ; issue inconnue, pas un refus
+        if response.status_code in (400, 403, 404, 422):
+            raise VirementRefuse(f"{response.status_code} {response.text[:200]}")
+        response.raise_for_status()
+
+
+class OrangeMoneyVirement(FournisseurVirement):
+    concurrence = 8
+    debit = 20
+
+    def envoyer(self, virement):
+        response = ProviderClient.pour('ORANGE').post(
+            f"{settings.ORANGE_MONEY_API_URL}/cashout",
+            json={
+                'amount': str(virement.montant),
+                'currency': 'XOF',
+                'msisdn': virement.destinataire,
+                'reference': str(virement.reference),
+            },
+            headers={
+                'Authorization': f'Bearer {settings.ORANGE_MONEY_API_KEY}',
+                'Idempotency-Key': str(virement.reference),
+            },
+            idempotent=True
+        )
+        self._refuse(response)
+        return response.json().get('transaction_id', '')
+
+
+class WaveVirement(FournisseurVirement):
+    concurrence = 8
+    debit = 20
+
+    def envoyer(self, virement):
+        response = ProviderClient.pour('WAVE').post(
+            f"{settings.WAVE_API_URL}/payout",
+            json={
+                'receive_amount': str(virement.montant),
+                'currency': 'XOF',
+                'mobile': virement.destinataire,
+                'client_reference': str(virement.reference),
+            },
+            headers={
+                'Authorization': f'Bearer {settings.WAVE_API_KEY}',
+                'Idempotency-Key': str(virement.reference),
+            },
+            idempotent=True
+        )
+        self._refuse(response)
+        return response.json().get('id', '')
+
+
+class SimulationVirement(FournisseurVirement):
+    """
+    Fournisseur de substitution (développement, tests, mesures de charge) :
+    aucun appel réseau, latence injectée, idempotent sur la référence.
+    Les numéros se terminant par '0000' sont refusés.
+
+        PAYOUT_PROVIDERS = {'orange': 'location.payments.payouts.SimulationVirement'}
+    """
+    latence = 0
+    envoyes = {}
+    _verrou = threading.Lock()
+
+    def envoyer(self, virement):
+        if self.latence:
+            time.sleep(self.latence)
+        if virement.destinataire.endswith('0000'):
+            raise VirementRefuse("Numéro inconnu")
+        with self._verrou:
+            return self.envoyes.setdefault(str(virement.reference), f"SIM-{uuid.uuid4().hex[:12]}")
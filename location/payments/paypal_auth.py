@@ -0,0 +1,110 @@
+import logging
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from location.payments.http_client import ProviderClient
+
+logger = logging.getLogger(__name__)
+
+
+class PaypalTokenManager:
+    """
+    Token OAuth PayPal partagé par tous les workers.
+
+    Le token est conservé en cache jusqu'à MARGE secondes avant son expires_in.
+    Quand il manque, un seul worker le renouvelle (verrou Redis, ou verrou de
+    processus si le backend de cache n'en fournit pas) ; les autres attendent
+    le verrou puis relisent le cache au lieu d'appeler PayPal à leur tour.
+
+        headers={'Authorization': f"Bearer {PaypalTokenManager.obtenir()}"}
+    """
+
+    TOKEN_KEY = 'paypal:access_token'
+    MARGE = 300  # secondes retirées à expires_in
+    DUREE_MIN = 60
+    ATTENTE_VERROU = 15  # secondes d'attente maximale du renouvellement en cours
+
+    _verrou_local = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def _verrou(cls):
+        """Cède True si le verrou est obtenu, False après ATTENTE_VERROU"""
+        if hasattr(cache, 'lock'):
+            verrou = cache.lock(f'{cls.TOKEN_KEY}:verrou', timeout=30)
+            acquis = verrou.acquire(blocking_timeout=cls.ATTENTE_VERROU)
+        else:
+            verrou = cls._verrou_local
+            acquis = verrou.acquire(timeout=cls.ATTENTE_VERROU)
+        try:
+            yield acquis
+        finally:
+            if acquis:
+                verrou.release()
+
+    @staticmethod
+    def _demander():
+        """Appel OAuth client_credentials ; retourne (token, expires_in)"""
+        response = ProviderClient.pour('PAYPAL').post(
+            f"{settings.PAYPAL_API_URL}/v1/oauth2/token",
+            auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_SECRET),
+            data={'grant_type': 'client_credentials'},
+            headers={'Accept': 'application/json', 'Accept-Language': 'en_US'},
+            idempotent=True
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data['access_token'], int(data.get('expires_in') or 0)
+
+    @classmethod
+    def obtenir(cls):
+        """
+        Token d'accès PayPal valide, depuis le cache ou renouvelé.
+
+        Raises:
+            requests.RequestException: Si PayPal ne délivre pas de token
+        """
+        token = cache.get(cls.TOKEN_KEY)
+        if token:
+            return token
+
+        with cls._verrou() as acquis:
+            # Renouvelé par un autre worker pendant l'attente du verrou
+            token = cache.get(cls.TOKEN_KEY)
+            if token:
+                return token
+            if not acquis:
+                logger.warning("Renouvellement du token PayPal toujours en cours, appel direct")
+
+            token, expires_in = cls._demander()
+            cache.set(cls.TOKEN_KEY, token, timeout=max(expires_in - cls.MARGE, cls.DUREE_MIN))
+            logger.info(f"Token PayPal renouvelé (expire dans {expires_in}s)")
+            return token
+
+    @classmethod
+    def requete(cls, methode, url, headers=None, **kwargs):
+        """
+        Appel authentifié à l'API PayPal via le client partagé.
+        Sur 401 (token révoqué ou expiré avant terme), le token est renouvelé et
+        l'appel rejoué une fois : PayPal l'a refusé sans le traiter.
+        """
+        client = ProviderClient.pour('PAYPAL')
+        for _ in range(2):
+            token = cls.obtenir()
+            response = client.request(
+                methode, url, headers={**(headers or {}), 'Authorization': f'Bearer {token}'}, **kwargs
+            )
+            if response.status_code != 401:
+                break
+            cls.invalider(token)
+        return response
+
+    @classmethod
+    def invalider(cls, token=None):
+        """
+        Oublie le token en cache (réponse 401 de PayPal).
+        Si `token` est donné, ne supprime que ce token-là, pas un token déjà renouvelé.
+        """
+        if token is None or cache.get(cls.TOKEN_KEY) == token:
+            cache.delete(cls.TOKEN_KEY)
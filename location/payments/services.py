@@ -6,6 +6,7 @@ import logging
 from django.conf import settings
 from django.urls import reverse
 from decimal import Decimal
+from location.payments.http_client import ProviderClient
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 logger = logging.getLogger(__name__)
@@ -118,10 +119,9 @@ class PaymentService:
                 })
             }
 
-            response = requests.post(
+            response = ProviderClient.pour('CINETPAY').post(
                 "https://api.cinetpay.com/v2/payment",
-                json=payload,
-                timeout=10
+                json=payload
             )
             response.raise_for_status()
 
@@ -203,10 +203,9 @@ class PaymentService:
                     "transaction_id": reservation.paiement.transaction_id,
                     "amount": str(reservation.caution_paid)
                 }
-                response = requests.post(
+                response = ProviderClient.pour('CINETPAY').post(
                     "https://api.cinetpay.com/v2/refund",
-                    json=payload,
-                    timeout=10
+                    json=payload
                 )
                 response.raise_for_status()
                 reservation.caution_status = 'refunded'
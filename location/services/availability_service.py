@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from location.models import Reservation
+from location.models.availability_models import CreneauOccupe
+from location.services.hold_service import HoldService
+
+
+class AvailabilityService:
+    """
+    Maintient l'index des créneaux occupés (CreneauOccupe) et s'en sert pour
+    filtrer les voitures libres sur une période.
+    """
+
+    # Statuts qui bloquent une voiture dans la recherche
+    STATUTS_BLOQUANTS = ['confirme']
+
+    @staticmethod
+    def sync_reservation(reservation):
+        """Aligne le créneau d'une réservation sur son statut et ses dates"""
+        if reservation.statut in AvailabilityService.STATUTS_BLOQUANTS:
+            CreneauOccupe.objects.update_or_create(
+                reservation=reservation,
+                defaults={
+                    'voiture_id': reservation.voiture_id,
+                    'periode': CreneauOccupe.periode_pour(reservation.date_debut, reservation.date_fin),
+                }
+            )
+        else:
+            CreneauOccupe.objects.filter(reservation=reservation).delete()
+
+    @staticmethod
+    @transaction.atomic
+    def sync_reservations(reservation_ids=None):
+        """
+        Reconstruit l'index pour un lot de réservations (toutes si None).
+        À utiliser après des mises à jour en masse qui contournent save().
+
+        Returns:
+            int: Nombre de créneaux présents pour le lot après synchronisation
+        """
+        reservations = Reservation.objects.all()
+        creneaux = CreneauOccupe.objects.all()
+        if reservation_ids is not None:
+            reservations = reservations.filter(id__in=reservation_ids)
+            creneaux = creneaux.filter(reservation_id__in=reservation_ids)
+
+        creneaux.delete()
+        nouveaux = [
+            CreneauOccupe(
+                voiture_id=voiture_id,
+                reservation_id=reservation_id,
+                periode=CreneauOccupe.periode_pour(date_debut, date_fin)
+            )
+            for reservation_id, voiture_id, date_debut, date_fin in reservations.filter(
+                statut__in=AvailabilityService.STATUTS_BLOQUANTS
+            ).values_list('id', 'voiture_id', 'date_debut', 'date_fin').iterator()
+        ]
+        CreneauOccupe.objects.bulk_create(nouveaux, batch_size=1000)
+        return len(nouveaux)
+
+    @staticmethod
+    def voitures_occupees(date_debut, date_fin):
+        """IDs des voitures ayant un créneau qui chevauche [date_debut, date_fin)"""
+        return CreneauOccupe.objects.filter(
+            periode__overlap=CreneauOccupe.periode_pour(date_debut, date_fin)
+        ).values('voiture_id')
+
+    @staticmethod
+    def filtrer_disponibles(queryset, date_debut, date_fin):
+        """Exclut d'un queryset de voitures celles occupées ou retenues (hold) sur la période"""
+        return queryset.exclude(
+            id__in=AvailabilityService.voitures_occupees(date_debut, date_fin)
+        ).exclude(
+            id__in=HoldService.voitures_retenues(date_debut, date_fin)
+        )
+
+    @staticmethod
+    def disponibilites(queryset, periodes):
+        """
+        Disponibilité de plusieurs voitures sur plusieurs périodes en une requête :
+        un EXISTS par période sur l'index GiST, évalué pour chaque voiture.
+
+        Args:
+            queryset: Voitures à évaluer
+            periodes: Liste de (date_debut, date_fin)
+
+        Returns:
+            dict: {voiture_id: {'nom': str, 'disponibilites': [bool, ...]}}
+        """
+        annotations = {
+            f'occupee_{i}': Exists(CreneauOccupe.objects.filter(
+                voiture=OuterRef('pk'),
+                periode__overlap=CreneauOccupe.periode_pour(date_debut, date_fin)
+            ))
+            for i, (date_debut, date_fin) in enumerate(periodes)
+        }
+        lignes = queryset.order_by().annotate(**annotations).values(
+            'id', 'marque', 'modele', 'disponible', *annotations
+        )
+        retenues = [HoldService.voitures_retenues(date_debut, date_fin) for date_debut, date_fin in periodes]
+        return {
+            ligne['id']: {
+                'nom': f"{ligne['marque']} {ligne['modele']}",
+                'disponibilites': [
+                    ligne['disponible'] and not ligne[f'occupee_{i}'] and ligne['id'] not in retenues[i]
+                    for i in range(len(periodes))
+                ],
+            }
+            for ligne in lignes
+        }
@@ -0,0 +1,105 @@
+import logging
+from django.db import IntegrityError, transaction
+from location.models import Reservation, Voiture
+from location.services.hold_service import HoldService
+from location.services.quote_service import QuoteService
+
+logger = logging.getLogger(__name__)
+
+
+class DatesIndisponibles(Exception):
+    """Les dates demandées chevauchent une réservation active de la voiture"""
+
+
+class BookingService:
+    """
+    Création de réservation sans double réservation possible :
+    - verrou de ligne sur la voiture (SELECT ... FOR UPDATE) pour sérialiser
+      les demandes concurrentes sur un même véhicule
+    - contrainte d'exclusion PostgreSQL (reservation_sans_chevauchement) en
+      dernier rempart si une écriture contourne ce service
+    - hold Redis (HoldService) posé pendant le paiement : une réservation en
+      attente dont le hold a expiré est annulée au lieu de bloquer la voiture
+    """
+
+    # Statuts qui occupent la voiture (même condition que la contrainte d'exclusion)
+    STATUTS_ACTIFS = ['attente_paiement', 'confirme']
+
+    @classmethod
+    def chevauchement(cls, voiture_id, date_debut, date_fin, exclure_id=None):
+        """
+        Vrai si une réservation active chevauche [date_debut, date_fin).
+        Les réservations en attente dont le hold a expiré sont annulées au passage
+        (à appeler sous le verrou de la voiture).
+        """
+        reservations = Reservation.objects.filter(
+            voiture_id=voiture_id,
+            statut__in=cls.STATUTS_ACTIFS,
+            date_debut__lt=date_fin,
+            date_fin__gt=date_debut,
+        )
+        if exclure_id:
+            reservations = reservations.exclude(pk=exclure_id)
+
+        for reservation in reservations:
+            if reservation.statut == 'confirme' or HoldService.est_retenue(reservation):
+                return True
+            logger.info(f"Hold expiré - Réservation {reservation.pk} annulée")
+            reservation.statut = 'annule'
+            reservation.save()
+        return False
+
+    @classmethod
+    def reserver(cls, voiture, client, date_debut, date_fin, avec_chauffeur=False, reservation=None):
+        """
+        Crée une réservation en attente de paiement.
+
+        Returns:
+            tuple: (reservation, devis)
+
+        Raises:
+            DatesIndisponibles: Si la voiture est prise sur tout ou partie de la période
+        """
+        with transaction.atomic():
+            voiture = Voiture.objects.select_for_update().get(pk=voiture.pk)
+            if not voiture.disponible or cls.chevauchement(voiture.pk, date_debut, date_fin):
+                raise DatesIndisponibles()
+
+            devis = QuoteService.devis_voiture(voiture, date_debut, date_fin, avec_chauffeur)
+            caution = voiture.caution_amount if voiture.caution_required else 0
+
+            reservation = reservation or Reservation()
+            reservation.voiture = voiture
+            reservation.client = client
+            reservation.date_debut = date_debut
+            reservation.date_fin = date_fin
+            reservation.montant_paye = devis['base'] + devis['chauffeur']
+            reservation.frais_service = devis['frais']
+            reservation.montant_total = devis['total'] + caution
+            reservation.caution_paid = caution
+            reservation.caution_status = 'pending' if caution > 0 else 'not_required'
+            reservation.statut = 'attente_paiement'
+            reservation.avec_chauffeur = avec_chauffeur
+
+            try:
+                with transaction.atomic():
+                    reservation.save()
+            except IntegrityError as e:
+                logger.warning(f"Conflit de réservation - Voiture:{voiture.pk} {date_debut}->{date_fin}: {e}")
+                raise DatesIndisponibles() from e
+
+            transaction.on_commit(lambda: cls._poser_hold(reservation))
+
+        return reservation, devis
+
+    @staticmethod
+    def _poser_hold(reservation):
+        """
+        Pose le hold après commit. La réservation existe déjà et la contrainte
+        d'exclusion garantit l'absence de chevauchement : une panne Redis est
+        journalisée sans remonter jusqu'à la vue.
+        """
+        try:
+            HoldService.poser(reservation)
+        except Exception as e:
+            logger.error(f"Hold non posé - Réservation {reservation.pk}: {e}")
@@ -0,0 +1,114 @@
+import calendar
+import logging
+from datetime import date, timedelta
+from django.core.cache import cache
+from location.models import Reservation
+
+logger = logging.getLogger(__name__)
+
+
+class CalendarService:
+    """
+    Calendrier de disponibilité compact : un entier par mois et par voiture,
+    dont le bit (jour - 1) vaut 1 si le jour est occupé.
+
+    Chaque mois est mis en cache séparément ; une modification de réservation
+    n'invalide que les mois couverts par ses anciennes et nouvelles dates.
+    """
+
+    CACHE_KEY = 'calendrier:{voiture_id}:{annee}-{mois:02d}'
+    TIMEOUT = 60 * 60 * 24  # 24 heures
+    MAX_MOIS = 24
+
+    # Réservations confirmées et réservations en attente de paiement (tenues)
+    STATUTS_OCCUPES = ['confirme', 'attente_paiement']
+
+    @classmethod
+    def cache_key(cls, voiture_id, annee, mois):
+        return cls.CACHE_KEY.format(voiture_id=voiture_id, annee=annee, mois=mois)
+
+    @staticmethod
+    def mois_suivants(annee, mois, nombre):
+        """[(annee, mois), ...] à partir du mois donné"""
+        resultat = []
+        for i in range(nombre):
+            index = annee * 12 + (mois - 1) + i
+            resultat.append((index // 12, index % 12 + 1))
+        return resultat
+
+    @classmethod
+    def mois_couverts(cls, date_debut, date_fin):
+        """Mois touchés par la période [date_debut, date_fin)"""
+        dernier_jour = max(date_debut, date_fin - timedelta(days=1))
+        nombre = (dernier_jour.year - date_debut.year) * 12 + dernier_jour.month - date_debut.month + 1
+        return cls.mois_suivants(date_debut.year, date_debut.month, nombre)
+
+    @staticmethod
+    def _bitmap(periodes, annee, mois):
+        premier = date(annee, mois, 1)
+        nb_jours = calendar.monthrange(annee, mois)[1]
+        apres = premier + timedelta(days=nb_jours)
+        bitmap = 0
+        for date_debut, date_fin in periodes:
+            debut, fin = max(date_debut, premier), min(date_fin, apres)
+            if debut < fin:
+                # Bits (debut.day - 1) à (fin - 1).day - 1 inclus
+                longueur = (fin - debut).days
+                bitmap |= ((1 << longueur) - 1) << (debut.day - 1)
+        return bitmap
+
+    @classmethod
+    def bitmaps(cls, voiture_id, annee, mois, nombre=12):
+        """
+        Bitmaps de `nombre` mois consécutifs.
+        Les mois absents du cache sont calculés avec une seule requête.
+
+        Returns:
+            list: [{'mois': 'YYYY-MM', 'jours': int, 'occupes': int}, ...]
+        """
+        nombre = max(1, min(nombre, cls.MAX_MOIS))
+        liste_mois = cls.mois_suivants(annee, mois, nombre)
+        cles = {m: cls.cache_key(voiture_id, *m) for m in liste_mois}
+        en_cache = cache.get_many(list(cles.values()))
+
+        manquants = [m for m in liste_mois if cles[m] not in en_cache]
+        if manquants:
+            debut = date(manquants[0][0], manquants[0][1], 1)
+            dernier = manquants[-1]
+            fin = date(*dernier, 1) + timedelta(days=calendar.monthrange(*dernier)[1])
+            periodes = list(Reservation.objects.filter(
+                voiture_id=voiture_id,
+                statut__in=cls.STATUTS_OCCUPES,
+                date_debut__lt=fin,
+                date_fin__gt=debut,
+            ).values_list('date_debut', 'date_fin'))
+
+            nouveaux = {cles[m]: cls._bitmap(periodes, *m) for m in manquants}
+            cache.set_many(nouveaux, timeout=cls.TIMEOUT)
+            en_cache.update(nouveaux)
+
+        return [
+            {
+                'mois': f"{a}-{m:02d}",
+                'jours': calendar.monthrange(a, m)[1],
+                'occupes': en_cache[cles[(a, m)]],
+            }
+            for a, m in liste_mois
+        ]
+
+    @classmethod
+    def jours_occupes(cls, voiture_id, annee, mois):
+        """Liste des dates occupées d'un mois (décodage du bitmap)"""
+        bitmap = cls.bitmaps(voiture_id, annee, mois, 1)[0]['occupes']
+        nb_jours = calendar.monthrange(annee, mois)[1]
+        return [date(annee, mois, jour) for jour in range(1, nb_jours + 1) if bitmap >> (jour - 1) & 1]
+
+    @classmethod
+    def invalider(cls, voiture_id, date_debut, date_fin):
+        """Supprime du cache les mois couverts par une période"""
+        if not (voiture_id and date_debut and date_fin):
+            return
+        cache.delete_many([
+            cls.cache_key(voiture_id, annee, mois)
+            for annee, mois in cls.mois_couverts(date_debut, date_fin)
+        ])
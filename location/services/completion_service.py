@@ -0,0 +1,137 @@
+import logging
+import time
+from collections import Counter
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from location.models import Litige, Reservation
+from location.models.availability_models import CreneauOccupe
+from location.services.calendar_service import CalendarService
+from location.services.listing_cache_service import ListingCacheService
+from location.services.loyalty_service import LoyaltyService
+from location.services.trust_service import TrustService
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionService:
+    """
+    Passage en masse des locations finies de 'confirme' à 'termine'.
+
+    Remplace la cascade save() -> handle_caution -> save() -> signaux de confiance
+    et de fidélité par des opérations groupées sur les IDs concernés :
+    - transition : un UPDATE par lot (index partiel reservation_confirmee_fin)
+    - cautions : libérées par UPDATE, sauf litige ouvert ou en cours
+    - créneaux : suppression des CreneauOccupe des réservations terminées
+    - confiance : TrustService.update_trust_scores sur clients et propriétaires
+    - fidélité : RESERVATION_TERMINEE via LoyaltyService.add_activity_points_bulk
+
+    Les effets de bord d'un lot sont appliqués dans la transaction de sa
+    transition : un arrêt en cours de lot annule le lot entier, repris tel
+    quel au passage suivant. Seuls les caches sont invalidés après commit.
+    """
+
+    TAILLE_LOT = 1000
+    STATUTS_LITIGE_OUVERT = ['ouvert', 'en_cours']
+
+    @staticmethod
+    def terminees(date_limite=None):
+        """Réservations confirmées dont la période est passée (date_fin exclue)"""
+        return Reservation.objects.filter(
+            statut='confirme',
+            date_fin__lt=date_limite or timezone.now().date(),
+        )
+
+    @classmethod
+    def _lot(cls, date_limite, dernier_id, taille, durees):
+        """
+        Termine un lot de réservations (id croissant après dernier_id) et
+        applique ses effets de bord dans la même transaction.
+
+        Returns:
+            tuple: (lignes, cautions libérées) ; lignes :
+            (id, voiture_id, client_id, proprietaire_id, date_debut, date_fin, caution_paid)
+        """
+        with transaction.atomic():
+            debut = time.perf_counter()
+            lignes = list(
+                cls.terminees(date_limite).filter(id__gt=dernier_id).order_by('id')
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list(
+                    'id', 'voiture_id', 'client_id', 'voiture__proprietaire_id',
+                    'date_debut', 'date_fin', 'caution_paid'
+                )[:taille]
+            )
+            if lignes:
+                Reservation.objects.filter(id__in=[ligne[0] for ligne in lignes]).update(
+                    statut='termine', date_modification=timezone.now()
+                )
+            durees['transition'] += time.perf_counter() - debut
+            if not lignes:
+                return lignes, 0
+
+            ids = [ligne[0] for ligne in lignes]
+            etapes = [
+                ('cautions', lambda: cls._liberer_cautions(ids)),
+                ('creneaux', lambda: CreneauOccupe.objects.filter(reservation_id__in=ids).delete()),
+                ('confiance', lambda: TrustService.update_trust_scores(
+                    {ligne[2] for ligne in lignes} | {ligne[3] for ligne in lignes}
+                )),
+                ('fidelite', lambda: LoyaltyService.add_activity_points_bulk(
+                    'RESERVATION_TERMINEE', Counter(ligne[2] for ligne in lignes)
+                )),
+            ]
+            resultats = {}
+            for nom, etape in etapes:
+                debut = time.perf_counter()
+                resultats[nom] = etape()
+                durees[nom] += time.perf_counter() - debut
+        return lignes, resultats['cautions']
+
+    @classmethod
+    def _liberer_cautions(cls, ids):
+        """Même règle que handle_caution, sans les litiges non clos"""
+        return Reservation.objects.filter(id__in=ids, caution_paid__gt=0).exclude(
+            Exists(Litige.objects.filter(reservation=OuterRef('pk'), statut__in=cls.STATUTS_LITIGE_OUVERT))
+        ).update(caution_status='refunded')
+
+    @classmethod
+    def executer(cls, date_limite=None, taille_lot=None):
+        """
+        Termine toutes les locations finies avant date_limite (aujourd'hui par défaut).
+
+        Returns:
+            dict: {'terminees', 'lots', 'cautions', 'durees': {étape: secondes}}
+        """
+        taille_lot = taille_lot or cls.TAILLE_LOT
+        durees = Counter()
+        rapport = {'terminees': 0, 'lots': 0, 'cautions': 0}
+        dernier_id = 0
+
+        while True:
+            lot, cautions = cls._lot(date_limite, dernier_id, taille_lot, durees)
+            if not lot:
+                break
+            rapport['lots'] += 1
+            rapport['terminees'] += len(lot)
+            rapport['cautions'] += cautions
+            debut = time.perf_counter()
+            cls._invalider_caches(lot)
+            durees['caches'] += time.perf_counter() - debut
+            dernier_id = lot[-1][0]
+            if len(lot) < taille_lot:
+                break
+
+        rapport['durees'] = {nom: round(duree, 3) for nom, duree in durees.items()}
+        logger.info(
+            f"Fin de location : {rapport['terminees']} réservation(s) terminée(s) en {rapport['lots']} lot(s), "
+            f"{rapport['cautions']} caution(s) libérée(s) - "
+            + ", ".join(f"{nom} {duree}s" for nom, duree in rapport['durees'].items())
+        )
+        return rapport
+
+    @staticmethod
+    def _invalider_caches(lignes):
+        for _, voiture_id, _, _, date_debut, date_fin, _ in lignes:
+            CalendarService.invalider(voiture_id, date_debut, date_fin)
+        ListingCacheService.invalidate()
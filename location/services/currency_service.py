@@ -1,18 +1,54 @@
 from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
 from django.core.cache import cache
 from django.conf import settings
+from django.utils import timezone
 import requests
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+DEUX_DECIMALES = Decimal('0.01')
+
+
+class TauxIndisponibles(Exception):
+    """Aucune source n'a fourni de taux exploitables"""
+
+
+class TableTaux:
+    """
+    Taux figés d'un rafraîchissement, en unités de devise pour 1 XOF (Decimal).
+    Les facteurs de chaque paire (source, cible) sont précalculés : une
+    conversion se réduit à une recherche dans un dict et une multiplication.
+    """
+    __slots__ = ('taux', 'facteurs', 'date', 'expire')
+
+    def __init__(self, taux, date, ttl):
+        taux = {code: Decimal(str(valeur)) for code, valeur in taux.items()}
+        self.taux = MappingProxyType(taux)
+        self.facteurs = MappingProxyType({
+            (source, cible): taux[cible] / taux[source]
+            for source in taux for cible in taux
+        })
+        self.date = date
+        self.expire = time.monotonic() + ttl
+
+    @property
+    def version(self):
+        """Identifie le jeu de taux (date du rafraîchissement)"""
+        return self.date
+
+
 class CurrencyService:
     """
     Service complet de gestion des conversions de devises avec :
-    - Cache intelligent
-    - Fallback à une API secondaire
-    - Gestion robuste des erreurs
+    - Table de taux en mémoire du processus (TableTaux), relue dans le cache
+      partagé toutes les TTL_LOCAL secondes, jamais récupérée auprès des API
+      pendant une requête
+    - Rafraîchissement par la tâche Celery beat devises.rafraichir_taux
+    - Fallback à une API secondaire, puis à des taux par défaut
     - Historique des taux
     """
     
@@ -26,48 +62,122 @@ class CurrencyService:
         'GHS': {'name': 'Cedi Ghanéen', 'symbol': 'GH₵'}
     }
 
+    RATES_KEY = 'currency_rates_v3'
+    TTL_LOCAL = 60  # secondes avant relecture du cache partagé
+
+    # Ordres de grandeur (unités pour 1 XOF) si aucun taux n'a encore été récupéré ;
+    # XOF/EUR est fixe (1 EUR = 655,957 XOF)
+    DEFAULT_RATES = {
+        'XOF': '1',
+        'EUR': '0.00152449',
+        'USD': '0.00165',
+        'GBP': '0.00130',
+        'NGN': '2.55',
+        'GHS': '0.0205',
+    }
+
+    _table = None
+    _verrou = threading.Lock()
+
+    @classmethod
+    def table(cls):
+        """Table de taux courante du processus"""
+        table = cls._table
+        if table is None or time.monotonic() > table.expire:
+            table = cls._recharger(table)
+        return table
+
+    @classmethod
+    def _recharger(cls, actuelle):
+        """
+        Relit les taux publiés dans le cache partagé. Un seul thread recharge :
+        les autres continuent avec la table actuelle, même expirée.
+        """
+        if not cls._verrou.acquire(blocking=actuelle is None):
+            return actuelle
+        try:
+            if cls._table is not actuelle:
+                return cls._table
+            try:
+                publies = cache.get(cls.RATES_KEY)
+            except Exception as e:
+                logger.error(f"Lecture des taux en cache impossible: {str(e)}")
+                publies = None
+
+            if publies:
+                table = TableTaux(publies['rates'], publies['date'], cls.TTL_LOCAL)
+            elif actuelle is not None:
+                table = TableTaux(actuelle.taux, actuelle.date, cls.TTL_LOCAL)
+            else:
+                logger.warning("Aucun taux publié, taux par défaut utilisés")
+                defaut = getattr(settings, 'DEFAULT_CURRENCY_RATES', None) or cls.DEFAULT_RATES
+                table = TableTaux(defaut, 'defaut', cls.TTL_LOCAL)
+            cls._table = table
+            return table
+        finally:
+            cls._verrou.release()
+
+    @classmethod
+    def refresh_rates(cls):
+        """
+        Récupère les taux auprès des API, les publie dans le cache partagé et
+        remplace la table du processus (tâche devises.rafraichir_taux).
+
+        Returns:
+            TableTaux: La nouvelle table
+        Raises:
+            TauxIndisponibles: Si aucune source ne répond
+        """
+        try:
+            rates = cls._fetch_rates()
+            source = 'forex_python'
+        except TauxIndisponibles as e:
+            logger.warning(f"Erreur forex_python: {str(e)}")
+            rates = cls._get_fallback_rates()
+            source = 'exchangerate-api'
+
+        maintenant = timezone.now()
+        date = maintenant.isoformat()
+        cache.set(cls.RATES_KEY, {
+            'rates': {code: str(taux) for code, taux in rates.items()},
+            'date': date,
+        }, timeout=None)
+        cls._table = TableTaux(rates, date, cls.TTL_LOCAL)
+        cls._save_rates_history(rates, maintenant, source)
+        logger.info(f"Taux de change rafraîchis ({date})")
+        return cls._table
+
     @classmethod
     def get_rates(cls, force_update=False):
         """
-        Récupère les taux de change avec cache et fallback
+        Taux de change courants
         Args:
-            force_update (bool): Force une mise à jour des taux
+            force_update (bool): Récupère les taux auprès des API (hors requête web)
         Returns:
-            dict: Dictionnaire des taux {devise: taux}
+            dict: Dictionnaire des taux {devise: taux} (Decimal, unités pour 1 XOF)
         """
-        cache_key = 'currency_rates_v2'
-        rates = None if force_update else cache.get(cache_key)
-        
-        if not rates:
-            try:
-                rates = cls._fetch_rates()
-                cache.set(cache_key, rates, timeout=3600)  # 1 heure de cache
-                cls._save_rates_history(rates)  # Sauvegarde historique
-            except RatesNotAvailableError as e:
-                logger.warning(f"Erreur forex_python: {str(e)}")
-                rates = cache.get(cache_key, cls._get_fallback_rates())
-        
-        return rates
+        table = cls.refresh_rates() if force_update else cls.table()
+        return dict(table.taux)
 
     @classmethod
     def _fetch_rates(cls):
         """Récupère les taux depuis forex_python avec vérification"""
-        c = CurrencyRates()
-        base_currency = 'XOF'
-        
-        rates = {
-            'EUR': 1 / c.get_rate(base_currency, 'EUR'),
-            'USD': 1 / c.get_rate(base_currency, 'USD'),
-            'GBP': 1 / c.get_rate(base_currency, 'GBP'),
-            'NGN': c.get_rate('NGN', base_currency),
-            'GHS': c.get_rate('GHS', base_currency),
-            'XOF': 1.0  # Taux de référence
-        }
-        
+        try:
+            from forex_python.converter import CurrencyRates
+            c = CurrencyRates()
+            base_currency = 'XOF'
+            rates = {
+                code: Decimal(str(c.get_rate(base_currency, code)))
+                for code in cls.SUPPORTED_CURRENCIES if code != base_currency
+            }
+        except Exception as e:
+            raise TauxIndisponibles(str(e))
+        rates['XOF'] = Decimal('1')
+
         # Vérification de la cohérence des taux
         if any(rate <= 0 for rate in rates.values()):
-            raise RatesNotAvailableError("Taux de change invalides obtenus")
-            
+            raise TauxIndisponibles("Taux de change invalides obtenus")
+
         return rates
 
     @classmethod
@@ -78,31 +188,52 @@ class CurrencyService:
                 'https://api.exchangerate-api.com/v4/latest/XOF',
                 timeout=3
             )
+            response.raise_for_status()
             data = response.json()
-            return {
-                'EUR': data['rates']['EUR'],
-                'USD': data['rates']['USD'],
-                'GBP': data['rates']['GBP'],
-                'XOF': 1.0
+            rates = {
+                code: Decimal(str(data['rates'][code]))
+                for code in cls.SUPPORTED_CURRENCIES if code in data['rates']
             }
+            rates['XOF'] = Decimal('1')
+            return rates
         except Exception as e:
             logger.error(f"Erreur API fallback: {str(e)}")
-            return settings.DEFAULT_CURRENCY_RATES  # Valeurs par défaut dans settings.py
+            raise TauxIndisponibles(str(e))
 
     @classmethod
-    def _save_rates_history(cls, rates):
-        """Sauvegarde l'historique des taux pour analyse"""
-        from django.utils import timezone
-        from location.models import CurrencyRateHistory  # Modèle à créer
-        
+    def _save_rates_history(cls, rates, date, source=''):
+        """Sauvegarde l'historique des taux (conversions à date passée, RateHistoryService)"""
+        from location.models import CurrencyRateHistory
+
         try:
             CurrencyRateHistory.objects.create(
-                rates=rates,
-                date=timezone.now()
+                date=date,
+                rates={code: str(taux) for code, taux in rates.items()},
+                source=source
             )
         except Exception as e:
             logger.error(f"Erreur sauvegarde historique: {str(e)}")
 
+    @classmethod
+    def _facteur(cls, from_currency, to_currency):
+        """Facteur de conversion de la paire, depuis la table du processus"""
+        facteurs = cls.table().facteurs
+        try:
+            return facteurs[from_currency, to_currency]
+        except KeyError:
+            pass
+        # Codes en minuscules ou non supportés
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency not in cls.SUPPORTED_CURRENCIES:
+            raise ValueError(f"Devise source non supportée: {from_currency}")
+        if to_currency not in cls.SUPPORTED_CURRENCIES:
+            raise ValueError(f"Devise cible non supportée: {to_currency}")
+        try:
+            return facteurs[from_currency, to_currency]
+        except KeyError:
+            raise ValueError("Taux de change non disponibles pour la paire de devises")
+
     @classmethod
     def convert(cls, amount, from_currency, to_currency='XOF', round_result=True):
         """
@@ -117,40 +248,39 @@ class CurrencyService:
         Raises:
             ValueError: Si devise non supportée ou montant invalide
         """
-        # Validation des devises
-        from_currency = from_currency.upper()
-        to_currency = to_currency.upper()
-        
-        if from_currency not in cls.SUPPORTED_CURRENCIES:
-            raise ValueError(f"Devise source non supportée: {from_currency}")
-        if to_currency not in cls.SUPPORTED_CURRENCIES:
-            raise ValueError(f"Devise cible non supportée: {to_currency}")
-        
-        # Conversion du montant en Decimal
+        # Chemin rapide : table valide et codes déjà normalisés
+        table = cls._table
+        if table is None or time.monotonic() > table.expire:
+            table = cls._recharger(table)
+        facteur = table.facteurs.get((from_currency, to_currency))
+        if facteur is None:
+            facteur = cls._facteur(from_currency, to_currency)
+        if amount.__class__ is not Decimal:
+            try:
+                amount = Decimal(str(amount))
+            except InvalidOperation:
+                raise ValueError("Montant invalide pour la conversion")
+        converted = amount * facteur
+        return converted.quantize(DEUX_DECIMALES) if round_result else converted
+
+    @classmethod
+    def convert_many(cls, amounts, from_currency, to_currency='XOF', round_result=True):
+        """
+        Convertit une série de montants avec le même facteur (une seule
+        recherche de taux pour tout le lot)
+        Returns:
+            list: Montants convertis (Decimal), dans l'ordre
+        Raises:
+            ValueError: Si devise non supportée ou montant invalide
+        """
+        facteur = cls._facteur(from_currency, to_currency)
         try:
-            amount = Decimal(str(amount))
+            montants = [a if a.__class__ is Decimal else Decimal(str(a)) for a in amounts]
         except InvalidOperation:
             raise ValueError("Montant invalide pour la conversion")
-        
-        # Conversion directe si même devise
-        if from_currency == to_currency:
-            return amount.quantize(Decimal('0.01')) if round_result else amount
-        
-        # Récupération des taux
-        rates = cls.get_rates()
-        from_rate = rates.get(from_currency)
-        to_rate = rates.get(to_currency)
-        
-        if None in (from_rate, to_rate):
-            raise ValueError("Taux de change non disponibles pour la paire de devises")
-        
-        # Calcul de la conversion
-        try:
-            converted = (amount / from_rate) * to_rate
-            return converted.quantize(Decimal('0.01')) if round_result else converted
-        except Exception as e:
-            logger.error(f"Erreur conversion: {amount} {from_currency}->{to_currency}: {str(e)}")
-            raise ValueError("Erreur lors de la conversion des devises")
+        if round_result:
+            return [(montant * facteur).quantize(DEUX_DECIMALES) for montant in montants]
+        return [montant * facteur for montant in montants]
 
     @classmethod
     def format_currency(cls, amount, currency_code):
@@ -0,0 +1,187 @@
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+from location.models import Paiement, Reservation
+from location.services.calendar_service import CalendarService
+from location.services.hold_service import HoldService
+from location.services.listing_cache_service import ListingCacheService
+from location.services.loyalty_service import LoyaltyService
+from location.services.payment_reconciliation_service import PaymentReconciliationService
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirationService:
+    """
+    Annulation par lots des réservations restées en attente de paiement après
+    l'expiration de leur hold.
+
+    Les lignes sont lues par l'index partiel reservation_attente_creation, par
+    lots verrouillés (SKIP LOCKED : un paiement en cours n'est pas bloqué), puis
+    annulées par UPDATE. Les paiements EN_ATTENTE liés sont d'abord vérifiés
+    auprès du fournisseur (PaymentReconciliationService.verifier, avant la
+    prise des verrous) : un paiement réussi dont le webhook s'est perdu
+    confirme sa réservation au lieu de l'annuler, et une réservation dont le
+    paiement n'a pas pu être vérifié est reportée au passage suivant.
+    Les effets de bord sont appliqués au lot, sans save() ni signaux par ligne :
+    - paiements EN_ATTENTE liés -> ECHOUE
+    - points de fidélité RESERVATION_ANNULEE (LoyaltyService.add_activity_points_bulk)
+    - un e-mail par client (une seule connexion SMTP)
+    - invalidation des calendriers et des pages de résultats
+    """
+
+    TAILLE_LOT = 500
+
+    @staticmethod
+    def expirees():
+        """Réservations en attente créées avant le début de la durée d'un hold"""
+        return Reservation.objects.filter(
+            statut='attente_paiement',
+            date_creation__lte=timezone.now() - timedelta(seconds=HoldService.DUREE),
+        )
+
+    @classmethod
+    def _a_partir_de(cls, curseur):
+        queryset = cls.expirees().order_by('date_creation', 'id')
+        if curseur:
+            date_creation, pk = curseur
+            queryset = queryset.filter(
+                date_creation__gte=date_creation
+            ).exclude(date_creation=date_creation, id__lte=pk)
+        return queryset
+
+    @staticmethod
+    def _issue(paiement, verifies):
+        """'REUSSI', 'ECHOUE', ou None si le fournisseur n'a pas pu répondre"""
+        if paiement.methode not in PaymentReconciliationService.VERIFICATEURS:
+            return 'ECHOUE'
+        if paiement.id not in verifies:
+            return None
+        return 'REUSSI' if verifies[paiement.id][0] == 'REUSSI' else 'ECHOUE'
+
+    @classmethod
+    def _lot(cls, curseur, taille):
+        """
+        Annule un lot à partir du curseur (date_creation, id).
+
+        Returns:
+            tuple: (lignes annulées, nombre de réservations payées, nombre de
+            réservations reportées, nouveau curseur ou None si terminé)
+        """
+        queryset = cls._a_partir_de(curseur)
+
+        # Appels fournisseurs hors transaction : aucun verrou pendant les requêtes HTTP
+        paiements = list(Paiement.objects.filter(
+            reservation_id__in=list(queryset.values_list('id', flat=True)[:taille]),
+            statut='EN_ATTENTE'
+        ))
+        verifies = PaymentReconciliationService.verifier(paiements) if paiements else {}
+
+        with transaction.atomic():
+            lignes = list(queryset.select_for_update(skip_locked=True, of=('self',)).values_list(
+                'id', 'voiture_id', 'client_id', 'client__email', 'date_debut', 'date_fin', 'date_creation'
+            )[:taille])
+            if not lignes:
+                return [], 0, 0, None
+
+            # Un hold prolongé garde sa réservation
+            retenues = HoldService.reservations_retenues(ligne[1] for ligne in lignes)
+            candidates = [ligne for ligne in lignes if ligne[0] not in retenues]
+
+            en_attente = defaultdict(list)
+            for paiement in Paiement.objects.select_for_update().filter(
+                reservation_id__in=[ligne[0] for ligne in candidates], statut='EN_ATTENTE'
+            ):
+                en_attente[paiement.reservation_id].append(paiement)
+
+            annulees, payees, reportees = [], 0, 0
+            for ligne in candidates:
+                issues = {paiement.id: cls._issue(paiement, verifies) for paiement in en_attente[ligne[0]]}
+                if 'REUSSI' in issues.values():
+                    for paiement in en_attente[ligne[0]]:
+                        if issues[paiement.id] == 'REUSSI':
+                            PaymentReconciliationService.appliquer(paiement, 'REUSSI', verifies[paiement.id][1])
+                    payees += 1
+                elif None in issues.values():
+                    reportees += 1
+                else:
+                    annulees.append(ligne)
+
+            ids = [ligne[0] for ligne in annulees]
+            if ids:
+                Reservation.objects.filter(id__in=ids).update(statut='annule', date_modification=timezone.now())
+                Paiement.objects.filter(reservation_id__in=ids, statut='EN_ATTENTE').update(statut='ECHOUE')
+                LoyaltyService.add_activity_points_bulk(
+                    'RESERVATION_ANNULEE', Counter(ligne[2] for ligne in annulees)
+                )
+
+        dernier = lignes[-1]
+        suivant = (dernier[6], dernier[0]) if len(lignes) == taille else None
+        return annulees, payees, reportees, suivant
+
+    @staticmethod
+    def _notifier(annulees):
+        """Un e-mail par client pour l'ensemble de ses réservations expirées"""
+        par_client = defaultdict(list)
+        for reservation_id, _, _, email, date_debut, date_fin, _ in annulees:
+            if email:
+                par_client[email].append(f"- Réservation #{reservation_id} du {date_debut} au {date_fin}")
+
+        messages = [
+            (
+                "Réservation annulée faute de paiement",
+                "Bonjour,\n\nLe délai de paiement est dépassé, les réservations suivantes ont été annulées :\n"
+                + "\n".join(lignes),
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+            for email, lignes in par_client.items()
+        ]
+        if messages:
+            send_mass_mail(messages, fail_silently=True)
+
+    @classmethod
+    def executer(cls, taille_lot=None, lots_max=None):
+        """
+        Annule toutes les réservations expirées.
+
+        Returns:
+            dict: {'annulees', 'payees', 'reportees', 'lots', 'duree'}
+        """
+        taille_lot = taille_lot or cls.TAILLE_LOT
+        debut = time.perf_counter()
+        curseur, nb_lots, annulees, payees, reportees = None, 0, [], 0, 0
+
+        while True:
+            lot, lot_payees, lot_reportees, curseur = cls._lot(curseur, taille_lot)
+            nb_lots += 1
+            annulees.extend(lot)
+            payees += lot_payees
+            reportees += lot_reportees
+            if curseur is None or (lots_max and nb_lots >= lots_max):
+                break
+
+        if annulees:
+            for _, voiture_id, _, _, date_debut, date_fin, _ in annulees:
+                CalendarService.invalider(voiture_id, date_debut, date_fin)
+            ListingCacheService.invalidate()
+            cls._notifier(annulees)
+
+        rapport = {
+            'annulees': len(annulees),
+            'payees': payees,
+            'reportees': reportees,
+            'lots': nb_lots,
+            'duree': round(time.perf_counter() - debut, 3),
+        }
+        logger.info(
+            f"Expiration des réservations : {rapport['annulees']} annulée(s), "
+            f"{rapport['payees']} payée(s), {rapport['reportees']} reportée(s) "
+            f"en {rapport['lots']} lot(s), {rapport['duree']}s"
+        )
+        return rapport
@@ -0,0 +1,155 @@
+import difflib
+import logging
+import math
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from location.geo import (
+    EARTH_RADIUS_KM, covering_prefixes, geohash_encode, normalize_place_name, read_gazetteer
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GeoService:
+    """
+    Recherche géographique des véhicules sans service externe :
+    - résolution des noms de ville via le gazetteer local (modèle Ville)
+    - pré-filtrage par préfixes geohash (index) puis distance haversine exacte
+    """
+
+    # Tolérance aux fautes de frappe pour la résolution des villes
+    FUZZY_CUTOFF = 0.8
+
+    _gazetteer = None
+
+    @classmethod
+    def _load_gazetteer(cls):
+        """Charge le gazetteer en mémoire (quelques centaines de lignes au plus)"""
+        if cls._gazetteer is None:
+            from location.models.geo_models import Ville
+            par_nom, par_id = {}, {}
+            for ville in Ville.objects.values(
+                'id', 'nom', 'nom_normalise', 'alias', 'latitude', 'longitude', 'rayon_km'
+            ):
+                par_id[ville['id']] = ville
+                for alias in ville['alias'] or []:
+                    par_nom.setdefault(normalize_place_name(alias), ville)
+            # Les noms officiels priment sur les alias
+            for ville in par_id.values():
+                par_nom[ville['nom_normalise']] = ville
+            cls._gazetteer = {'par_nom': par_nom, 'par_id': par_id}
+        return cls._gazetteer
+
+    @classmethod
+    def reset_cache(cls):
+        cls._gazetteer = None
+
+    @classmethod
+    def charger_gazetteer(cls, path=None):
+        """Crée ou met à jour les villes depuis le jeu de données embarqué"""
+        from location.models.geo_models import Ville
+        rows = read_gazetteer(path) if path else read_gazetteer()
+        villes = {}
+        for row in rows:
+            villes[row['nom']], _ = Ville.objects.update_or_create(
+                nom_normalise=row['nom_normalise'],
+                defaults={
+                    'nom': row['nom'],
+                    'alias': row['alias'],
+                    'pays': row.get('pays', 'CI'),
+                    'latitude': row['latitude'],
+                    'longitude': row['longitude'],
+                    'rayon_km': row.get('rayon_km', 10),
+                }
+            )
+        for row in rows:
+            if row.get('parent') in villes:
+                Ville.objects.filter(pk=villes[row['nom']].pk).update(parent=villes[row['parent']])
+        cls.reset_cache()
+        return len(villes)
+
+    @classmethod
+    def localiser_voitures(cls, queryset=None):
+        """Rattache en masse les voitures existantes au gazetteer"""
+        from location.models.core_models import Voiture
+        queryset = queryset if queryset is not None else Voiture.objects.all()
+        voitures = list(queryset.only('id', 'ville', 'ville_ref', 'latitude', 'longitude', 'geohash'))
+        for voiture in voitures:
+            cls.localiser_voiture(voiture)
+        Voiture.objects.bulk_update(
+            voitures, ['ville_ref', 'latitude', 'longitude', 'geohash'], batch_size=500
+        )
+        return sum(1 for v in voitures if v.ville_ref_id)
+
+    @classmethod
+    def resoudre_ville(cls, nom):
+        """
+        Retourne l'entrée du gazetteer correspondant au nom saisi (ou None).
+        Recherche exacte sur le nom normalisé puis approchée (fautes de frappe).
+        """
+        cle = normalize_place_name(nom)
+        if not cle:
+            return None
+        par_nom = cls._load_gazetteer()['par_nom']
+        if cle in par_nom:
+            return par_nom[cle]
+        proches = difflib.get_close_matches(cle, par_nom.keys(), n=1, cutoff=cls.FUZZY_CUTOFF)
+        return par_nom[proches[0]] if proches else None
+
+    @classmethod
+    def localiser_voiture(cls, voiture):
+        """Renseigne ville_ref, coordonnées et geohash d'une voiture avant sauvegarde"""
+        ville = cls.resoudre_ville(voiture.ville)
+        if ville is not None and ville['id'] != voiture.ville_ref_id:
+            voiture.ville_ref_id = ville['id']
+            voiture.latitude = ville['latitude']
+            voiture.longitude = ville['longitude']
+        elif ville is not None and voiture.latitude is None:
+            voiture.latitude = ville['latitude']
+            voiture.longitude = ville['longitude']
+        elif ville is None and voiture.ville_ref_id is not None:
+            # La ville a changé pour un lieu inconnu : les anciennes coordonnées ne valent plus
+            voiture.ville_ref_id = None
+            voiture.latitude = voiture.longitude = None
+
+        if voiture.latitude is not None and voiture.longitude is not None:
+            voiture.geohash = geohash_encode(voiture.latitude, voiture.longitude)
+        else:
+            voiture.geohash = ''
+
+    @staticmethod
+    def distance_expression(latitude, longitude):
+        """Distance haversine (km) entre la voiture et le point, calculée en base"""
+        dlat = Radians(F('latitude') - Value(latitude))
+        dlon = Radians(F('longitude') - Value(longitude))
+        a = (
+            Power(Sin(dlat / 2), 2) +
+            Value(math.cos(math.radians(latitude))) * Cos(Radians(F('latitude'))) * Power(Sin(dlon / 2), 2)
+        )
+        return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+    @classmethod
+    def filtrer_rayon(cls, queryset, latitude, longitude, rayon_km):
+        """
+        Voitures à moins de `rayon_km` du point, annotées de `distance` (km).
+        Les préfixes geohash limitent le calcul exact aux cellules voisines.
+        """
+        prefixes = Q()
+        for prefix in covering_prefixes(latitude, longitude, rayon_km):
+            prefixes |= Q(geohash__startswith=prefix)
+        return queryset.filter(prefixes).annotate(
+            distance=cls.distance_expression(latitude, longitude)
+        ).filter(distance__lte=rayon_km)
+
+    @classmethod
+    def filtrer_ville(cls, queryset, nom, rayon_km=None):
+        """
+        Voitures autour d'une ville du gazetteer (rayon par défaut de la ville).
+        Retourne None si la ville est inconnue, pour laisser l'appelant choisir un repli.
+        """
+        ville = cls.resoudre_ville(nom)
+        if ville is None:
+            return None
+        return cls.filtrer_rayon(
+            queryset, ville['latitude'], ville['longitude'], rayon_km or ville['rayon_km']
+        )
@@ -0,0 +1,156 @@
+import logging
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from location.models import Reservation
+
+logger = logging.getLogger(__name__)
+
+
+class HoldService:
+    """
+    Blocages temporaires (holds) des voitures pendant le paiement.
+
+    Une réservation en attente de paiement ne bloque sa période que tant que
+    son hold existe dans Redis. Chaque voiture a une clé qui expire d'elle-même :
+        hold:voiture:{voiture_id} -> {reservation_id: [debut, fin, expiration]}
+    Un index (hold:voitures) liste les voitures ayant au moins un hold, pour que
+    la recherche n'interroge Redis qu'une fois.
+
+    Si Redis est indisponible, une réservation en attente reste considérée comme
+    bloquante pendant DUREE après sa création (date_creation).
+    """
+
+    DUREE = 60 * 15  # 15 minutes pour payer
+    CACHE_KEY = 'hold:voiture:{voiture_id}'
+    INDEX_KEY = 'hold:voitures'
+
+    @classmethod
+    def cache_key(cls, voiture_id):
+        return cls.CACHE_KEY.format(voiture_id=voiture_id)
+
+    @staticmethod
+    def _verrou(nom):
+        """Verrou Redis si le backend en fournit un (django_redis)"""
+        if hasattr(cache, 'lock'):
+            return cache.lock(f'{nom}:verrou', timeout=5, blocking_timeout=5)
+        return nullcontext()
+
+    @staticmethod
+    def _actifs(holds, maintenant=None):
+        maintenant = maintenant or time.time()
+        return {cle: valeur for cle, valeur in (holds or {}).items() if valeur[2] > maintenant}
+
+    @classmethod
+    def _ecrire_index(cls, voiture_id, expiration):
+        """Ajoute (expiration) ou retire (None) une voiture de l'index"""
+        with cls._verrou(cls.INDEX_KEY):
+            maintenant = time.time()
+            index = {cle: valeur for cle, valeur in (cache.get(cls.INDEX_KEY) or {}).items() if valeur > maintenant}
+            if expiration:
+                index[str(voiture_id)] = max(index.get(str(voiture_id), 0), expiration)
+            else:
+                index.pop(str(voiture_id), None)
+            if index:
+                cache.set(cls.INDEX_KEY, index, timeout=int(max(index.values()) - maintenant) + 1)
+            else:
+                cache.delete(cls.INDEX_KEY)
+
+    @classmethod
+    def poser(cls, reservation, duree=None):
+        """
+        Bloque la période d'une réservation en attente de paiement.
+
+        Returns:
+            float: Timestamp d'expiration du hold
+        """
+        duree = duree or cls.DUREE
+        key = cls.cache_key(reservation.voiture_id)
+        with cls._verrou(key):
+            holds = cls._actifs(cache.get(key))
+            expiration = time.time() + duree
+            holds[str(reservation.pk)] = [
+                reservation.date_debut.isoformat(), reservation.date_fin.isoformat(), expiration
+            ]
+            cache.set(key, holds, timeout=duree + 1)
+        cls._ecrire_index(reservation.voiture_id, expiration)
+        return expiration
+
+    @classmethod
+    def liberer(cls, reservation):
+        """Supprime le hold d'une réservation (payée, annulée ou supprimée)"""
+        key = cls.cache_key(reservation.voiture_id)
+        with cls._verrou(key):
+            holds = cls._actifs(cache.get(key))
+            if holds.pop(str(reservation.pk), None) is None:
+                return False
+            if holds:
+                expiration = max(valeur[2] for valeur in holds.values())
+                cache.set(key, holds, timeout=int(expiration - time.time()) + 1)
+            else:
+                cache.delete(key)
+        if not holds:
+            cls._ecrire_index(reservation.voiture_id, None)
+        return True
+
+    @classmethod
+    def holds(cls, voiture_id):
+        """{reservation_id: (date_debut, date_fin)} des holds actifs d'une voiture"""
+        return {
+            int(cle): (date.fromisoformat(debut), date.fromisoformat(fin))
+            for cle, (debut, fin, _) in cls._actifs(cache.get(cls.cache_key(voiture_id))).items()
+        }
+
+    @classmethod
+    def est_retenue(cls, reservation):
+        """Vrai si la réservation en attente bloque encore sa période"""
+        if reservation.statut != 'attente_paiement':
+            return False
+        if reservation.pk in cls.holds(reservation.voiture_id):
+            return True
+        return reservation.date_creation > timezone.now() - timedelta(seconds=cls.DUREE)
+
+    @classmethod
+    def voitures_retenues(cls, date_debut, date_fin):
+        """IDs des voitures ayant un hold actif qui chevauche [date_debut, date_fin)"""
+        maintenant = time.time()
+        index = cache.get(cls.INDEX_KEY) or {}
+        voiture_ids = [voiture_id for voiture_id, expiration in index.items() if expiration > maintenant]
+        if not voiture_ids:
+            return set()
+
+        keys = {cls.cache_key(voiture_id): int(voiture_id) for voiture_id in voiture_ids}
+        debut, fin = date_debut.isoformat(), date_fin.isoformat()
+        return {
+            keys[key]
+            for key, holds in cache.get_many(list(keys)).items()
+            if any(
+                h_debut < fin and h_fin > debut
+                for h_debut, h_fin, _ in cls._actifs(holds, maintenant).values()
+            )
+        }
+
+    @classmethod
+    def reservations_retenues(cls, voiture_ids):
+        """IDs des réservations ayant un hold actif parmi ces voitures (une lecture Redis)"""
+        keys = [cls.cache_key(voiture_id) for voiture_id in set(voiture_ids)]
+        if not keys:
+            return set()
+        return {
+            int(reservation_id)
+            for holds in cache.get_many(keys).values()
+            for reservation_id in cls._actifs(holds)
+        }
+
+    @classmethod
+    def reservations_expirees(cls, queryset=None):
+        """Réservations en attente de paiement dont le hold a expiré"""
+        queryset = (queryset if queryset is not None else Reservation.objects.all()).filter(
+            statut='attente_paiement',
+            date_creation__lte=timezone.now() - timedelta(seconds=cls.DUREE),
+        )
+        lignes = list(queryset.values_list('id', 'voiture_id'))
+        retenues = cls.reservations_retenues(voiture_id for _, voiture_id in lignes)
+        return [reservation_id for reservation_id, _ in lignes if reservation_id not in retenues]
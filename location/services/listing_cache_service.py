@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class ListingCacheService:
+    """
+    Cache des pages de résultats (liste et recherche de voitures).
+
+    Chaque entrée stocke les IDs de la page et le total du paginateur sous une
+    clé qui inclut un compteur de génération. Toute modification d'une Voiture
+    ou d'une Réservation incrémente ce compteur : les anciennes clés ne sont
+    plus jamais lues et expirent d'elles-mêmes.
+    """
+
+    GENERATION_KEY = 'listing_cache_generation'
+    HITS_KEY = 'listing_cache_hits'
+    MISSES_KEY = 'listing_cache_misses'
+    TIMEOUT = 60 * 10  # 10 minutes
+
+    # Paramètres GET qui influencent le résultat
+    FILTER_KEYS = [
+        'ville', 'prix_min', 'prix_max', 'transmission', 'type_vehicule',
+        'climatisation', 'date_debut', 'date_fin', 'q', 'lat', 'lon', 'rayon',
+        'tri', 'avec_chauffeur', 'page'
+    ]
+
+    @classmethod
+    def generation(cls):
+        """Génération courante (initialisée à 1 si absente)"""
+        generation = cache.get(cls.GENERATION_KEY)
+        if generation is None:
+            cache.add(cls.GENERATION_KEY, 1, timeout=None)
+            generation = cache.get(cls.GENERATION_KEY, 1)
+        return generation
+
+    @classmethod
+    def invalidate(cls):
+        """Passe à la génération suivante (invalide toutes les pages)"""
+        try:
+            return cache.incr(cls.GENERATION_KEY)
+        except ValueError:
+            cache.set(cls.GENERATION_KEY, 2, timeout=None)
+            return 2
+
+    @classmethod
+    def normalize_filters(cls, params):
+        """Réduit les paramètres GET à un dictionnaire canonique"""
+        filters = {}
+        for key in cls.FILTER_KEYS:
+            value = (params.get(key) or '').strip()
+            if key in ('ville', 'q'):
+                value = ' '.join(value.lower().split())
+            if value and not (key == 'page' and value == '1'):
+                filters[key] = value
+        return filters
+
+    @classmethod
+    def make_key(cls, view_name, params):
+        filters = cls.normalize_filters(params)
+        digest = hashlib.md5(
+            json.dumps(filters, sort_keys=True).encode()
+        ).hexdigest()
+        return f"listing:{view_name}:g{cls.generation()}:{digest}"
+
+    @classmethod
+    def get(cls, key):
+        """Retourne {'ids', 'count', 'number'} ou None, et compte hit/miss"""
+        entry = cache.get(key)
+        cls._increment(cls.HITS_KEY if entry is not None else cls.MISSES_KEY)
+        return entry
+
+    @classmethod
+    def set(cls, key, ids, count, number):
+        cache.set(key, {'ids': list(ids), 'count': count, 'number': number}, timeout=cls.TIMEOUT)
+
+    @classmethod
+    def stats(cls):
+        """Compteurs pour dimensionner le cache Redis"""
+        hits = cache.get(cls.HITS_KEY, 0)
+        misses = cache.get(cls.MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'generation': cls.generation(),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        cache.delete_many([cls.HITS_KEY, cls.MISSES_KEY])
+
+    @staticmethod
+    def _increment(key):
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
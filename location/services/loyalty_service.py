@@ -1,7 +1,9 @@
 from django.db import transaction
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import F
+from collections import defaultdict
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 from location.models import LoyaltyProfile, UserReward, Reward
 
 class LoyaltyService:
@@ -103,6 +105,78 @@ class LoyaltyService:
             description=description
         )
 
+    @staticmethod
+    @transaction.atomic
+    def add_activity_points_bulk(activity_type, counts_by_user):
+        """
+        Applique une activité à plusieurs utilisateurs en quelques UPDATE
+        (un par nombre d'occurrences), sans save() ni signaux par profil.
+        Le solde ne descend pas sous 0 et le niveau est recalculé dans la même requête.
+
+        Différences avec add_points :
+        - les badges de paliers (BADGE_TIERS) sont attribués en un bulk_update ;
+          les badges spéciaux, qui ne dépendent que du parrainage, ne sont pas
+          réévalués
+        - aucune entrée n'est écrite par record_activity
+
+        Args:
+            activity_type: Type d'activité (voir ACTIVITY_POINTS)
+            counts_by_user: {user_id: nombre d'occurrences}
+
+        Returns:
+            int: Nombre de profils mis à jour
+        """
+        points = LoyaltyService.ACTIVITY_POINTS.get(activity_type, 0)
+        if points == 0 or not counts_by_user:
+            return 0
+
+        if points > 0:
+            existing = set(LoyaltyProfile.objects.filter(
+                user_id__in=counts_by_user
+            ).values_list('user_id', flat=True))
+            LoyaltyProfile.objects.bulk_create(
+                [LoyaltyProfile(user_id=user_id, points=0, level='BRONZE', badges=[], special_badges=[])
+                 for user_id in counts_by_user if user_id not in existing],
+                ignore_conflicts=True
+            )
+
+        users_by_count = defaultdict(list)
+        for user_id, count in counts_by_user.items():
+            users_by_count[count].append(user_id)
+
+        updated = 0
+        for count, user_ids in users_by_count.items():
+            delta = points * count
+            updated += LoyaltyProfile.objects.filter(user_id__in=user_ids).update(
+                points=Greatest(F('points') + delta, Value(0)),
+                # Mêmes seuils que LoyaltyProfile.update_level, appliqués au nouveau solde
+                level=Case(
+                    When(points__gte=2000 - delta, then=Value('GOLD')),
+                    When(points__gte=500 - delta, then=Value('SILVER')),
+                    default=Value('BRONZE'),
+                ),
+                last_updated=timezone.now()
+            )
+
+        LoyaltyService._check_badges_bulk(counts_by_user)
+        return updated
+
+    @staticmethod
+    def _check_badges_bulk(user_ids):
+        """Badges de paliers de LoyaltyProfile.check_badges, pour plusieurs profils en deux requêtes"""
+        profiles = list(LoyaltyProfile.objects.filter(user_id__in=user_ids).only('id', 'points', 'badges'))
+        to_update = []
+        for profile in profiles:
+            new_badges = [
+                badge_code for badge_code, tier in LoyaltyProfile.BADGE_TIERS.items()
+                if tier['min'] <= profile.points <= tier['max'] and badge_code not in profile.badges
+            ]
+            if new_badges:
+                profile.badges = profile.badges + new_badges
+                to_update.append(profile)
+        LoyaltyProfile.objects.bulk_update(to_update, ['badges'])
+        return len(to_update)
+
     @staticmethod
     def record_activity(user, activity_type, points, description=None):
         """
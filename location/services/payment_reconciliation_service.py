@@ -0,0 +1,286 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from location.models import Paiement, Reservation
+from location.payments.http_client import ProviderClient
+from location.payments.paypal_auth import PaypalTokenManager
+
+logger = logging.getLogger(__name__)
+
+
+class LimiteurDebit:
+    """Espace les appels d'un fournisseur pour ne pas dépasser `debit` requêtes/seconde"""
+
+    def __init__(self, debit):
+        self.intervalle = 1.0 / debit if debit else 0
+        self.prochain = 0.0
+        self.verrou = threading.Lock()
+
+    def attendre(self):
+        if not self.intervalle:
+            return
+        with self.verrou:
+            maintenant = time.monotonic()
+            depart = max(self.prochain, maintenant)
+            self.prochain = depart + self.intervalle
+        if depart > maintenant:
+            time.sleep(depart - maintenant)
+
+
+class PaymentReconciliationService:
+    """
+    Vérification auprès des fournisseurs des paiements restés EN_ATTENTE.
+
+    Les paiements sont lus par lots ordonnés par id ; le dernier id traité est
+    conservé en cache pour qu'une exécution interrompue (budget de temps écoulé)
+    reprenne là où elle s'est arrêtée. Dans un lot, les appels HTTP sont répartis
+    par fournisseur sur un pool de threads borné (LIMITES), via le client partagé
+    du fournisseur (ProviderClient) et avec un débit maximal par fournisseur.
+    Les écritures en base restent dans le thread appelant.
+    """
+
+    TAILLE_LOT = 200
+    # En deçà du hold (HoldService.DUREE) : un paiement réussi est rapproché avant que sa réservation expire
+    ANCIENNETE = timedelta(minutes=10)
+    CURSEUR_KEY = 'paiements_en_attente:curseur'
+
+    # Appels simultanés et requêtes/seconde par fournisseur
+    LIMITES = {
+        'ORANGE': {'concurrence': 8, 'debit': 20},
+        'WAVE': {'concurrence': 8, 'debit': 20},
+        'PAYPAL': {'concurrence': 4, 'debit': 10},
+        'STRIPE': {'concurrence': 8, 'debit': 25},
+    }
+
+    @classmethod
+    def limites(cls, methode):
+        """LIMITES surchargées par settings.PAYMENT_VERIFICATION_LIMITS"""
+        limites = dict(cls.LIMITES.get(methode, {'concurrence': 1, 'debit': 0}))
+        limites.update(getattr(settings, 'PAYMENT_VERIFICATION_LIMITS', {}).get(methode, {}))
+        return limites
+
+    # --- Appels fournisseurs : (nouveau statut ou None, réponse) ---------------
+
+    @classmethod
+    def statut_orange(cls, client, paiement):
+        response = client.post(
+            f"{settings.ORANGE_MONEY_API_URL}/verify",
+            json={'transaction_id': paiement.transaction_id},
+            headers={'Authorization': f'Bearer {settings.ORANGE_MONEY_API_KEY}'},
+            idempotent=True
+        )
+        response.raise_for_status()
+        data = response.json()
+        return ('REUSSI' if data.get('status') == 'SUCCESS' else None), data
+
+    @classmethod
+    def statut_wave(cls, client, paiement):
+        response = client.get(
+            f"{settings.WAVE_API_URL}/transactions/{paiement.transaction_id}",
+            headers={'Authorization': f'Bearer {settings.WAVE_API_KEY}'}
+        )
+        response.raise_for_status()
+        data = response.json()
+        return ('REUSSI' if data.get('status') == 'completed' else None), data
+
+    @classmethod
+    def statut_paypal(cls, client, paiement):
+        response = PaypalTokenManager.requete(
+            'GET', f"{settings.PAYPAL_API_URL}/v2/checkout/orders/{paiement.transaction_id}"
+        )
+        response.raise_for_status()
+        data = response.json()
+        return ('REUSSI' if data.get('status') == 'COMPLETED' else None), data
+
+    @classmethod
+    def statut_stripe(cls, client, paiement):
+        import stripe
+        stripe.api_key = settings.STRIPE_API_KEY
+        payment_intent = stripe.PaymentIntent.retrieve(paiement.transaction_id)
+        return ('REUSSI' if payment_intent.status == 'succeeded' else None), payment_intent
+
+    VERIFICATEURS = {
+        'ORANGE': 'statut_orange',
+        'WAVE': 'statut_wave',
+        'PAYPAL': 'statut_paypal',
+        'STRIPE': 'statut_stripe',
+    }
+
+    @classmethod
+    def verifier(cls, paiements):
+        """
+        Interroge les fournisseurs en parallèle (aucun accès à la base).
+
+        Returns:
+            dict: {paiement_id: (statut ou None, réponse)} ; les erreurs sont
+            journalisées et le paiement est absent du résultat
+        """
+        par_methode = {}
+        for paiement in paiements:
+            if paiement.methode in cls.VERIFICATEURS:
+                par_methode.setdefault(paiement.methode, []).append(paiement)
+
+        resultats, executeurs, futures = {}, [], {}
+        try:
+            for methode, lot in par_methode.items():
+                limites = cls.limites(methode)
+                client = ProviderClient.pour(methode)
+                limiteur = LimiteurDebit(limites['debit'])
+                if methode == 'PAYPAL':
+                    try:
+                        # Token en cache partagé avant la répartition sur les threads
+                        PaypalTokenManager.obtenir()
+                    except requests.RequestException as e:
+                        logger.error(f"Token PayPal indisponible, {len(lot)} paiement(s) reporté(s): {e}")
+                        continue
+
+                verificateur = getattr(cls, cls.VERIFICATEURS[methode])
+                executeur = ThreadPoolExecutor(max_workers=limites['concurrence'], thread_name_prefix=f'verif-{methode}')
+                executeurs.append(executeur)
+
+                def appel(paiement, verificateur=verificateur, client=client, limiteur=limiteur):
+                    limiteur.attendre()
+                    return verificateur(client, paiement)
+
+                for paiement in lot:
+                    futures[executeur.submit(appel, paiement)] = paiement
+
+            for future in as_completed(futures):
+                paiement = futures[future]
+                try:
+                    resultats[paiement.id] = future.result()
+                except Exception as e:
+                    logger.error(f"Erreur vérification paiement {paiement.id}: {str(e)}")
+        finally:
+            for executeur in executeurs:
+                executeur.shutdown(wait=True)
+        return resultats
+
+    @staticmethod
+    def confirmer_reservation(paiement):
+        """
+        Confirme la réservation d'un paiement réussi (paiement verrouillé par
+        l'appelant, qui l'enregistre ensuite). Une réservation annulée entre-temps
+        (expiration) ou dont la période a été reprise n'est pas reconfirmée : le
+        paiement est signalé à rembourser dans metadata['a_rembourser'].
+
+        Returns:
+            bool: Vrai si la réservation est confirmée
+        """
+        reservation = Reservation.objects.select_for_update().get(pk=paiement.reservation_id)
+        paiement.reservation = reservation
+        if reservation.statut in ('confirme', 'termine'):
+            return True
+
+        motif = f"Réservation {reservation.pk} {reservation.get_statut_display().lower()}"
+        if reservation.statut == 'attente_paiement':
+            try:
+                with transaction.atomic():
+                    reservation.statut = 'confirme'
+                    reservation.save()
+                return True
+            except IntegrityError:
+                reservation.statut = 'attente_paiement'
+                motif = f"Période de la réservation {reservation.pk} reprise par une autre réservation"
+
+        paiement.metadata = {**(paiement.metadata or {}), 'a_rembourser': motif}
+        logger.error(f"Paiement {paiement.pk} réussi sans réservation à confirmer : {motif}")
+        return False
+
+    @classmethod
+    def appliquer(cls, paiement, statut, reponse=None):
+        """
+        Applique le statut vérifié et confirme la réservation. Le paiement est
+        relu sous verrou : un webhook appliqué entre-temps n'est pas écrasé.
+
+        Returns:
+            bool: Vrai si le paiement était encore EN_ATTENTE et a été mis à jour
+        """
+        with transaction.atomic():
+            verrouille = Paiement.objects.select_for_update().filter(pk=paiement.pk, statut='EN_ATTENTE').first()
+            if verrouille is None:
+                return False
+            verrouille.statut = statut
+            verrouille.reponse_api = reponse or {}
+            if statut == 'REUSSI':
+                cls.confirmer_reservation(verrouille)
+            verrouille.save()
+
+        paiement.statut = verrouille.statut
+        paiement.reponse_api = verrouille.reponse_api
+        paiement.metadata = verrouille.metadata
+        return True
+
+    @classmethod
+    def en_attente(cls):
+        return Paiement.objects.filter(
+            statut='EN_ATTENTE',
+            date_creation__lt=timezone.now() - cls.ANCIENNETE
+        )
+
+    @classmethod
+    def executer(cls, budget=None, taille_lot=None, depuis_id=None, lots_max=None):
+        """
+        Vérifie les paiements en attente par lots d'id croissant.
+
+        Args:
+            budget: Durée maximale en secondes ; au-delà, le curseur est
+                conservé et la prochaine exécution reprend au lot suivant
+            depuis_id: Force le point de départ (sinon curseur en cache)
+            lots_max: Nombre maximal de lots pour cette exécution
+
+        Returns:
+            dict: {'verifies', 'reussis', 'erreurs', 'lots', 'duree', 'termine'}
+        """
+        taille_lot = taille_lot or cls.TAILLE_LOT
+        debut = time.monotonic()
+        curseur = depuis_id if depuis_id is not None else (cache.get(cls.CURSEUR_KEY) or 0)
+        rapport = {'verifies': 0, 'reussis': 0, 'erreurs': 0, 'lots': 0, 'termine': False}
+
+        while True:
+            if (budget and time.monotonic() - debut > budget) or (lots_max and rapport['lots'] >= lots_max):
+                break
+            lot = list(
+                cls.en_attente().filter(id__gt=curseur).select_related('reservation').order_by('id')[:taille_lot]
+            )
+            if not lot:
+                rapport['termine'] = True
+                break
+
+            resultats = cls.verifier(lot)
+            for paiement in lot:
+                if paiement.id not in resultats:
+                    rapport['erreurs'] += paiement.methode in cls.VERIFICATEURS
+                    continue
+                statut, reponse = resultats[paiement.id]
+                rapport['verifies'] += 1
+                if not statut:
+                    continue
+                try:
+                    if cls.appliquer(paiement, statut, reponse):
+                        rapport['reussis'] += 1
+                except Exception as e:
+                    # Une ligne en erreur n'interrompt pas le lot
+                    logger.error(f"Erreur d'application du paiement {paiement.id}: {str(e)}")
+                    rapport['erreurs'] += 1
+
+            rapport['lots'] += 1
+            curseur = lot[-1].id
+            cache.set(cls.CURSEUR_KEY, curseur, timeout=None)
+
+        if rapport['termine']:
+            cache.delete(cls.CURSEUR_KEY)
+        rapport['duree'] = round(time.monotonic() - debut, 3)
+        logger.info(
+            f"Vérification des paiements en attente : {rapport['verifies']} vérifié(s), "
+            f"{rapport['reussis']} réussi(s), {rapport['erreurs']} erreur(s) en {rapport['lots']} lot(s), "
+            f"{rapport['duree']}s{'' if rapport['termine'] else ' (reprise au prochain passage)'}"
+        )
+        return rapport
@@ -0,0 +1,335 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from location.models import LotVirement, Portefeuille, Transaction, Virement
+from location.payments.payouts import VirementRefuse
+from location.services.payment_reconciliation_service import LimiteurDebit
+from location.services.wallet_service import WalletService
+
+logger = logging.getLogger(__name__)
+
+
+class PayoutService:
+    """
+    Versement par lots des demandes de retrait en attente.
+
+    1. preparer() : par fournisseur, réserve un lot de demandes (verrou
+       SKIP LOCKED) et débite les portefeuilles en une transaction : verrou
+       des portefeuilles, contrôle des soldes, puis bulk_update des soldes et
+       des demandes, numérotées au journal comme toute écriture.
+    2. envoyer() : verrouille le lot (un seul passage l'envoie), soumet ses
+       virements au fournisseur (FournisseurVirement) sur un pool de threads
+       borné, sans accès à la base, puis enregistre tous les résultats. Seul
+       un refus définitif (VirementRefuse) recrédite le portefeuille par une
+       écriture de remboursement. Après MAX_TENTATIVES erreurs temporaires,
+       l'issue reste inconnue (le fournisseur a pu payer) : le virement passe
+       'a_verifier', sans remboursement, jusqu'à renvoyer().
+    3. Les notifications partent après commit (tâche virements.notifier).
+
+    Tout l'état est en base : après un arrêt, executer() reprend les lots
+    'debite' et renvoie leurs virements 'a_envoyer' avec la même référence
+    (clé d'idempotence), sans double paiement.
+    """
+
+    TAILLE_LOT = 200
+    MAX_TENTATIVES = 5
+    FOURNISSEUR_DEFAUT = 'orange'
+
+    FOURNISSEURS = {
+        'orange': 'location.payments.payouts.OrangeMoneyVirement',
+        'wave': 'location.payments.payouts.WaveVirement',
+    }
+
+    @classmethod
+    def fournisseur(cls, code):
+        """Implémentation du fournisseur, surchargée par settings.PAYOUT_PROVIDERS"""
+        chemins = {**cls.FOURNISSEURS, **getattr(settings, 'PAYOUT_PROVIDERS', {})}
+        return import_string(chemins[code])()
+
+    @classmethod
+    def demandes(cls, fournisseur):
+        """Demandes de retrait en attente, pas encore prises dans un lot"""
+        methode = Q(payment_method=fournisseur)
+        if fournisseur == cls.FOURNISSEUR_DEFAUT:
+            methode |= Q(payment_method__isnull=True) | Q(payment_method='')
+        return Transaction.objects.filter(
+            methode,
+            type_transaction='retrait',
+            statut='en_attente',
+            portefeuille__isnull=False,
+            virement__isnull=True
+        )
+
+    @classmethod
+    def preparer(cls, fournisseur, taille_lot=None):
+        """
+        Réserve un lot de demandes et débite les portefeuilles (une transaction).
+        Une demande que le solde ne couvre pas, ou sans numéro de téléphone,
+        est rejetée.
+
+        Returns:
+            tuple: (LotVirement ou None s'il n'y a rien à verser, nombre de rejets)
+        """
+        with transaction.atomic():
+            demandes = list(
+                cls.demandes(fournisseur)
+                .select_related('user')
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')[:taille_lot or cls.TAILLE_LOT]
+            )
+            if not demandes:
+                return None, 0
+
+            # Ordre des pk : pas d'interblocage avec un autre lot
+            portefeuilles = {
+                portefeuille.pk: portefeuille
+                for portefeuille in Portefeuille.objects.select_for_update()
+                .filter(pk__in={demande.portefeuille_id for demande in demandes}).order_by('pk')
+            }
+            lot = LotVirement.objects.create(fournisseur=fournisseur)
+            maintenant = timezone.now()
+            virements, rejets = [], 0
+
+            for demande in demandes:
+                montant = abs(demande.montant)
+                portefeuille = portefeuilles[demande.portefeuille_id]
+                destinataire = (demande.metadata or {}).get('telephone') or demande.user.phone or ''
+                if not destinataire:
+                    motif = "Numéro de téléphone manquant"
+                elif portefeuille.solde < montant:
+                    motif = "Solde insuffisant"
+                else:
+                    motif = ''
+
+                if motif:
+                    demande.statut = 'rejete'
+                    demande.motif_rejet = motif
+                    rejets += 1
+                else:
+                    portefeuille.solde -= montant
+                    portefeuille.nb_ecritures += 1
+                    demande.statut = 'valide'
+                    demande.montant = -montant
+                    demande.numero = portefeuille.nb_ecritures
+                    demande.solde_apres = portefeuille.solde
+                    lot.nb_virements += 1
+                    lot.montant_total += montant
+                demande.date_traitement = maintenant
+                demande.date_mise_a_jour = maintenant
+                virements.append(Virement(
+                    lot=lot,
+                    transaction=demande,
+                    montant=montant,
+                    destinataire=destinataire,
+                    statut='rejete' if motif else 'a_envoyer',
+                    erreur=motif
+                ))
+
+            Portefeuille.objects.bulk_update(portefeuilles.values(), ['solde', 'nb_ecritures'])
+            Transaction.objects.bulk_update(
+                demandes, ['statut', 'montant', 'numero', 'solde_apres', 'motif_rejet', 'date_traitement', 'date_mise_a_jour']
+            )
+            Virement.objects.bulk_create(virements)
+            if not lot.nb_virements:
+                lot.statut = 'termine'
+                lot.date_fin = maintenant
+            lot.save()
+            if rejets:
+                cls._planifier_notifications(lot.pk)
+
+        logger.info(
+            f"Lot {lot.pk} {fournisseur} : {lot.nb_virements} virement(s), "
+            f"{lot.montant_total} XOF, {rejets} rejet(s)"
+        )
+        return lot, rejets
+
+    @classmethod
+    def soumettre(cls, fournisseur, virements):
+        """
+        Envoie les virements au fournisseur en parallèle (aucun accès à la base).
+
+        Returns:
+            dict: {virement_id: ('envoye', référence) | ('echoue', motif) | ('erreur', message)}
+        """
+        resultats = {}
+        if not virements:
+            return resultats
+        implementation = cls.fournisseur(fournisseur)
+        limiteur = LimiteurDebit(implementation.debit)
+
+        def appel(virement):
+            limiteur.attendre()
+            return implementation.envoyer(virement)
+
+        with ThreadPoolExecutor(
+            max_workers=implementation.concurrence, thread_name_prefix=f'virement-{fournisseur}'
+        ) as executeur:
+            futures = {executeur.submit(appel, virement): virement for virement in virements}
+            for future in as_completed(futures):
+                virement = futures[future]
+                try:
+                    resultats[virement.id] = ('envoye', future.result() or '')
+                except VirementRefuse as e:
+                    resultats[virement.id] = ('echoue', str(e))
+                except Exception as e:
+                    logger.warning(f"Virement {virement.reference} : erreur temporaire ({e})")
+                    resultats[virement.id] = ('erreur', str(e))
+        return resultats
+
+    @classmethod
+    def enregistrer(cls, lot_id, resultats):
+        """
+        Enregistre les résultats d'envoi d'un lot (une transaction). Seuls les
+        virements encore 'a_envoyer' sont mis à jour : un passage concurrent
+        sur le même lot ne recrédite pas deux fois.
+
+        Returns:
+            dict: {'envoyes', 'echoues', 'reportes', 'a_verifier'}
+        """
+        rapport = {'envoyes': 0, 'echoues': 0, 'reportes': 0, 'a_verifier': 0}
+        with transaction.atomic():
+            lot = LotVirement.objects.select_for_update().get(pk=lot_id)
+            virements = list(
+                lot.virements.filter(statut='a_envoyer', id__in=list(resultats))
+                .select_related('transaction__portefeuille')
+            )
+            maintenant = timezone.now()
+            for virement in virements:
+                issue, detail = resultats[virement.id]
+                virement.tentatives += 1
+                if issue == 'envoye':
+                    virement.statut = 'envoye'
+                    virement.reference_fournisseur = detail
+                    virement.erreur = ''
+                    virement.date_envoi = maintenant
+                    rapport['envoyes'] += 1
+                elif issue == 'echoue':
+                    virement.statut = 'echoue'
+                    virement.erreur = detail
+                    WalletService.ecrire(
+                        virement.transaction.portefeuille, virement.montant, 'remboursement',
+                        f"RMB-VIR-{virement.reference.hex}"
+                    )
+                    rapport['echoues'] += 1
+                elif virement.tentatives >= cls.MAX_TENTATIVES:
+                    # Issue inconnue : pas de remboursement, le fournisseur a pu payer
+                    virement.statut = 'a_verifier'
+                    virement.erreur = detail
+                    logger.error(
+                        f"Virement {virement.reference} : issue inconnue après "
+                        f"{virement.tentatives} tentatives ({detail}), à vérifier"
+                    )
+                    rapport['a_verifier'] += 1
+                else:
+                    virement.erreur = detail
+                    rapport['reportes'] += 1
+
+            Virement.objects.bulk_update(
+                virements, ['statut', 'reference_fournisseur', 'tentatives', 'erreur', 'date_envoi']
+            )
+            if not lot.virements.filter(statut='a_envoyer').exists():
+                lot.statut = 'termine'
+                lot.date_fin = maintenant
+                lot.save(update_fields=['statut', 'date_fin'])
+            if rapport['envoyes'] or rapport['echoues']:
+                cls._planifier_notifications(lot.pk)
+        return rapport
+
+    @classmethod
+    def envoyer(cls, lot):
+        """
+        Soumet les virements 'a_envoyer' du lot et enregistre les résultats.
+        Le lot reste verrouillé pendant l'envoi (SKIP LOCKED) : deux passages
+        qui se chevauchent ne soumettent pas le même lot.
+
+        Returns:
+            dict: Rapport d'enregistrer(), ou None si le lot est pris ou terminé
+        """
+        with transaction.atomic():
+            if LotVirement.objects.select_for_update(skip_locked=True).filter(pk=lot.pk, statut='debite').first() is None:
+                return None
+            virements = list(lot.virements.filter(statut='a_envoyer').order_by('id'))
+            return cls.enregistrer(lot.pk, cls.soumettre(lot.fournisseur, virements))
+
+    @staticmethod
+    def renvoyer(virement_ids):
+        """
+        Remet à envoyer des virements 'a_verifier' et rouvre leurs lots. Le
+        renvoi garde la même référence (clé d'idempotence) : le fournisseur
+        retourne le virement déjà payé, ou le refuse, sans payer deux fois.
+
+        Returns:
+            int: Nombre de virements remis à envoyer
+        """
+        with transaction.atomic():
+            virements = Virement.objects.select_for_update().filter(pk__in=virement_ids, statut='a_verifier')
+            lots = set(virements.values_list('lot_id', flat=True))
+            renvoyes = virements.update(statut='a_envoyer', tentatives=0)
+            LotVirement.objects.filter(pk__in=lots).update(statut='debite', date_fin=None)
+        return renvoyes
+
+    @staticmethod
+    def _planifier_notifications(lot_id):
+        from location.tasks.payout_tasks import notifier_virements
+        transaction.on_commit(lambda: notifier_virements.delay(lot_id))
+
+    @classmethod
+    def executer(cls, budget=None, taille_lot=None):
+        """
+        Reprend les lots interrompus puis verse les nouvelles demandes, fournisseur
+        par fournisseur, jusqu'à épuisement ou fin du budget (secondes).
+
+        Returns:
+            dict: {'lots', 'envoyes', 'echoues', 'reportes', 'a_verifier', 'rejetes', 'duree', 'termine'}
+        """
+        debut = time.monotonic()
+        rapport = {
+            'lots': 0, 'envoyes': 0, 'echoues': 0, 'reportes': 0, 'a_verifier': 0, 'rejetes': 0, 'termine': False
+        }
+
+        def epuise():
+            return budget and time.monotonic() - debut > budget
+
+        def cumuler(resultat):
+            if resultat is None:
+                return
+            rapport['lots'] += 1
+            for cle, valeur in resultat.items():
+                rapport[cle] += valeur
+
+        for lot in LotVirement.objects.filter(statut='debite').order_by('id'):
+            if epuise():
+                break
+            cumuler(cls.envoyer(lot))
+        else:
+            for fournisseur in cls.FOURNISSEURS:
+                while not epuise():
+                    lot, rejets = cls.preparer(fournisseur, taille_lot)
+                    if lot is None:
+                        break
+                    rapport['rejetes'] += rejets
+                    cumuler(cls.envoyer(lot))
+            rapport['termine'] = not epuise()
+
+        rapport['duree'] = round(time.monotonic() - debut, 3)
+        logger.info(
+            f"Virements : {rapport['envoyes']} envoyé(s), {rapport['echoues']} échoué(s), "
+            f"{rapport['reportes']} reporté(s), {rapport['a_verifier']} à vérifier, "
+            f"{rapport['rejetes']} rejeté(s) en {rapport['lots']} lot(s), "
+            f"{rapport['duree']}s"
+        )
+        return rapport
+
+    @staticmethod
+    def a_notifier(lot_id):
+        """Virements du lot dont l'issue est connue et pas encore notifiée"""
+        return (
+            Virement.objects.filter(lot_id=lot_id, notifie=False)
+            .exclude(statut__in=['a_envoyer', 'a_verifier'])
+            .select_related('transaction__user')
+        )
@@ -0,0 +1,76 @@
+from location.services.currency_service import CurrencyService
+
+
+class PriceDisplayService:
+    """
+    Prix des pages de résultats dans la devise du visiteur (request.currency,
+    posée par CurrencyMiddleware).
+
+    Tous les montants XOF d'une page sont convertis en un seul appel à
+    CurrencyService.convert_many, puis formatés. Les textes obtenus sont
+    mémorisés par (devise, version des taux) dans le processus : une page
+    suivante ne convertit que les montants encore jamais vus. Le filtre
+    prix_affiche ne fait que lire obj.prix_affiches.
+    """
+
+    DEVISE_BASE = 'XOF'
+    CHAMPS = ('prix_jour', 'total_sejour')
+    TAILLE_MEMO = 10000  # montants mémorisés par devise
+
+    # {devise: (version des taux, {montant XOF: texte})}
+    _memo = {}
+
+    @classmethod
+    def formater(cls, montant, devise):
+        """Francs CFA sans décimales, autres devises via CurrencyService.format_currency"""
+        if devise == cls.DEVISE_BASE:
+            return f"{montant:,.0f}".replace(",", " ") + " FCFA"
+        return CurrencyService.format_currency(montant, devise)
+
+    @classmethod
+    def _memo_pour(cls, devise, version):
+        entree = cls._memo.get(devise)
+        if entree is None or entree[0] != version or len(entree[1]) > cls.TAILLE_MEMO:
+            entree = (version, {})
+            cls._memo[devise] = entree
+        return entree[1]
+
+    @classmethod
+    def preparer(cls, objets, devise=None, champs=None):
+        """
+        Attache à chaque objet prix_affiches = {champ: texte formaté}.
+
+        Args:
+            objets: Objets de la page (déjà évalués)
+            devise: Devise d'affichage (XOF par défaut ou si non supportée)
+            champs: Attributs en XOF à convertir (CHAMPS par défaut)
+
+        Returns:
+            list: Les objets, dans l'ordre
+        """
+        objets = list(objets)
+        champs = champs or cls.CHAMPS
+        devise = (devise or cls.DEVISE_BASE).upper()
+        if devise not in CurrencyService.SUPPORTED_CURRENCIES:
+            devise = cls.DEVISE_BASE
+
+        memo = cls._memo_pour(devise, CurrencyService.table().version)
+        nouveaux = set()
+        for objet in objets:
+            for champ in champs:
+                montant = getattr(objet, champ, None)
+                if montant is not None and montant not in memo:
+                    nouveaux.add(montant)
+
+        if nouveaux:
+            montants = list(nouveaux)
+            convertis = CurrencyService.convert_many(montants, cls.DEVISE_BASE, devise)
+            memo.update(zip(montants, (cls.formater(converti, devise) for converti in convertis)))
+
+        for objet in objets:
+            objet.prix_affiches = {
+                champ: memo[getattr(objet, champ)]
+                for champ in champs
+                if getattr(objet, champ, None) is not None
+            }
+        return objets
@@ -0,0 +1,132 @@
+import logging
+from decimal import Decimal
+import numpy as np
+from django.db.models import F, Func, IntegerField, Value
+from django.contrib.postgres.fields import ArrayField
+from location.models import Voiture
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteService:
+    """
+    Devis d'un séjour pour un ensemble de voitures, calculé en une passe NumPy
+    (voitures x jours) : prix journalier majoré en haute saison, chauffeur
+    éventuel et frais de service de 10 %. La caution, remboursable, n'est pas incluse.
+
+    Les montants sont des entiers XOF arrondis au plus proche (arrondi bancaire,
+    comme round() dans reserver_voiture) ; reserver_voiture utilise ce même
+    calcul pour que le total affiché soit celui payé.
+    """
+
+    FRAIS_SERVICE = Decimal('0.10')
+    # Multiplicateurs exprimés en millièmes pour calculer en entiers
+    ECHELLE = 1000
+
+    @classmethod
+    def multiplicateurs(cls, date_debut, date_fin):
+        """Multiplicateur de chaque jour de [date_debut, date_fin), en millièmes"""
+        jours = np.arange(np.datetime64(date_debut, 'D'), np.datetime64(date_fin, 'D'))
+        mois = jours.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        majoration = int(Voiture.MAJORATION_HAUTE_SAISON * cls.ECHELLE)
+        return np.where(np.isin(mois, Voiture.MOIS_HAUTE_SAISON), majoration, cls.ECHELLE).astype(np.int64)
+
+    @staticmethod
+    def _diviser_arrondi(numerateur, diviseur):
+        """Division entière arrondie au plus proche, égalités vers le pair (vectorisée)"""
+        quotient, reste = np.divmod(numerateur, diviseur)
+        double = 2 * reste
+        return quotient + ((double > diviseur) | ((double == diviseur) & (quotient % 2 == 1)))
+
+    @classmethod
+    def calculer(cls, prix_jour, prix_chauffeur, date_debut, date_fin):
+        """
+        Args:
+            prix_jour: Tableau (N,) des prix journaliers
+            prix_chauffeur: Tableau (N,) du prix chauffeur/jour (0 si non demandé)
+
+        Returns:
+            dict: Tableaux (N,) 'base', 'chauffeur', 'frais', 'total'
+        """
+        prix_jour = np.asarray(prix_jour, dtype=np.int64)
+        prix_chauffeur = np.asarray(prix_chauffeur, dtype=np.int64)
+        multiplicateurs = cls.multiplicateurs(date_debut, date_fin)
+
+        # (N, J) : tarif de chaque voiture pour chaque jour, sommé par voiture
+        base = cls._diviser_arrondi(
+            (prix_jour[:, None] * multiplicateurs[None, :]).sum(axis=1), cls.ECHELLE
+        )
+        chauffeur = prix_chauffeur * len(multiplicateurs)
+        taux = int(cls.FRAIS_SERVICE * 100)
+        frais = cls._diviser_arrondi((base + chauffeur) * taux, 100)
+        return {
+            'base': base,
+            'chauffeur': chauffeur,
+            'frais': frais,
+            'total': base + chauffeur + frais,
+        }
+
+    @classmethod
+    def devis_queryset(cls, queryset, date_debut, date_fin, avec_chauffeur=False):
+        """
+        Devis de toutes les voitures du queryset (une requête, une passe NumPy).
+
+        Returns:
+            tuple: (ids, totaux) tableaux NumPy alignés
+        """
+        lignes = list(queryset.order_by().values_list('id', 'prix_jour', 'avec_chauffeur', 'prix_chauffeur'))
+        if not lignes:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        ids, prix_jour, chauffeur_dispo, prix_chauffeur = zip(*lignes)
+        prix_chauffeur = np.where(
+            np.array(chauffeur_dispo, dtype=bool) & avec_chauffeur,
+            np.array([p or 0 for p in prix_chauffeur], dtype=np.int64),
+            0
+        )
+        devis = cls.calculer(prix_jour, prix_chauffeur, date_debut, date_fin)
+        return np.asarray(ids, dtype=np.int64), devis['total']
+
+    @classmethod
+    def trier_par_total(cls, queryset, date_debut, date_fin, avec_chauffeur=False):
+        """
+        Trie un queryset par total du séjour.
+
+        Returns:
+            tuple: (queryset trié, {voiture_id: total})
+        """
+        ids, totaux = cls.devis_queryset(queryset, date_debut, date_fin, avec_chauffeur)
+        ordre = np.lexsort((ids, totaux))  # Total croissant puis id
+        ids_tries = ids[ordre].tolist()
+        rang = Func(
+            Value(ids_tries, output_field=ArrayField(IntegerField())),
+            F('id'),
+            function='array_position',
+            output_field=IntegerField()
+        )
+        return (
+            queryset.annotate(rang_total=rang).order_by('rang_total', 'id'),
+            dict(zip(ids.tolist(), totaux.tolist()))
+        )
+
+    @classmethod
+    def devis_voitures(cls, voitures, date_debut, date_fin, avec_chauffeur=False):
+        """{voiture_id: total} pour une liste de voitures déjà chargées (page affichée)"""
+        voitures = list(voitures)
+        if not voitures:
+            return {}
+        devis = cls.calculer(
+            [v.prix_jour for v in voitures],
+            [(v.prix_chauffeur or 0) if (avec_chauffeur and v.avec_chauffeur) else 0 for v in voitures],
+            date_debut, date_fin
+        )
+        return {v.pk: int(total) for v, total in zip(voitures, devis['total'])}
+
+    @classmethod
+    def devis_voiture(cls, voiture, date_debut, date_fin, avec_chauffeur=False):
+        """Détail du devis d'une voiture (utilisé par reserver_voiture)"""
+        devis = cls.calculer(
+            [voiture.prix_jour],
+            [(voiture.prix_chauffeur or 0) if avec_chauffeur else 0],
+            date_debut, date_fin
+        )
+        return {cle: Decimal(int(valeur[0])) for cle, valeur in devis.items()}
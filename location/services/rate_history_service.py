@@ -0,0 +1,178 @@
+from bisect import bisect_right
+from decimal import Decimal
+from django.db.models import Max, Min, Subquery, Value
+from django.db.models.functions import Coalesce
+from location.models import CurrencyRateHistory
+from location.services.currency_service import CurrencyService, DEUX_DECIMALES, TauxIndisponibles
+
+
+class HistoriqueTaux:
+    """
+    Historique des taux chargé en mémoire : dates de récupération triées et
+    taux correspondants (unités de devise pour 1 XOF).
+
+    as_of(moment) retrouve par recherche dichotomique la dernière récupération
+    antérieure ou égale à moment. Les facteurs de conversion sont calculés à
+    la demande et mémorisés par (récupération, source, cible).
+    """
+    __slots__ = ('dates', 'taux', '_facteurs')
+
+    def __init__(self, lignes):
+        """
+        Args:
+            lignes: Itérable de (date, {devise: taux}) ; les taux peuvent être
+                des chaînes (JSON) ou des Decimal
+        """
+        lignes = sorted(lignes, key=lambda ligne: ligne[0])
+        self.dates = [date for date, _ in lignes]
+        self.taux = [
+            {code: Decimal(str(valeur)) for code, valeur in rates.items()}
+            for _, rates in lignes
+        ]
+        self._facteurs = {}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def index(self, moment, debut=0):
+        """
+        Position de la récupération en vigueur à moment ; debut borne la
+        recherche quand les moments sont parcourus dans l'ordre.
+
+        Raises:
+            TauxIndisponibles: Si aucun taux n'était enregistré à cette date
+        """
+        position = bisect_right(self.dates, moment, debut) - 1
+        if position < 0:
+            raise TauxIndisponibles(f"Aucun taux enregistré au {moment}")
+        return position
+
+    def as_of(self, moment):
+        """
+        Returns:
+            dict: Taux {devise: taux pour 1 XOF} en vigueur à moment
+        """
+        return self.taux[self.index(moment)]
+
+    def facteur(self, position, from_currency, to_currency):
+        """Facteur de conversion de la paire pour la récupération à position"""
+        cle = (position, from_currency, to_currency)
+        facteur = self._facteurs.get(cle)
+        if facteur is None:
+            taux = self.taux[position]
+            try:
+                facteur = taux[to_currency] / taux[from_currency]
+            except KeyError:
+                raise ValueError("Taux de change non disponibles pour la paire de devises")
+            self._facteurs[cle] = facteur
+        return facteur
+
+    def convert(self, amount, from_currency, to_currency, moment, round_result=True):
+        """
+        Convertit un montant au taux en vigueur à moment
+        Returns:
+            Decimal: Montant converti
+        Raises:
+            TauxIndisponibles: Si aucun taux n'était enregistré à cette date
+            ValueError: Si la paire n'est pas disponible
+        """
+        facteur = self.facteur(self.index(moment), from_currency.upper(), to_currency.upper())
+        converted = Decimal(str(amount)) * facteur
+        return converted.quantize(DEUX_DECIMALES) if round_result else converted
+
+
+class RateHistoryService:
+    """
+    Conversions à date passée à partir de l'historique des taux
+    (CurrencyRateHistory, une ligne par rafraîchissement).
+
+    L'historique utile est chargé en une requête puis interrogé en mémoire :
+    une revalorisation de plusieurs milliers de paiements coûte une requête
+    pour les taux et une lecture par lot des paiements.
+    """
+
+    TAILLE_LOT = 2000
+
+    @staticmethod
+    def charger(debut=None, fin=None):
+        """
+        Charge l'historique couvrant [debut, fin], y compris la récupération
+        en vigueur à debut.
+
+        Returns:
+            HistoriqueTaux
+        """
+        lignes = CurrencyRateHistory.objects.all()
+        if debut is not None:
+            en_vigueur = (
+                CurrencyRateHistory.objects.filter(date__lte=debut)
+                .order_by('-date').values('date')[:1]
+            )
+            lignes = lignes.filter(date__gte=Coalesce(Subquery(en_vigueur), Value(debut)))
+        if fin is not None:
+            lignes = lignes.filter(date__lte=fin)
+        return HistoriqueTaux(lignes.values_list('date', 'rates'))
+
+    @classmethod
+    def as_of(cls, moment):
+        """
+        Taux en vigueur à moment (une requête ; pour de nombreuses dates,
+        charger() une fois puis HistoriqueTaux.as_of)
+
+        Returns:
+            dict: Taux {devise: taux pour 1 XOF}
+        Raises:
+            TauxIndisponibles: Si aucun taux n'était enregistré à cette date
+        """
+        return cls.charger(moment, moment).as_of(moment)
+
+    @classmethod
+    def revaloriser(cls, paiements, devise='EUR'):
+        """
+        Convertit des paiements historiques dans devise, au taux en vigueur à
+        leur création.
+
+        Args:
+            paiements: QuerySet de Paiement (non découpé)
+            devise: Devise cible
+
+        Returns:
+            list: Dictionnaires {'id', 'date_creation', 'montant', 'devise_origine',
+                'taux', 'montant_converti'} par date de création ; taux et
+                montant_converti valent None si aucun taux n'était enregistré
+        Raises:
+            ValueError: Si la devise cible n'est pas supportée
+        """
+        devise = devise.upper()
+        if devise not in CurrencyService.SUPPORTED_CURRENCIES:
+            raise ValueError(f"Devise cible non supportée: {devise}")
+
+        bornes = paiements.aggregate(debut=Min('date_creation'), fin=Max('date_creation'))
+        if bornes['debut'] is None:
+            return []
+        historique = cls.charger(bornes['debut'], bornes['fin'])
+
+        lignes = (
+            paiements.order_by('date_creation', 'id')
+            .values_list('id', 'date_creation', 'montant', 'devise_origine')
+            .iterator(chunk_size=cls.TAILLE_LOT)
+        )
+        resultats = []
+        position = 0
+        for id_paiement, date_creation, montant, devise_origine in lignes:
+            facteur = None
+            try:
+                # Dates croissantes : la recherche reprend à la position précédente
+                position = historique.index(date_creation, position)
+                facteur = historique.facteur(position, devise_origine, devise)
+            except (TauxIndisponibles, ValueError):
+                pass
+            resultats.append({
+                'id': id_paiement,
+                'date_creation': date_creation,
+                'montant': montant,
+                'devise_origine': devise_origine,
+                'taux': facteur,
+                'montant_converti': (montant * facteur).quantize(DEUX_DECIMALES) if facteur is not None else None,
+            })
+        return resultats
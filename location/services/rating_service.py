@@ -0,0 +1,132 @@
+import logging
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from location.models import (
+    Evaluation, EvaluationLoueur, LoueurProfile, ProprietaireProfile, Voiture
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RatingService:
+    """
+    Maintient les agrégats de notes (AgregatNotes) :
+    - Evaluation -> Voiture évaluée et ProprietaireProfile de son propriétaire
+    - EvaluationLoueur -> LoueurProfile de l'utilisateur évalué
+    Chaque changement est appliqué par UPDATE ... SET x = x + delta, sans relire les évaluations.
+    """
+
+    NOTES = range(1, 6)
+
+    @staticmethod
+    def cibles(evaluation):
+        """Liste de (queryset à mettre à jour) pour une évaluation"""
+        if isinstance(evaluation, EvaluationLoueur):
+            return [LoueurProfile.objects.filter(user_id=evaluation.evalue_id)]
+        return [
+            Voiture.objects.filter(pk=evaluation.voiture_id),
+            ProprietaireProfile.objects.filter(
+                user_id=Subquery(Voiture.objects.filter(pk=evaluation.voiture_id).values('proprietaire_id')[:1])
+            ),
+        ]
+
+    @staticmethod
+    def _ajuster(queryset, note, delta):
+        """Ajoute (delta=1) ou retire (delta=-1) une note des agrégats"""
+        if delta < 0:
+            # Agrégats déjà désynchronisés : on laisse `reparer_notes` corriger
+            queryset = queryset.filter(**{f'note_{note}__gt': 0})
+        nombre = F('note_nombre') + delta
+        somme = F('note_somme') + delta * note
+        queryset.update(**{
+            'note_nombre': nombre,
+            'note_somme': somme,
+            f'note_{note}': F(f'note_{note}') + delta,
+            # Les F() lisent les anciennes valeurs : on recalcule la moyenne sur les nouvelles
+            'note_moyenne': Case(
+                When(note_nombre__gt=-delta, then=Cast(somme, FloatField()) / Cast(nombre, FloatField())),
+                default=Value(None),
+                output_field=FloatField()
+            ),
+        })
+
+    @classmethod
+    def etat_avant(cls, evaluation):
+        """Note et cibles enregistrées en base avant modification (None si création)"""
+        if not evaluation.pk:
+            return None
+        ancienne = type(evaluation).objects.filter(pk=evaluation.pk).first()
+        if ancienne is None:
+            return None
+        return ancienne.note, cls.cibles(ancienne)
+
+    @classmethod
+    def enregistrer(cls, evaluation, etat_avant=None):
+        """Après la sauvegarde d'une évaluation (post_save, signals/rating_signals.py)"""
+        with transaction.atomic():
+            if etat_avant is not None:
+                ancienne_note, anciennes_cibles = etat_avant
+                for queryset in anciennes_cibles:
+                    cls._ajuster(queryset, ancienne_note, -1)
+            for queryset in cls.cibles(evaluation):
+                cls._ajuster(queryset, evaluation.note, 1)
+
+    @classmethod
+    def supprimer(cls, evaluation):
+        """Après la suppression d'une évaluation, cascades comprises (post_delete)"""
+        with transaction.atomic():
+            for queryset in cls.cibles(evaluation):
+                cls._ajuster(queryset, evaluation.note, -1)
+
+    @classmethod
+    def _reconstruire(cls, queryset, evaluations, lien, cle_externe='pk'):
+        """
+        Recalcule les agrégats de `queryset` (sous-requêtes groupées, sans boucle Python).
+        `lien` est le champ des évaluations pointant vers `cle_externe` de la cible.
+        """
+        def agregat(expression):
+            return Coalesce(
+                Subquery(
+                    evaluations.filter(**{lien: OuterRef(cle_externe)}).order_by()
+                    .values(lien).annotate(valeur=expression).values('valeur')[:1],
+                    output_field=IntegerField()
+                ),
+                0
+            )
+
+        valeurs = {
+            'note_nombre': agregat(Count('id')),
+            'note_somme': agregat(Sum('note')),
+            **{f'note_{n}': agregat(Count('id', filter=Q(note=n))) for n in cls.NOTES},
+        }
+        with transaction.atomic():
+            total = queryset.update(**valeurs)
+            queryset.update(note_moyenne=Case(
+                When(note_nombre__gt=0, then=Cast(F('note_somme'), FloatField()) / Cast(F('note_nombre'), FloatField())),
+                default=Value(None),
+                output_field=FloatField()
+            ))
+        return total
+
+    @classmethod
+    def reconstruire(cls):
+        """
+        Reconstruit tous les agrégats (après import, suppression en masse...).
+
+        Returns:
+            dict: Nombre de lignes mises à jour par modèle
+        """
+        return {
+            'voitures': cls._reconstruire(
+                Voiture.objects.all(), Evaluation.objects.all(), 'voiture_id'
+            ),
+            'proprietaires': cls._reconstruire(
+                ProprietaireProfile.objects.all(), Evaluation.objects.all(),
+                'voiture__proprietaire_id', cle_externe='user_id'
+            ),
+            'loueurs': cls._reconstruire(
+                LoueurProfile.objects.all(), EvaluationLoueur.objects.all(),
+                'evalue_id', cle_externe='user_id'
+            ),
+        }
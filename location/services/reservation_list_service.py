@@ -0,0 +1,41 @@
+from django.db.models import OuterRef, Subquery
+from location.models import Paiement, Reservation
+
+
+class ReservationListService:
+    """
+    Requêtes des listes de réservations (mes réservations, propriétaire, tableaux de bord).
+
+    Le dernier paiement de chaque réservation est joint par sous-requêtes corrélées
+    (index paiement_reservation_recent) : la liste entière tient en une requête et
+    Reservation.dernier_paiement se construit à partir des annotations.
+    """
+
+    CHAMPS_PAIEMENT = ['id', 'statut', 'methode', 'montant', 'date_creation']
+
+    @classmethod
+    def avec_dernier_paiement(cls, queryset):
+        """Annote dernier_paiement_<champ> pour chaque champ de CHAMPS_PAIEMENT"""
+        dernier = Paiement.objects.filter(reservation=OuterRef('pk')).order_by('-date_creation', '-id')
+        return queryset.annotate(**{
+            f'dernier_paiement_{champ}': Subquery(dernier.values(champ)[:1])
+            for champ in cls.CHAMPS_PAIEMENT
+        })
+
+    @classmethod
+    def pour_client(cls, user, statuts=None):
+        reservations = Reservation.objects.filter(client=user)
+        if statuts:
+            reservations = reservations.filter(statut__in=statuts)
+        return cls.avec_dernier_paiement(
+            reservations.select_related('voiture', 'voiture__proprietaire')
+        ).order_by('-date_creation')
+
+    @classmethod
+    def pour_proprietaire(cls, user, statuts=None):
+        reservations = Reservation.objects.filter(voiture__proprietaire=user)
+        if statuts:
+            reservations = reservations.filter(statut__in=statuts)
+        return cls.avec_dernier_paiement(
+            reservations.select_related('voiture', 'client')
+        ).order_by('-date_creation')
@@ -0,0 +1,61 @@
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from location.models import Voiture
+
+
+class VoitureSearchService:
+    """
+    Recherche plein texte des véhicules :
+    - tsvector (config 'french') stocké sur Voiture.search_vector
+    - similarité trigramme sur marque/modèle pour tolérer les fautes de frappe
+    - classement par pertinence
+    """
+
+    CONFIG = 'french'
+
+    @classmethod
+    def vecteur(cls):
+        """Expression SearchVector pondérée (marque > modèle > description)"""
+        return (
+            SearchVector('marque', weight='A', config=cls.CONFIG) +
+            SearchVector('modele', weight='A', config=cls.CONFIG) +
+            SearchVector('description', weight='C', config=cls.CONFIG)
+        )
+
+    @classmethod
+    def mettre_a_jour_index(cls, voiture_ids=None):
+        """Recalcule search_vector en une requête UPDATE (toutes les voitures si None)"""
+        queryset = Voiture.objects.all()
+        if voiture_ids is not None:
+            queryset = queryset.filter(id__in=voiture_ids)
+        return queryset.update(search_vector=cls.vecteur())
+
+    @classmethod
+    def rechercher(cls, queryset, query):
+        """
+        Filtre un queryset de voitures sur le texte saisi et l'annote d'un score
+        `pertinence` (rang plein texte + meilleure similarité trigramme).
+        """
+        search_query = SearchQuery(query, config=cls.CONFIG, search_type='websearch')
+        return queryset.filter(
+            Q(search_vector=search_query) |
+            Q(marque__trigram_similar=query) |
+            Q(modele__trigram_similar=query)
+        ).annotate(
+            pertinence=SearchRank(F('search_vector'), search_query) + Greatest(
+                TrigramSimilarity('marque', query),
+                TrigramSimilarity('modele', query)
+            )
+        ).order_by('-pertinence', 'prix_jour')
+
+    @staticmethod
+    def rechercher_icontains(queryset, query):
+        """Ancien chemin de recherche (scan séquentiel), conservé pour comparaison"""
+        return queryset.filter(
+            Q(marque__icontains=query) |
+            Q(modele__icontains=query) |
+            Q(description__icontains=query)
+        ).order_by('prix_jour')
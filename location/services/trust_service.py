@@ -1,4 +1,6 @@
-from django.db.models import Q
+from collections import defaultdict
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Q
 from django.db import transaction
 from django.utils import timezone
 from ..models import User, Reservation, Evaluation, EvaluationLoueur, Litige
@@ -60,7 +62,11 @@ class TrustService:
             'response_time': TrustService._get_response_time_score(user)
         }
 
-        # Calcul du score pondéré
+        return TrustService._score(metrics)
+
+    @staticmethod
+    def _score(metrics):
+        """Score pondéré à partir des métriques, borné entre MIN_SCORE et MAX_SCORE"""
         score = TrustService.BASE_SCORE
         for factor, weight in TrustService.WEIGHTS.items():
             score += metrics[factor] * weight * 10  # *10 pour amplifier l'impact
@@ -68,6 +74,15 @@ class TrustService:
         # Normalisation entre MIN_SCORE et MAX_SCORE
         return max(TrustService.MIN_SCORE, min(round(score), TrustService.MAX_SCORE))
 
+    @staticmethod
+    def _count_by_user(queryset, *user_fields):
+        """{user_id: nombre} en additionnant un comptage groupé par champ utilisateur"""
+        counts = defaultdict(int)
+        for field in user_fields:
+            for user_id, count in queryset.order_by().values_list(field).annotate(n=Count('id')):
+                counts[user_id] += count
+        return counts
+
     @staticmethod
     def _get_completed_reservations(user):
         """Nombre de réservations complétées avec succès"""
@@ -76,9 +91,21 @@ class TrustService:
             statut='termine'
         ).count()
 
+    @staticmethod
+    def _profil_notes(user):
+        """Profil portant les agrégats de notes de l'utilisateur (None si absent)"""
+        relation = 'loueur_profile' if user.user_type == 'LOUEUR' else 'proprietaire_profile'
+        try:
+            return getattr(user, relation)
+        except ObjectDoesNotExist:
+            return None
+
     @staticmethod
     def _get_positive_ratings(user):
         """Nombre d'évaluations positives (note >= 4)"""
+        profil = TrustService._profil_notes(user)
+        if profil is not None:
+            return profil.evaluations_positives
         if user.user_type == 'LOUEUR':
             return EvaluationLoueur.objects.filter(evalue=user, note__gte=4).count()
         return Evaluation.objects.filter(voiture__proprietaire=user, note__gte=4).count()
@@ -86,6 +113,9 @@ class TrustService:
     @staticmethod
     def _get_negative_ratings(user):
         """Nombre d'évaluations négatives (note <= 2)"""
+        profil = TrustService._profil_notes(user)
+        if profil is not None:
+            return profil.evaluations_negatives
         if user.user_type == 'LOUEUR':
             return EvaluationLoueur.objects.filter(evalue=user, note__lte=2).count()
         return Evaluation.objects.filter(voiture__proprietaire=user, note__lte=2).count()
@@ -134,6 +164,51 @@ class TrustService:
         
         return new_score
 
+    @staticmethod
+    def update_trust_scores(user_ids):
+        """
+        Recalcule les scores de plusieurs utilisateurs en un nombre fixe de requêtes
+        (comptages groupés puis bulk_update), pour les traitements par lots.
+
+        Returns:
+            int: Nombre d'utilisateurs mis à jour
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return 0
+
+        completed = TrustService._count_by_user(
+            Reservation.objects.filter(
+                Q(client_id__in=user_ids) | Q(voiture__proprietaire_id__in=user_ids),
+                statut='termine'
+            ),
+            'client_id', 'voiture__proprietaire_id'
+        )
+        disputes = TrustService._count_by_user(
+            Litige.objects.filter(
+                Q(reservation__client_id__in=user_ids) | Q(reservation__voiture__proprietaire_id__in=user_ids),
+                statut='en_cours'
+            ),
+            'reservation__client_id', 'reservation__voiture__proprietaire_id'
+        )
+
+        now = timezone.now()
+        users = list(User.objects.filter(id__in=user_ids).select_related('loueur_profile', 'proprietaire_profile'))
+        for user in users:
+            user.trust_score = TrustService._score({
+                'completed_reservations': completed.get(user.id, 0),
+                'positive_ratings': TrustService._get_positive_ratings(user),
+                'negative_ratings': TrustService._get_negative_ratings(user),
+                'disputes': disputes.get(user.id, 0),
+                'account_age': TrustService._get_account_age_score(user),
+                'documents_verified': 1 if user.is_verified else 0,
+                'response_time': TrustService._get_response_time_score(user)
+            })
+            user.last_trust_update = now
+
+        User.objects.bulk_update(users, ['trust_score', 'last_trust_update'], batch_size=500)
+        return len(users)
+
     @staticmethod
     def get_trust_category(score=None, user=None):
         """
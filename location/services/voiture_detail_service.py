@@ -0,0 +1,99 @@
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Subquery, Value, BooleanField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from location.models import Favoris, Reservation, Voiture
+from location.models.core_models import VoiturePhoto
+
+logger = logging.getLogger(__name__)
+
+
+class VoitureDetailService:
+    """
+    Chargement de la page détail d'un véhicule en un nombre fixe de requêtes :
+    - 1 requête pour la voiture, son propriétaire, la disponibilité du jour,
+      la prochaine date libre et les informations propres à l'utilisateur
+    - 2 requêtes (évaluations récentes, photos) uniquement si le cache est froid
+
+    La partie commune à tous les visiteurs est mise en cache par voiture, sous
+    une clé qui change avec date_modification et les agrégats de notes.
+    """
+
+    CACHE_KEY = 'voiture_detail:{pk}:{version}'
+    TIMEOUT = 60 * 15  # 15 minutes
+    NB_EVALUATIONS = 5
+
+    @staticmethod
+    def queryset(user):
+        today = timezone.now().date()
+        reservations_confirmees = Reservation.objects.filter(voiture=OuterRef('pk'), statut='confirme')
+        queryset = Voiture.objects.select_related('proprietaire').annotate(
+            occupee_aujourdhui=Exists(reservations_confirmees.filter(
+                date_debut__lte=today, date_fin__gte=today
+            )),
+            prochaine_fin=Subquery(
+                reservations_confirmees.filter(date_fin__gte=today).order_by('date_fin').values('date_fin')[:1]
+            ),
+        )
+        if user.is_authenticated:
+            return queryset.annotate(
+                in_favoris=Exists(Favoris.objects.filter(utilisateur=user, voiture=OuterRef('pk'))),
+                peut_evaluer=Exists(Reservation.objects.filter(
+                    client=user, voiture=OuterRef('pk'), statut='termine'
+                )),
+            )
+        return queryset.annotate(
+            in_favoris=Value(False, output_field=BooleanField()),
+            peut_evaluer=Value(False, output_field=BooleanField()),
+        )
+
+    @staticmethod
+    def est_disponible(voiture):
+        """Équivalent de Voiture.est_disponible à partir des annotations"""
+        return voiture.disponible and not voiture.occupee_aujourdhui
+
+    @staticmethod
+    def prochaine_date_disponible(voiture):
+        """Lendemain de la fin de la prochaine réservation confirmée"""
+        return voiture.prochaine_fin + timedelta(days=1) if voiture.prochaine_fin else None
+
+    @classmethod
+    def cache_key(cls, voiture):
+        version = f"{voiture.date_modification.timestamp():.6f}-{voiture.note_nombre}-{voiture.note_somme}"
+        return cls.CACHE_KEY.format(pk=voiture.pk, version=version)
+
+    @classmethod
+    def contenu_partage(cls, voiture):
+        """
+        Évaluations récentes et photos, identiques pour tous les visiteurs.
+        Stockées sous forme JSON (sérialiseur du cache Redis).
+        """
+        key = cls.cache_key(voiture)
+        contenu = cache.get(key)
+        if contenu is None:
+            stockage = VoiturePhoto._meta.get_field('photo').storage
+            contenu = {
+                'evaluations': [
+                    {
+                        'client': {'username': username},
+                        'note': note,
+                        'commentaire': commentaire,
+                        'date_creation': date_creation.isoformat(),
+                    }
+                    for username, note, commentaire, date_creation in voiture.evaluations.order_by(
+                        '-date_creation'
+                    ).values_list('client__username', 'note', 'commentaire', 'date_creation')[:cls.NB_EVALUATIONS]
+                ],
+                'photos': [
+                    {'url': stockage.url(photo), 'est_principale': est_principale}
+                    for photo, est_principale in voiture.photos.values_list('photo', 'est_principale')
+                    if photo
+                ],
+            }
+            cache.set(key, contenu, timeout=cls.TIMEOUT)
+
+        for evaluation in contenu['evaluations']:
+            evaluation['date_creation'] = parse_datetime(evaluation['date_creation'])
+        return contenu
@@ -0,0 +1,73 @@
+import csv
+from django.utils import timezone
+from location.models import Transaction
+from location.pagination import KeysetPaginator
+
+
+class _Tampon:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire"""
+
+    def write(self, valeur):
+        return valeur
+
+
+class WalletHistoryService:
+    """
+    Historique des transactions d'un portefeuille :
+    - pagination par curseur sur (portefeuille, date_creation, id), servie par
+      l'index transaction_historique, sans OFFSET ni COUNT : une page ne lit
+      que ses lignes
+    - solde après chaque écriture lu sur l'écriture (solde_apres, posé dans
+      l'ordre du journal par WalletService) ; vide pour une demande en
+      attente ou rejetée, qui ne touche pas au solde
+    - export CSV en flux, lu par lots via un curseur serveur
+    """
+
+    PAR_PAGE = 20
+    TAILLE_LOT_EXPORT = 2000
+    COLONNES_CSV = ['Date', 'Type', 'Référence', 'Montant (XOF)', 'Statut', 'Solde après (XOF)']
+
+    @classmethod
+    def page(cls, portefeuille, curseur=None, par_page=None):
+        """
+        Returns:
+            KeysetPage: Transactions, des plus récentes aux plus anciennes
+        Raises:
+            InvalidCursor: Si le curseur est invalide
+        """
+        return KeysetPaginator(
+            Transaction.objects.filter(portefeuille=portefeuille),
+            ['-date_creation', '-id'],
+            par_page or cls.PAR_PAGE,
+            with_count=False
+        ).page(curseur)
+
+    @classmethod
+    def lignes(cls, portefeuille):
+        """Historique complet, du plus ancien au plus récent"""
+        return Transaction.objects.filter(portefeuille=portefeuille).order_by('date_creation', 'id')
+
+    @classmethod
+    def export_csv(cls, portefeuille):
+        """
+        Lignes CSV de l'historique complet, à passer à un StreamingHttpResponse ;
+        jamais plus de TAILLE_LOT_EXPORT transactions en mémoire.
+        """
+        ecrivain = csv.writer(_Tampon(), delimiter=';')
+        yield ecrivain.writerow(cls.COLONNES_CSV)
+        lignes = cls.lignes(portefeuille).values_list(
+            'date_creation', 'type_transaction', 'reference', 'montant', 'statut', 'solde_apres'
+        )
+        types = dict(Transaction.TYPE_CHOICES)
+        statuts = dict(Transaction.STATUT_CHOICES)
+        for date_creation, type_transaction, reference, montant, statut, solde_apres in lignes.iterator(
+            chunk_size=cls.TAILLE_LOT_EXPORT
+        ):
+            yield ecrivain.writerow([
+                timezone.localtime(date_creation).strftime('%d/%m/%Y %H:%M'),
+                types.get(type_transaction, type_transaction),
+                reference,
+                montant,
+                statuts.get(statut, statut),
+                solde_apres,
+            ])
@@ -0,0 +1,226 @@
+import logging
+import uuid
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from location.models import Portefeuille, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class SoldeInsuffisant(ValueError):
+    """Le solde du portefeuille ne couvre pas le débit"""
+
+
+class WalletService:
+    """
+    Portefeuille tenu comme un journal en ajout seul :
+    - chaque mouvement est une Transaction 'valide' au montant signé, numérotée
+      dans le journal du portefeuille (numero), avec le solde qui en résulte
+      (solde_apres), et jamais modifiée ensuite ; une correction est une
+      nouvelle écriture
+    - Portefeuille.solde est l'instantané du journal, mis à jour dans la même
+      transaction que l'écriture par un UPDATE conditionnel
+      (solde = solde + montant, avec solde >= débit) : la ligne du portefeuille
+      reste verrouillée jusqu'au commit, les écritures d'un même portefeuille
+      sont sérialisées et aucune mise à jour n'est perdue
+    - lire un solde ne somme jamais l'historique ; controler() pose
+      périodiquement un point de contrôle en ne sommant que les écritures
+      postérieures au précédent
+    """
+
+    TAILLE_LOT_CONTROLE = 500
+
+    @staticmethod
+    def _montant(montant):
+        try:
+            montant = Decimal(str(montant))
+        except InvalidOperation:
+            raise ValueError("Montant invalide")
+        if montant <= 0:
+            raise ValueError("Le montant doit être positif")
+        return montant
+
+    @staticmethod
+    def _mouvement(portefeuille_id, montant):
+        """
+        Applique montant (signé) au solde et réserve le numéro d'écriture suivant.
+        À appeler dans une transaction : la ligne reste verrouillée jusqu'au commit.
+
+        Returns:
+            tuple: (nouveau solde, numéro de l'écriture)
+        Raises:
+            SoldeInsuffisant: Si un débit dépasse le solde
+        """
+        portefeuilles = Portefeuille.objects.filter(pk=portefeuille_id)
+        condition = portefeuilles.filter(solde__gte=-montant) if montant < 0 else portefeuilles
+        modifie = condition.update(solde=F('solde') + montant, nb_ecritures=F('nb_ecritures') + 1)
+        if not modifie:
+            if montant < 0 and portefeuilles.exists():
+                raise SoldeInsuffisant("Solde insuffisant")
+            raise Portefeuille.DoesNotExist(f"Portefeuille {portefeuille_id} introuvable")
+        return portefeuilles.values_list('solde', 'nb_ecritures').get()
+
+    @classmethod
+    def ecrire(cls, portefeuille, montant, type_transaction, reference, **champs):
+        """
+        Ajoute une écriture validée au journal et met à jour portefeuille.solde.
+
+        Returns:
+            Transaction: L'écriture créée
+        """
+        with transaction.atomic():
+            solde, numero = cls._mouvement(portefeuille.pk, montant)
+            ecriture = Transaction.objects.create(
+                portefeuille=portefeuille,
+                user_id=portefeuille.proprietaire_id,
+                montant=montant,
+                type_transaction=type_transaction,
+                statut='valide',
+                reference=reference,
+                numero=numero,
+                solde_apres=solde,
+                date_traitement=timezone.now(),
+                **champs
+            )
+        portefeuille.solde = solde
+        portefeuille.nb_ecritures = numero
+        return ecriture
+
+    @classmethod
+    def crediter(cls, portefeuille, montant, reference="", type_transaction="depot"):
+        montant = cls._montant(montant)
+        return cls.ecrire(
+            portefeuille, montant, type_transaction,
+            reference or f"CRD-{uuid.uuid4().hex}"
+        )
+
+    @classmethod
+    def debiter(cls, portefeuille, montant, reference="", type_transaction="retrait"):
+        """
+        Raises:
+            SoldeInsuffisant: Si le solde ne couvre pas le montant
+        """
+        montant = cls._montant(montant)
+        return cls.ecrire(
+            portefeuille, -montant, type_transaction,
+            reference or f"DBT-{uuid.uuid4().hex}"
+        )
+
+    @classmethod
+    def appliquer(cls, operation, utilisateur=None):
+        """
+        Valide une transaction en attente (demande de retrait, dépôt à
+        confirmer) et l'inscrit au journal. Un retrait débite toujours la
+        valeur absolue de son montant.
+
+        Raises:
+            SoldeInsuffisant: Si le solde ne couvre pas le retrait
+            ValueError: Si la transaction n'est plus en attente
+        """
+        montant = operation.montant
+        if operation.type_transaction == 'retrait':
+            montant = -abs(montant)
+        with transaction.atomic():
+            # Verrou du portefeuille d'abord : numéro et solde cohérents
+            solde, numero = cls._mouvement(operation.portefeuille_id, montant)
+            maintenant = timezone.now()
+            if not Transaction.objects.filter(pk=operation.pk, statut='en_attente').update(
+                statut='valide',
+                montant=montant,
+                numero=numero,
+                solde_apres=solde,
+                traite_par=utilisateur,
+                date_traitement=maintenant,
+                date_mise_a_jour=maintenant
+            ):
+                raise ValueError("Transaction déjà traitée")
+
+        operation.statut = 'valide'
+        operation.montant = montant
+        operation.numero = numero
+        operation.solde_apres = solde
+        operation.traite_par = utilisateur
+        operation.date_traitement = maintenant
+        if operation.portefeuille is not None:
+            operation.portefeuille.solde = solde
+            operation.portefeuille.nb_ecritures = numero
+        return operation
+
+    @classmethod
+    def rejeter(cls, operation, utilisateur, motif=''):
+        """
+        Rejette une transaction en attente (sans effet sur le solde)
+
+        Raises:
+            ValueError: Si la transaction n'est plus en attente
+        """
+        maintenant = timezone.now()
+        if not Transaction.objects.filter(pk=operation.pk, statut='en_attente').update(
+            statut='rejete',
+            motif_rejet=motif,
+            traite_par=utilisateur,
+            date_traitement=maintenant,
+            date_mise_a_jour=maintenant
+        ):
+            raise ValueError("Transaction déjà traitée")
+        operation.statut = 'rejete'
+        operation.motif_rejet = motif
+        operation.traite_par = utilisateur
+        operation.date_traitement = maintenant
+        return operation
+
+    @classmethod
+    def controler(cls, portefeuille_id):
+        """
+        Vérifie les écritures postérieures au dernier point de contrôle puis
+        l'avance. Le point de contrôle n'avance pas en cas d'écart.
+
+        Returns:
+            bool: Vrai si l'instantané correspond au journal
+        """
+        with transaction.atomic():
+            portefeuille = Portefeuille.objects.select_for_update().get(pk=portefeuille_id)
+            ecritures = Transaction.objects.filter(
+                portefeuille_id=portefeuille_id,
+                statut='valide',
+                numero__gt=portefeuille.numero_controle,
+                numero__lte=portefeuille.nb_ecritures
+            ).aggregate(total=Sum('montant'), nombre=Count('id'))
+
+            attendu = portefeuille.solde_controle + (ecritures['total'] or 0)
+            nombre_attendu = portefeuille.nb_ecritures - portefeuille.numero_controle
+            if attendu != portefeuille.solde or ecritures['nombre'] != nombre_attendu:
+                logger.error(
+                    f"Écart sur le portefeuille {portefeuille_id} : solde {portefeuille.solde}, "
+                    f"journal {attendu} ({ecritures['nombre']}/{nombre_attendu} écritures)"
+                )
+                return False
+
+            Portefeuille.objects.filter(pk=portefeuille_id).update(
+                solde_controle=portefeuille.solde,
+                numero_controle=portefeuille.nb_ecritures,
+                date_controle=timezone.now()
+            )
+        return True
+
+    @classmethod
+    def controler_tous(cls):
+        """
+        Pose un point de contrôle sur les portefeuilles ayant de nouvelles
+        écritures (tâche portefeuilles.controler_soldes)
+
+        Returns:
+            dict: {'controles', 'ecarts'}
+        """
+        rapport = {'controles': 0, 'ecarts': 0}
+        a_controler = Portefeuille.objects.filter(nb_ecritures__gt=F('numero_controle')).order_by('pk')
+        dernier = 0
+        while True:
+            lot = list(a_controler.filter(pk__gt=dernier).values_list('pk', flat=True)[:cls.TAILLE_LOT_CONTROLE])
+            if not lot:
+                return rapport
+            for portefeuille_id in lot:
+                rapport['controles' if cls.controler(portefeuille_id) else 'ecarts'] += 1
+            dernier = lot[-1]
@@ -0,0 +1,283 @@
+import hashlib
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from location.models import EvenementWebhook, Paiement
+from location.payments.http_client import ProviderClient
+from location.payments.paypal_auth import PaypalTokenManager
+from location.services.payment_reconciliation_service import PaymentReconciliationService
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookService:
+    """
+    Réception rapide et traitement asynchrone des webhooks de paiement.
+
+    La vue ne fait que le contrôle local (signature HMAC Wave, signature Stripe),
+    enregistre la notification brute (EvenementWebhook) et répond 200. Une
+    notification déjà reçue (même fournisseur et event_id) n'est ni réenregistrée
+    ni retraitée.
+
+    Celery traite ensuite les notifications d'un même paiement dans leur ordre
+    de réception : les vérifications distantes (Orange Money, signature PayPal)
+    sont faites hors transaction, puis le paiement est verrouillé et les
+    notifications appliquées une à une. Un paiement réussi ou remboursé n'est
+    pas rétrogradé par une notification d'échec tardive, et un paiement réussi
+    dont la réservation a été annulée entre-temps est signalé à rembourser
+    sans reconfirmer la réservation. Toute erreur de traitement compte dans
+    les MAX_TENTATIVES de la notification.
+    """
+
+    MAX_TENTATIVES = 5
+    DELAI_RELANCE = timedelta(minutes=1)
+    TAILLE_LOT = 200
+    STATUTS_DEFINITIFS = ['REUSSI', 'REMBOURSE']
+
+    # --- Réception (vue) ------------------------------------------------------
+
+    @staticmethod
+    def _empreinte(*parties):
+        """Identifiant de repli quand le fournisseur n'en fournit pas"""
+        return hashlib.sha256('|'.join(str(partie) for partie in parties).encode()).hexdigest()
+
+    @classmethod
+    def identifier(cls, fournisseur, payload):
+        """
+        Returns:
+            tuple: (event_id, transaction_id, type_evenement) extraits de la notification
+        """
+        if fournisseur == 'STRIPE':
+            objet = payload.get('data', {}).get('object', {})
+            return payload['id'], objet.get('id', ''), payload.get('type', '')
+        if fournisseur == 'PAYPAL':
+            transaction_id = payload.get('resource', {}).get('custom_id') or ''
+            return payload['id'], transaction_id, payload.get('event_type', '')
+        if fournisseur == 'WAVE':
+            transaction_id = payload.get('client_reference') or ''
+            event_id = payload.get('id') or cls._empreinte(transaction_id, payload.get('status'))
+            return event_id, transaction_id, payload.get('status', '')
+        # Orange Money : pas d'identifiant d'événement, une notification par statut
+        transaction_id = payload.get('txnid') or ''
+        return cls._empreinte(transaction_id, payload.get('status')), transaction_id, payload.get('status', '')
+
+    @classmethod
+    def recevoir(cls, fournisseur, payload, en_tetes=None):
+        """
+        Enregistre la notification et planifie son traitement après commit.
+
+        Returns:
+            tuple: (EvenementWebhook, créé) ; créé vaut False pour un doublon
+        """
+        event_id, transaction_id, type_evenement = cls.identifier(fournisseur, payload)
+        try:
+            with transaction.atomic():
+                evenement = EvenementWebhook.objects.create(
+                    fournisseur=fournisseur,
+                    event_id=event_id,
+                    transaction_id=transaction_id,
+                    type_evenement=type_evenement,
+                    payload=payload,
+                    en_tetes=en_tetes or {}
+                )
+        except IntegrityError:
+            logger.info(f"Webhook {fournisseur} {event_id} déjà reçu")
+            return EvenementWebhook.objects.get(fournisseur=fournisseur, event_id=event_id), False
+
+        from location.tasks.webhook_tasks import traiter_webhooks
+        transaction.on_commit(lambda: traiter_webhooks.delay(fournisseur, transaction_id))
+        return evenement, True
+
+    # --- Vérification (Celery, hors transaction) -----------------------------
+    # Retournent le statut de paiement à appliquer, None si sans effet, ou lèvent
+    # ValueError si la notification est rejetée.
+
+    @staticmethod
+    def verifier_orange(evenement):
+        response = ProviderClient.pour('ORANGE').post(
+            f"{settings.ORANGE_MONEY_API_URL}/verify",
+            json={'transaction_id': evenement.transaction_id},
+            headers={'Authorization': f'Bearer {settings.ORANGE_MONEY_API_KEY}'},
+            idempotent=True
+        )
+        response.raise_for_status()
+        verification = response.json()
+        if evenement.payload.get('status') == 'SUCCESS' and verification.get('verified'):
+            return 'REUSSI'
+        return 'ECHOUE'
+
+    @staticmethod
+    def verifier_paypal(evenement):
+        en_tetes = evenement.en_tetes
+        response = PaypalTokenManager.requete(
+            'POST',
+            f"{settings.PAYPAL_API_URL}/v1/notifications/verify-webhook-signature",
+            json={
+                "auth_algo": en_tetes.get('Paypal-Auth-Algo') or "SHA256withRSA",
+                "cert_url": en_tetes.get('Paypal-Cert-Url'),
+                "transmission_id": en_tetes.get('Paypal-Transmission-Id'),
+                "transmission_sig": en_tetes.get('Paypal-Transmission-Sig'),
+                "transmission_time": en_tetes.get('Paypal-Transmission-Time'),
+                "webhook_id": settings.PAYPAL_WEBHOOK_ID,
+                "webhook_event": evenement.payload
+            },
+            idempotent=True
+        )
+        response.raise_for_status()
+        if response.json().get('verification_status') != 'SUCCESS':
+            raise ValueError("Signature PayPal invalide")
+        return {
+            'PAYMENT.CAPTURE.COMPLETED': 'REUSSI',
+            'PAYMENT.CAPTURE.DENIED': 'ECHOUE',
+        }.get(evenement.type_evenement)
+
+    @staticmethod
+    def verifier_wave(evenement):
+        # Signature HMAC contrôlée à la réception
+        return 'REUSSI' if evenement.payload.get('status') == 'completed' else 'ECHOUE'
+
+    @staticmethod
+    def verifier_stripe(evenement):
+        # Signature contrôlée à la réception ; un échec d'intent peut être retenté
+        # par le client avec le même PaymentIntent : il reste sans effet ici
+        return 'REUSSI' if evenement.type_evenement == 'payment_intent.succeeded' else None
+
+    VERIFICATEURS = {
+        'ORANGE': 'verifier_orange',
+        'PAYPAL': 'verifier_paypal',
+        'WAVE': 'verifier_wave',
+        'STRIPE': 'verifier_stripe',
+    }
+
+    # --- Traitement (Celery) --------------------------------------------------
+
+    @staticmethod
+    def _clore(evenement, statut, erreur=''):
+        EvenementWebhook.objects.filter(pk=evenement.pk).update(
+            statut=statut, erreur=erreur, date_traitement=timezone.now()
+        )
+
+    @classmethod
+    def _echec(cls, evenement, erreur):
+        """Erreur de traitement : l'événement reste 'recu' jusqu'à MAX_TENTATIVES"""
+        tentatives = evenement.tentatives + 1
+        statut = 'echoue' if tentatives >= cls.MAX_TENTATIVES else 'recu'
+        # Conditionnel : un autre worker a pu le traiter entre-temps
+        EvenementWebhook.objects.filter(pk=evenement.pk, statut='recu').update(
+            tentatives=tentatives, statut=statut, erreur=erreur,
+            date_traitement=timezone.now() if statut == 'echoue' else None
+        )
+        logger.warning(f"Webhook {evenement} : tentative {tentatives} en échec ({erreur})")
+
+    @classmethod
+    def appliquer(cls, paiement, statut, payload):
+        """
+        Met à jour le paiement (verrouillé par l'appelant) et confirme sa
+        réservation (PaymentReconciliationService.confirmer_reservation)
+        """
+        if paiement.statut in cls.STATUTS_DEFINITIFS and statut != paiement.statut:
+            return False
+        paiement.statut = statut
+        paiement.reponse_api = payload
+        if statut == 'REUSSI':
+            PaymentReconciliationService.confirmer_reservation(paiement)
+        paiement.save()
+        return True
+
+    @classmethod
+    def traiter(cls, fournisseur, transaction_id):
+        """
+        Traite, dans l'ordre de réception, les notifications en attente d'un paiement.
+
+        Returns:
+            dict: {'traites', 'ignores', 'rejetes', 'erreurs'}
+        """
+        rapport = {'traites': 0, 'ignores': 0, 'rejetes': 0, 'erreurs': 0}
+        evenements = list(
+            EvenementWebhook.objects.filter(
+                fournisseur=fournisseur, transaction_id=transaction_id, statut='recu'
+            ).order_by('id')
+        )
+        if not evenements:
+            return rapport
+        if not transaction_id:
+            for evenement in evenements:
+                cls._clore(evenement, 'ignore', "Notification sans transaction")
+            rapport['ignores'] = len(evenements)
+            return rapport
+
+        verificateur = getattr(cls, cls.VERIFICATEURS[fournisseur])
+        verifies = {}
+        for evenement in evenements:
+            try:
+                verifies[evenement.id] = verificateur(evenement)
+            except ValueError as e:
+                cls._clore(evenement, 'rejete', str(e))
+                rapport['rejetes'] += 1
+            except Exception as e:
+                # Les suivantes attendent : l'ordre de réception est conservé
+                cls._echec(evenement, str(e))
+                rapport['erreurs'] += 1
+                break
+
+        if not verifies:
+            return rapport
+
+        appliques = {'traites': 0, 'ignores': 0}
+        try:
+            with transaction.atomic():
+                paiement = (
+                    Paiement.objects.select_for_update(of=('self',))
+                    .select_related('reservation').filter(transaction_id=transaction_id).first()
+                )
+                # Relus sous verrou : un autre worker a pu les traiter entre-temps
+                a_appliquer = (
+                    EvenementWebhook.objects.select_for_update()
+                    .filter(id__in=list(verifies), statut='recu').order_by('id')
+                )
+                for evenement in a_appliquer:
+                    statut = verifies[evenement.id]
+                    if paiement is None:
+                        cls._clore(evenement, 'ignore', "Paiement introuvable")
+                        appliques['ignores'] += 1
+                    elif statut and cls.appliquer(paiement, statut, evenement.payload):
+                        cls._clore(evenement, 'traite')
+                        appliques['traites'] += 1
+                        logger.info(f"Webhook {fournisseur} appliqué : paiement {transaction_id} {statut}")
+                    else:
+                        cls._clore(evenement, 'ignore')
+                        appliques['ignores'] += 1
+        except Exception as e:
+            # Transaction annulée : aucune notification vérifiée n'a été appliquée
+            for evenement in evenements:
+                if evenement.id in verifies:
+                    cls._echec(evenement, str(e))
+                    rapport['erreurs'] += 1
+            return rapport
+
+        rapport['traites'] += appliques['traites']
+        rapport['ignores'] += appliques['ignores']
+        return rapport
+
+    @classmethod
+    def en_attente(cls):
+        """(fournisseur, transaction_id) ayant des notifications non traitées depuis DELAI_RELANCE"""
+        return (
+            EvenementWebhook.objects.filter(
+                statut='recu', date_reception__lt=timezone.now() - cls.DELAI_RELANCE
+            )
+            .order_by('fournisseur', 'transaction_id')
+            .values_list('fournisseur', 'transaction_id')
+            .distinct()[:cls.TAILLE_LOT]
+        )
+
+    @classmethod
+    def relancer(cls):
+        """Traite les notifications restées en attente (tâche perdue, erreur temporaire)"""
+        total = {'traites': 0, 'ignores': 0, 'rejetes': 0, 'erreurs': 0}
+        for fournisseur, transaction_id in list(cls.en_attente()):
+            for cle, valeur in cls.traiter(fournisseur, transaction_id).items():
+                total[cle] += valeur
+        return total
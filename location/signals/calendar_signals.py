@@ -0,0 +1,22 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from location.models import Reservation
+from location.services.calendar_service import CalendarService
+
+@receiver(pre_save, sender=Reservation)
+def memoriser_periode_calendrier(sender, instance, **kwargs):
+    """Conserve l'ancienne période pour invalider aussi les mois quittés"""
+    instance._periode_calendrier = None
+    if instance.pk:
+        instance._periode_calendrier = Reservation.objects.filter(pk=instance.pk).values_list(
+            'voiture_id', 'date_debut', 'date_fin'
+        ).first()
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalider_calendrier(sender, instance, **kwargs):
+    """Invalide uniquement les mois touchés par la réservation"""
+    ancienne = getattr(instance, '_periode_calendrier', None)
+    if ancienne:
+        CalendarService.invalider(*ancienne)
+    CalendarService.invalider(instance.voiture_id, instance.date_debut, instance.date_fin)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from location.models import Voiture, Reservation
+from location.services.listing_cache_service import ListingCacheService
+
+@receiver(post_save, sender=Voiture)
+@receiver(post_delete, sender=Voiture)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_listing_cache(sender, instance, **kwargs):
+    """Toute modification de l'inventaire ou des réservations invalide les pages en cache"""
+    ListingCacheService.invalidate()
@@ -0,0 +1,21 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from location.models import Evaluation, EvaluationLoueur
+from location.services.rating_service import RatingService
+
+@receiver(pre_save, sender=Evaluation)
+@receiver(pre_save, sender=EvaluationLoueur)
+def memoriser_note(sender, instance, **kwargs):
+    """Conserve l'ancienne note et ses cibles pour les retirer des agrégats"""
+    instance._etat_notes = RatingService.etat_avant(instance)
+
+@receiver(post_save, sender=Evaluation)
+@receiver(post_save, sender=EvaluationLoueur)
+def enregistrer_note(sender, instance, **kwargs):
+    RatingService.enregistrer(instance, getattr(instance, '_etat_notes', None))
+
+@receiver(post_delete, sender=Evaluation)
+@receiver(post_delete, sender=EvaluationLoueur)
+def retirer_note(sender, instance, **kwargs):
+    """Aussi envoyé pour les suppressions en cascade et QuerySet.delete()"""
+    RatingService.supprimer(instance)
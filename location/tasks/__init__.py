@@ -1,3 +1,7 @@
 from .payment_tasks import *  # noqa
 from .messaging_tasks import *  # noqa
-
+from .reservation_tasks import *  # noqa
+from .webhook_tasks import *  # noqa
+from .currency_tasks import *  # noqa
+from .wallet_tasks import *  # noqa
+from .payout_tasks import *  # noqa
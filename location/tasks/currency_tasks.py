@@ -0,0 +1,17 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(
+    bind=True,
+    name='devises.rafraichir_taux',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3}
+)
+def rafraichir_taux(self):
+    """Récupère et publie les taux de change (Celery beat) ; les requêtes web ne les récupèrent jamais"""
+    from location.services.currency_service import CurrencyService
+    table = CurrencyService.refresh_rates()
+    return {'date': table.date, 'taux': {code: str(taux) for code, taux in table.taux.items()}}
@@ -0,0 +1,68 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sous task_soft_time_limit (300 s, moncaisson/celery.py) : le lot en cours a
+# le temps de s'enregistrer ; le budget n'est vérifié qu'entre deux lots
+BUDGET_VIREMENTS = 4 * 60
+
+MESSAGES_VIREMENT = {
+    'envoye': ("Votre retrait a été versé",
+               "Votre retrait de {montant} XOF a été versé sur le {destinataire}."),
+    'echoue': ("Votre retrait n'a pas pu être versé",
+               "Le versement de {montant} XOF sur le {destinataire} a échoué ; "
+               "le montant a été recrédité sur votre portefeuille."),
+    'rejete': ("Votre demande de retrait a été rejetée",
+               "Votre demande de retrait de {montant} XOF a été rejetée : {erreur}."),
+}
+
+
+@shared_task(
+    bind=True,
+    name='virements.executer',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def executer_virements(self, budget=BUDGET_VIREMENTS):
+    """Verse par lots les demandes de retrait en attente (Celery beat)"""
+    from location.services.payout_service import PayoutService
+    return PayoutService.executer(budget=budget)
+
+
+@shared_task(
+    bind=True,
+    name='virements.notifier',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='notifications'
+)
+def notifier_virements(self, lot_id):
+    """Informe par email les bénéficiaires des virements d'un lot dont l'issue est connue"""
+    from location.models import Virement
+    from location.services.payout_service import PayoutService
+
+    notifies = []
+    for virement in PayoutService.a_notifier(lot_id):
+        sujet, corps = MESSAGES_VIREMENT[virement.statut]
+        utilisateur = virement.transaction.user
+        try:
+            if utilisateur.email:
+                send_mail(
+                    sujet,
+                    corps.format(montant=virement.montant, destinataire=virement.destinataire, erreur=virement.erreur),
+                    getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@moncaisson.com'),
+                    [utilisateur.email]
+                )
+        except Exception as e:
+            logger.error(f"Échec de notification du virement {virement.reference} : {e}")
+            continue
+        notifies.append(virement.pk)
+
+    Virement.objects.filter(pk__in=notifies).update(notifie=True)
+    return len(notifies)
@@ -0,0 +1,30 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(
+    bind=True,
+    name='reservation.expirer_attentes',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def expirer_reservations_attente(self, taille_lot=None):
+    """Annule par lots les réservations restées en attente de paiement (Celery beat)"""
+    from location.services.expiration_service import ExpirationService
+    return ExpirationService.executer(taille_lot=taille_lot)
+
+@shared_task(
+    bind=True,
+    name='reservation.terminer_locations',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def terminer_locations(self, taille_lot=None):
+    """Passe les locations finies à 'termine' avec effets de bord groupés (Celery beat, nuit)"""
+    from location.services.completion_service import CompletionService
+    return CompletionService.executer(taille_lot=taille_lot)
@@ -0,0 +1,20 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(
+    bind=True,
+    name='portefeuilles.controler_soldes',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def controler_soldes(self):
+    """Pose un point de contrôle sur les portefeuilles ayant de nouvelles écritures (Celery beat)"""
+    from location.services.wallet_service import WalletService
+    rapport = WalletService.controler_tous()
+    if rapport['ecarts']:
+        logger.error(f"{rapport['ecarts']} portefeuille(s) en écart avec leur journal")
+    return rapport
@@ -0,0 +1,30 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(
+    bind=True,
+    name='webhooks.traiter',
+    autoretry_for=(Exception,),
+    retry_backoff=30,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def traiter_webhooks(self, fournisseur, transaction_id):
+    """Vérifie et applique, dans l'ordre de réception, les notifications d'un paiement"""
+    from location.services.webhook_service import WebhookService
+    return WebhookService.traiter(fournisseur, transaction_id)
+
+@shared_task(
+    bind=True,
+    name='webhooks.relancer',
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_kwargs={'max_retries': 3},
+    queue='payments'
+)
+def relancer_webhooks(self):
+    """Reprend les notifications restées non traitées (Celery beat)"""
+    from location.services.webhook_service import WebhookService
+    return WebhookService.relancer()
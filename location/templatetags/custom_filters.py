@@ -1,5 +1,6 @@
 from django import template
 from django.conf import settings
+from location.services.price_display_service import PriceDisplayService
 import os
 
 register = template.Library()
@@ -21,6 +22,16 @@ def subtract(value, arg):
     except (TypeError, ValueError):
         return 0
 
+# Prix dans la devise du visiteur
+@register.filter
+def prix_affiche(objet, champ='prix_jour'):
+    """Prix précalculé par PriceDisplayService.preparer, sinon montant XOF formaté"""
+    prix = getattr(objet, 'prix_affiches', None)
+    if prix and champ in prix:
+        return prix[champ]
+    montant = getattr(objet, champ, None)
+    return '' if montant is None else PriceDisplayService.formater(montant, PriceDisplayService.DEVISE_BASE)
+
 # Accès aux dictionnaires
 @register.filter
 def get_item(dictionary, key):
@@ -0,0 +1,116 @@
+# location/tests/test_availability.py
+import os
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from location.models.core_models import User, Voiture, Reservation
+from location.models.availability_models import CreneauOccupe
+from location.services.availability_service import AvailabilityService
+
+class AvailabilityServiceTest(TestCase):
+    def setUp(self):
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.autre_voiture = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Peugeot',
+            modele='208',
+            annee=2021,
+            prix_jour=12000,
+            ville='Abidjan'
+        )
+
+    def _reserver(self, date_debut, date_fin, statut='confirme'):
+        return Reservation.objects.create(
+            voiture=self.voiture,
+            client=self.loueur,
+            date_debut=date_debut,
+            date_fin=date_fin,
+            montant_paye=Decimal('30000'),
+            statut=statut
+        )
+
+    def _disponibles(self, date_debut, date_fin):
+        return set(AvailabilityService.filtrer_disponibles(
+            Voiture.objects.all(), date_debut, date_fin
+        ).values_list('id', flat=True))
+
+    def test_creneau_suit_le_statut(self):
+        reservation = self._reserver(date(2030, 1, 10), date(2030, 1, 15), statut='attente_paiement')
+        self.assertFalse(CreneauOccupe.objects.filter(reservation=reservation).exists())
+
+        reservation.statut = 'confirme'
+        reservation.save()
+        self.assertTrue(CreneauOccupe.objects.filter(reservation=reservation).exists())
+
+        reservation.statut = 'annule'
+        reservation.save()
+        self.assertFalse(CreneauOccupe.objects.filter(reservation=reservation).exists())
+
+    def test_chevauchement_identique_a_est_disponible_pour_periode(self):
+        self._reserver(date(2030, 1, 10), date(2030, 1, 15))
+        periodes = [
+            (date(2030, 1, 5), date(2030, 1, 10)),   # se termine le jour du début
+            (date(2030, 1, 15), date(2030, 1, 20)),  # commence le jour de la fin
+            (date(2030, 1, 12), date(2030, 1, 13)),  # incluse
+            (date(2030, 1, 1), date(2030, 1, 31)),   # englobante
+            (date(2030, 1, 14), date(2030, 1, 16)),  # à cheval
+        ]
+        for date_debut, date_fin in periodes:
+            self.assertEqual(
+                self.voiture.id in self._disponibles(date_debut, date_fin),
+                self.voiture.est_disponible_pour_periode(date_debut, date_fin)
+            )
+            self.assertIn(self.autre_voiture.id, self._disponibles(date_debut, date_fin))
+
+    def test_sync_reservations_reconstruit_l_index(self):
+        reservation = self._reserver(date(2030, 2, 1), date(2030, 2, 5))
+        Reservation.objects.filter(id=reservation.id).update(statut='termine')
+        self.assertEqual(AvailabilityService.sync_reservations([reservation.id]), 0)
+        self.assertIn(self.voiture.id, self._disponibles(date(2030, 2, 2), date(2030, 2, 3)))
+
+    def test_disponibilites_groupees(self):
+        self._reserver(date(2030, 3, 10), date(2030, 3, 15))
+        periodes = [(date(2030, 3, 1), date(2030, 3, 5)), (date(2030, 3, 12), date(2030, 3, 13))]
+        with self.assertNumQueries(1):
+            resultats = AvailabilityService.disponibilites(Voiture.objects.all(), periodes)
+        self.assertEqual(resultats[self.voiture.id]['disponibilites'], [True, False])
+        self.assertEqual(resultats[self.autre_voiture.id]['disponibilites'], [True, True])
+
+    def test_endpoint_disponibilites(self):
+        self._reserver(date(2030, 4, 10), date(2030, 4, 15))
+        response = self.client.get(reverse('location:check_disponibilites'), {
+            'ids': f'{self.voiture.id},{self.autre_voiture.id}',
+            'periode': ['2030-04-01:2030-04-05', '2030-04-11:2030-04-12'],
+        })
+        self.assertEqual(response.status_code, 200)
+        voitures = {v['id']: v for v in response.json()['voitures']}
+        self.assertFalse(voitures[self.voiture.id]['disponible'])
+        self.assertEqual(voitures[self.voiture.id]['disponibilites'], [True, False])
+        self.assertTrue(voitures[self.autre_voiture.id]['disponible'])
+
+    def test_endpoint_periode_invalide(self):
+        response = self.client.get(reverse('location:check_disponibilites'), {
+            'ids': str(self.voiture.id),
+            'periode': '2030-04-05:2030-04-01',
+        })
+        self.assertEqual(response.status_code, 400)
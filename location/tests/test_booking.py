@@ -0,0 +1,142 @@
+# location/tests/test_booking.py
+import os
+import threading
+from datetime import date, timedelta
+from unittest import mock
+from django.db import connection, connections, IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+from location.models.core_models import User, Voiture, Reservation
+from location.services.booking_service import BookingService, DatesIndisponibles
+
+
+def creer_voiture():
+    proprietaire = User.objects.create_user(
+        username='proprio',
+        email='proprio@example.com',
+        password=os.getenv('TEST_PWD'),
+        user_type='PROPRIETAIRE'
+    )
+    return Voiture.objects.create(
+        proprietaire=proprietaire,
+        marque='Toyota',
+        modele='Corolla',
+        annee=2020,
+        prix_jour=15000,
+        ville='Abidjan'
+    )
+
+
+def creer_loueur(numero=0):
+    return User.objects.create_user(
+        username=f'loueur{numero}',
+        email=f'loueur{numero}@example.com',
+        password=os.getenv('TEST_PWD'),
+        user_type='LOUEUR'
+    )
+
+
+class BookingServiceTest(TestCase):
+    def setUp(self):
+        self.voiture = creer_voiture()
+        self.loueur = creer_loueur()
+        self.debut = date.today() + timedelta(days=10)
+
+    def test_reserver_calcule_montants(self):
+        reservation, devis = BookingService.reserver(
+            self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3)
+        )
+        self.assertEqual(reservation.statut, 'attente_paiement')
+        self.assertEqual(reservation.frais_service, devis['frais'])
+        self.assertEqual(reservation.montant_total, devis['total'])
+
+    def test_chevauchement_refuse(self):
+        BookingService.reserver(self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3))
+        with self.assertRaises(DatesIndisponibles):
+            BookingService.reserver(
+                self.voiture, creer_loueur(1), self.debut + timedelta(days=2), self.debut + timedelta(days=5)
+            )
+
+    def test_periodes_contigues_acceptees(self):
+        BookingService.reserver(self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3))
+        BookingService.reserver(
+            self.voiture, creer_loueur(1), self.debut + timedelta(days=3), self.debut + timedelta(days=5)
+        )
+        self.assertEqual(Reservation.objects.filter(voiture=self.voiture).count(), 2)
+
+    def test_reservation_annulee_libere_les_dates(self):
+        reservation, _ = BookingService.reserver(
+            self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3)
+        )
+        reservation.statut = 'annule'
+        reservation.save()
+        BookingService.reserver(self.voiture, creer_loueur(1), self.debut, self.debut + timedelta(days=3))
+
+    def test_panne_du_hold_sans_effet_sur_la_reservation(self):
+        with mock.patch('location.services.booking_service.HoldService.poser', side_effect=ConnectionError("Redis")):
+            with self.captureOnCommitCallbacks(execute=True):
+                reservation, _ = BookingService.reserver(
+                    self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3)
+                )
+        self.assertTrue(Reservation.objects.filter(pk=reservation.pk, statut='attente_paiement').exists())
+
+    def test_contrainte_exclusion(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest("Contrainte d'exclusion PostgreSQL")
+        BookingService.reserver(self.voiture, self.loueur, self.debut, self.debut + timedelta(days=3))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            # Écriture directe qui contourne le service
+            Reservation.objects.create(
+                voiture=self.voiture,
+                client=creer_loueur(1),
+                date_debut=self.debut + timedelta(days=1),
+                date_fin=self.debut + timedelta(days=4),
+                statut='confirme',
+            )
+
+
+class BookingConcurrenceTest(TransactionTestCase):
+    NB_THREADS = 20
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest("Verrous de ligne PostgreSQL requis")
+        self.voiture = creer_voiture()
+        self.loueurs = [creer_loueur(i) for i in range(self.NB_THREADS)]
+
+    def test_aucune_double_reservation(self):
+        debut = date.today() + timedelta(days=30)
+        depart = threading.Barrier(self.NB_THREADS)
+        resultats = []
+
+        def reserver(loueur, decalage):
+            try:
+                depart.wait()
+                # Périodes de 3 jours décalées d'un jour : chacune chevauche ses voisines
+                BookingService.reserver(
+                    self.voiture, loueur,
+                    debut + timedelta(days=decalage), debut + timedelta(days=decalage + 3)
+                )
+                resultats.append('ok')
+            except DatesIndisponibles:
+                resultats.append('conflit')
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=reserver, args=(loueur, i % 6))
+            for i, loueur in enumerate(self.loueurs)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(resultats), self.NB_THREADS)
+        self.assertGreaterEqual(resultats.count('ok'), 1)
+
+        actives = list(Reservation.objects.filter(
+            voiture=self.voiture, statut__in=BookingService.STATUTS_ACTIFS
+        ).order_by('date_debut').values_list('date_debut', 'date_fin'))
+        self.assertEqual(len(actives), resultats.count('ok'))
+        for (_, fin), (debut_suivante, _) in zip(actives, actives[1:]):
+            self.assertLessEqual(fin, debut_suivante)
@@ -0,0 +1,92 @@
+# location/tests/test_calendar.py
+import os
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from location.models.core_models import User, Voiture, Reservation
+from location.services.calendar_service import CalendarService
+import location.signals.calendar_signals  # noqa: F401 (connexion des receivers)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CalendarServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+
+    def _reserver(self, date_debut, date_fin, statut='confirme'):
+        return Reservation.objects.create(
+            voiture=self.voiture,
+            client=self.loueur,
+            date_debut=date_debut,
+            date_fin=date_fin,
+            montant_paye=Decimal('30000'),
+            statut=statut
+        )
+
+    def test_bitmap_a_cheval_sur_deux_mois(self):
+        self._reserver(date(2030, 1, 30), date(2030, 2, 2))
+        janvier, fevrier = CalendarService.bitmaps(self.voiture.id, 2030, 1, 2)
+        self.assertEqual(janvier['occupes'], (1 << 29) | (1 << 30))  # 30 et 31 janvier
+        self.assertEqual(fevrier['occupes'], 1)  # 1er février (le 2 est le jour de retour)
+
+    def test_reservation_annulee_ignoree(self):
+        self._reserver(date(2030, 3, 10), date(2030, 3, 12), statut='annule')
+        self.assertEqual(CalendarService.jours_occupes(self.voiture.id, 2030, 3), [])
+
+    def test_invalidation_limitee_aux_mois_touches(self):
+        CalendarService.bitmaps(self.voiture.id, 2030, 4, 3)
+        self._reserver(date(2030, 5, 3), date(2030, 5, 5))
+        self.assertIsNotNone(cache.get(CalendarService.cache_key(self.voiture.id, 2030, 4)))
+        self.assertIsNone(cache.get(CalendarService.cache_key(self.voiture.id, 2030, 5)))
+        self.assertEqual(
+            CalendarService.jours_occupes(self.voiture.id, 2030, 5),
+            [date(2030, 5, 3), date(2030, 5, 4)]
+        )
+
+    def test_deplacement_invalide_l_ancien_mois(self):
+        reservation = self._reserver(date(2030, 6, 3), date(2030, 6, 5))
+        CalendarService.bitmaps(self.voiture.id, 2030, 6, 2)
+        reservation.date_debut, reservation.date_fin = date(2030, 7, 3), date(2030, 7, 5)
+        reservation.save()
+        self.assertEqual(CalendarService.jours_occupes(self.voiture.id, 2030, 6), [])
+        self.assertEqual(len(CalendarService.jours_occupes(self.voiture.id, 2030, 7)), 2)
+
+    def test_endpoint_douze_mois(self):
+        response = self.client.get(
+            reverse('location:calendrier_disponibilite', args=[self.voiture.id]),
+            {'debut': '2030-01'}
+        )
+        self.assertEqual(response.status_code, 200)
+        mois = response.json()['mois']
+        self.assertEqual(len(mois), 12)
+        self.assertEqual(mois[-1]['mois'], '2030-12')
+
+    def test_endpoint_parametres_hors_limites(self):
+        url = reverse('location:calendrier_disponibilite', args=[self.voiture.id])
+        for params in ({'mois': '0'}, {'mois': '-3'}, {'mois': '25'}, {'mois': '10000000'},
+                       {'debut': '9999-12', 'mois': '1'}, {'debut': '9999-06', 'mois': '24'}):
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+        self.assertEqual(self.client.get(url, {'debut': '9999-11', 'mois': '1'}).status_code, 200)
@@ -0,0 +1,136 @@
+# location/tests/test_completion.py
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from location.models import Litige, LoyaltyProfile
+from location.models.availability_models import CreneauOccupe
+from location.models.core_models import User, Voiture, Reservation
+from location.services.completion_service import CompletionService
+from location.services.loyalty_service import LoyaltyService
+from location.services.trust_service import TrustService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CompletionServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.aujourdhui = date(2030, 6, 15)
+
+    def _reserver(self, date_debut, date_fin, statut='confirme', caution=Decimal('0')):
+        return Reservation.objects.create(
+            voiture=self.voiture,
+            client=self.loueur,
+            date_debut=date_debut,
+            date_fin=date_fin,
+            montant_paye=Decimal('30000'),
+            caution_paid=caution,
+            caution_status='pending' if caution else 'not_required',
+            statut=statut
+        )
+
+    def test_termine_par_lots(self):
+        finies = [
+            self._reserver(date(2030, 6, 1) + timedelta(days=3 * i), date(2030, 6, 3) + timedelta(days=3 * i))
+            for i in range(3)
+        ]
+        en_cours = self._reserver(date(2030, 6, 14), date(2030, 6, 17))
+        annulee = self._reserver(date(2030, 5, 1), date(2030, 5, 3), statut='annule')
+
+        rapport = CompletionService.executer(date_limite=self.aujourdhui, taille_lot=2)
+
+        self.assertEqual(rapport['terminees'], 3)
+        self.assertEqual(rapport['lots'], 2)
+        self.assertEqual(
+            set(rapport['durees']), {'transition', 'cautions', 'creneaux', 'confiance', 'fidelite', 'caches'}
+        )
+        self.assertEqual(
+            set(Reservation.objects.filter(statut='termine').values_list('id', flat=True)),
+            {r.pk for r in finies}
+        )
+        en_cours.refresh_from_db()
+        annulee.refresh_from_db()
+        self.assertEqual(en_cours.statut, 'confirme')
+        self.assertEqual(annulee.statut, 'annule')
+
+        # Plus de créneau occupé pour les locations terminées
+        self.assertEqual(
+            set(CreneauOccupe.objects.values_list('reservation_id', flat=True)), {en_cours.pk}
+        )
+
+    def test_cautions_liberees_sauf_litige(self):
+        sans_litige = self._reserver(date(2030, 6, 1), date(2030, 6, 3), caution=Decimal('50000'))
+        avec_litige = self._reserver(date(2030, 6, 5), date(2030, 6, 8), caution=Decimal('50000'))
+        Litige.objects.create(reservation=avec_litige, created_by=self.proprietaire, motif='Rayure', statut='ouvert')
+
+        rapport = CompletionService.executer(date_limite=self.aujourdhui)
+
+        self.assertEqual(rapport['cautions'], 1)
+        sans_litige.refresh_from_db()
+        avec_litige.refresh_from_db()
+        self.assertEqual(sans_litige.caution_status, 'refunded')
+        self.assertEqual(avec_litige.caution_status, 'pending')
+
+    def test_confiance_et_fidelite(self):
+        for i in range(2):
+            self._reserver(date(2030, 6, 1) + timedelta(days=3 * i), date(2030, 6, 3) + timedelta(days=3 * i))
+        LoyaltyProfile.objects.filter(user=self.loueur).delete()
+        User.objects.filter(pk__in=[self.loueur.pk, self.proprietaire.pk]).update(trust_score=0)
+
+        CompletionService.executer(date_limite=self.aujourdhui)
+
+        points = 2 * LoyaltyService.ACTIVITY_POINTS['RESERVATION_TERMINEE']
+        profil = LoyaltyProfile.objects.get(user=self.loueur)
+        self.assertEqual(profil.points, points)
+        self.assertIn('BRONZE', profil.badges)  # Palier 50-199 points
+        self.loueur.refresh_from_db()
+        self.proprietaire.refresh_from_db()
+        # Même résultat que le calcul unitaire
+        self.assertEqual(self.loueur.trust_score, TrustService.calculate_user_trust_score(self.loueur))
+        self.assertEqual(self.proprietaire.trust_score, TrustService.calculate_user_trust_score(self.proprietaire))
+        self.assertGreater(self.loueur.trust_score, 0)
+
+    def test_rien_a_terminer(self):
+        rapport = CompletionService.executer(date_limite=self.aujourdhui)
+        self.assertEqual(rapport['terminees'], 0)
+        self.assertEqual(rapport['lots'], 0)
+
+    def test_interruption_annule_le_lot_entier(self):
+        reservation = self._reserver(date(2030, 6, 1), date(2030, 6, 3))
+        LoyaltyProfile.objects.filter(user=self.loueur).delete()
+        with mock.patch.object(TrustService, 'update_trust_scores', side_effect=RuntimeError("arrêt")):
+            with self.assertRaises(RuntimeError):
+                CompletionService.executer(date_limite=self.aujourdhui)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.statut, 'confirme')
+
+        # Repris au passage suivant, effets de bord compris
+        CompletionService.executer(date_limite=self.aujourdhui)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.statut, 'termine')
+        self.assertEqual(
+            LoyaltyProfile.objects.get(user=self.loueur).points, LoyaltyService.ACTIVITY_POINTS['RESERVATION_TERMINEE']
+        )
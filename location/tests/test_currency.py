@@ -0,0 +1,81 @@
+# location/tests/test_currency.py
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from location.services.currency_service import CurrencyService, TauxIndisponibles
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TAUX = {'XOF': Decimal('1'), 'EUR': Decimal('0.00152449'), 'USD': Decimal('0.00165'),
+        'GBP': Decimal('0.0013'), 'NGN': Decimal('2.55'), 'GHS': Decimal('0.0205')}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CurrencyServiceTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        CurrencyService._table = None
+        # Historique en base : voir test_rate_history
+        historique = patch.object(CurrencyService, '_save_rates_history')
+        historique.start()
+        self.addCleanup(historique.stop)
+
+    def tearDown(self):
+        CurrencyService._table = None
+
+    def test_aucun_appel_externe_pendant_la_conversion(self):
+        with patch.object(CurrencyService, '_fetch_rates') as fetch, \
+                patch('location.services.currency_service.requests.get') as get:
+            montant = CurrencyService.convert(100, 'EUR', 'XOF')
+        fetch.assert_not_called()
+        get.assert_not_called()
+        self.assertIsInstance(montant, Decimal)
+        self.assertEqual(CurrencyService.table().date, 'defaut')
+
+    def test_rafraichissement_publie_et_partage(self):
+        with patch.object(CurrencyService, '_fetch_rates', return_value=TAUX):
+            CurrencyService.refresh_rates()
+        date = CurrencyService.table().date
+
+        # Autre processus : table vide, relue dans le cache partagé
+        CurrencyService._table = None
+        self.assertEqual(CurrencyService.table().date, date)
+        self.assertEqual(CurrencyService.convert('1000', 'XOF', 'EUR'), Decimal('1.52'))
+        self.assertEqual(CurrencyService.convert(Decimal('1.52449'), 'eur', 'xof'), Decimal('1000.00'))
+
+    def test_table_relue_apres_ttl(self):
+        with patch.object(CurrencyService, '_fetch_rates', return_value=TAUX):
+            CurrencyService.refresh_rates()
+        date = CurrencyService.table().date
+        CurrencyService._table = None
+        ancienne = CurrencyService.table()
+
+        cache.set(CurrencyService.RATES_KEY, {'rates': {k: str(v * 2) for k, v in TAUX.items()}, 'date': 'nouvelle'})
+        self.assertEqual(CurrencyService.table().date, date)
+        ancienne.expire = 0
+        self.assertEqual(CurrencyService.table().date, 'nouvelle')
+
+    def test_sources_indisponibles(self):
+        with patch.object(CurrencyService, '_fetch_rates', side_effect=TauxIndisponibles('hors ligne')), \
+                patch.object(CurrencyService, '_get_fallback_rates', side_effect=TauxIndisponibles('hors ligne')):
+            with self.assertRaises(TauxIndisponibles):
+                CurrencyService.refresh_rates()
+        self.assertIsNone(cache.get(CurrencyService.RATES_KEY))
+
+    def test_convert_many(self):
+        with patch.object(CurrencyService, '_fetch_rates', return_value=TAUX):
+            CurrencyService.refresh_rates()
+        montants = [10000, '25000', Decimal('655957')]
+        self.assertEqual(
+            CurrencyService.convert_many(montants, 'XOF', 'EUR'),
+            [CurrencyService.convert(montant, 'XOF', 'EUR') for montant in montants]
+        )
+        self.assertEqual(CurrencyService.convert_many([], 'XOF', 'USD'), [])
+
+    def test_erreurs(self):
+        with self.assertRaises(ValueError):
+            CurrencyService.convert(100, 'JPY', 'XOF')
+        with self.assertRaises(ValueError):
+            CurrencyService.convert('abc', 'EUR', 'XOF')
+        with self.assertRaises(ValueError):
+            CurrencyService.convert_many([1, 'abc'], 'EUR', 'XOF')
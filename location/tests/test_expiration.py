@@ -0,0 +1,129 @@
+# location/tests/test_expiration.py
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from location.models import LoyaltyProfile, Paiement
+from location.models.core_models import User, Voiture, Reservation
+from location.services.expiration_service import ExpirationService
+from location.services.hold_service import HoldService
+from location.services.payment_reconciliation_service import PaymentReconciliationService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExpirationServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        LoyaltyProfile.objects.update_or_create(user=self.loueur, defaults={'points': 520, 'level': 'SILVER'})
+        self.voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+
+    def _reserver(self, date_debut, age, statut='attente_paiement'):
+        reservation = Reservation.objects.create(
+            voiture=self.voiture,
+            client=self.loueur,
+            date_debut=date_debut,
+            date_fin=date_debut + timedelta(days=2),
+            montant_paye=Decimal('30000'),
+            statut=statut
+        )
+        Reservation.objects.filter(pk=reservation.pk).update(date_creation=timezone.now() - age)
+        return reservation
+
+    def test_annule_par_lots(self):
+        expiree = timedelta(seconds=HoldService.DUREE + 60)
+        anciennes = [self._reserver(date(2030, 5, 1) + timedelta(days=3 * i), expiree) for i in range(3)]
+        recente = self._reserver(date(2030, 6, 1), timedelta(minutes=1))
+        confirmee = self._reserver(date(2030, 7, 1), expiree, statut='confirme')
+        paiement = Paiement.objects.create(reservation=anciennes[0], methode='ORANGE', montant=30000)
+
+        with mock.patch.object(
+            PaymentReconciliationService, 'verifier', return_value={paiement.id: (None, {'status': 'FAILED'})}
+        ):
+            rapport = ExpirationService.executer(taille_lot=2)
+
+        self.assertEqual(rapport['annulees'], 3)
+        self.assertEqual(rapport['lots'], 2)
+        self.assertIn('duree', rapport)
+        self.assertEqual(
+            set(Reservation.objects.filter(statut='annule').values_list('id', flat=True)),
+            {r.pk for r in anciennes}
+        )
+        recente.refresh_from_db()
+        confirmee.refresh_from_db()
+        self.assertEqual(recente.statut, 'attente_paiement')
+        self.assertEqual(confirmee.statut, 'confirme')
+
+        paiement.refresh_from_db()
+        self.assertEqual(paiement.statut, 'ECHOUE')
+
+        profil = LoyaltyProfile.objects.get(user=self.loueur)
+        self.assertEqual(profil.points, 430)
+        self.assertEqual(profil.level, 'BRONZE')
+
+        # Un seul e-mail regroupant les trois réservations
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['loueur@example.com'])
+
+    def test_hold_actif_conserve_la_reservation(self):
+        reservation = self._reserver(date(2030, 5, 1), timedelta(seconds=HoldService.DUREE + 60))
+        HoldService.poser(reservation)
+
+        self.assertEqual(ExpirationService.executer()['annulees'], 0)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.statut, 'attente_paiement')
+
+    def test_points_jamais_negatifs(self):
+        LoyaltyProfile.objects.filter(user=self.loueur).update(points=10)
+        self._reserver(date(2030, 5, 1), timedelta(seconds=HoldService.DUREE + 60))
+        ExpirationService.executer()
+        self.assertEqual(LoyaltyProfile.objects.get(user=self.loueur).points, 0)
+
+    def test_paiement_reussi_confirme_au_lieu_d_annuler(self):
+        reservation = self._reserver(date(2030, 5, 1), timedelta(seconds=HoldService.DUREE + 60))
+        paiement = Paiement.objects.create(reservation=reservation, methode='WAVE', montant=30000)
+
+        with mock.patch.object(
+            PaymentReconciliationService, 'verifier', return_value={paiement.id: ('REUSSI', {'status': 'completed'})}
+        ):
+            rapport = ExpirationService.executer()
+
+        self.assertEqual((rapport['annulees'], rapport['payees']), (0, 1))
+        reservation.refresh_from_db()
+        paiement.refresh_from_db()
+        self.assertEqual((reservation.statut, paiement.statut), ('confirme', 'REUSSI'))
+
+    def test_fournisseur_injoignable_reporte(self):
+        reservation = self._reserver(date(2030, 5, 1), timedelta(seconds=HoldService.DUREE + 60))
+        paiement = Paiement.objects.create(reservation=reservation, methode='ORANGE', montant=30000)
+
+        with mock.patch.object(PaymentReconciliationService, 'verifier', return_value={}):
+            rapport = ExpirationService.executer()
+
+        self.assertEqual((rapport['annulees'], rapport['reportees']), (0, 1))
+        reservation.refresh_from_db()
+        paiement.refresh_from_db()
+        self.assertEqual((reservation.statut, paiement.statut), ('attente_paiement', 'EN_ATTENTE'))
@@ -0,0 +1,94 @@
+# location/tests/test_geo.py
+import os
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from location.geo import covering_prefixes, geohash_encode, haversine_km, normalize_place_name
+from location.models import Ville
+from location.models.core_models import User, Voiture
+from location.services.geo_service import GeoService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class GeoUtilsTest(TestCase):
+    def test_geohash_connu(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_prefixes_couvrent_le_rayon(self):
+        prefixes = covering_prefixes(5.36, -4.0083, 10)
+        self.assertTrue(any(geohash_encode(5.30, -3.95).startswith(p) for p in prefixes))
+
+    def test_haversine(self):
+        # Abidjan -> Yamoussoukro : environ 215 km
+        self.assertAlmostEqual(haversine_km(5.36, -4.0083, 6.8276, -5.2893), 216, delta=15)
+
+    def test_normalisation(self):
+        self.assertEqual(normalize_place_name(" San-Pédro "), 'san pedro')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GeoServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        GeoService.reset_cache()
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.cocody = self.creer_voiture('Cocody', 15000)
+        self.plateau = self.creer_voiture('Plateau', 12000)
+        self.bouake = self.creer_voiture('Bouaké', 10000)
+
+    def creer_voiture(self, ville, prix):
+        return Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=prix,
+            ville=ville
+        )
+
+    def test_gazetteer_charge_par_migration(self):
+        self.assertTrue(Ville.objects.filter(nom='Abidjan').exists())
+        self.assertEqual(Ville.objects.get(nom='Cocody').parent.nom, 'Abidjan')
+
+    def test_resolution_tolere_les_fautes(self):
+        self.assertEqual(GeoService.resoudre_ville('cocodi')['nom'], 'Cocody')
+        self.assertEqual(GeoService.resoudre_ville('BOUAKE')['nom'], 'Bouaké')
+        self.assertIsNone(GeoService.resoudre_ville('Paris'))
+
+    def test_voiture_localisee_a_la_sauvegarde(self):
+        self.cocody.refresh_from_db()
+        self.assertEqual(self.cocody.ville_ref.nom, 'Cocody')
+        self.assertTrue(self.cocody.geohash)
+
+    def test_changement_de_ville(self):
+        self.cocody.ville = 'Bouaké'
+        self.cocody.save(update_fields=['ville'])
+        self.cocody.refresh_from_db()
+        self.assertEqual(self.cocody.ville_ref.nom, 'Bouaké')
+
+    def test_abidjan_inclut_les_communes(self):
+        resultats = list(GeoService.filtrer_ville(Voiture.objects.all(), 'Abidjan').order_by('distance'))
+        self.assertIn(self.cocody, resultats)
+        self.assertIn(self.plateau, resultats)
+        self.assertNotIn(self.bouake, resultats)
+
+    def test_recherche_par_point_triee_par_distance(self):
+        response = self.client.get(reverse('location:recherche'), {'lat': '5.355', 'lon': '-3.987', 'rayon': '20'})
+        self.assertEqual(list(response.context['voitures']), [self.cocody, self.plateau])
+
+    def test_ville_inconnue_repli_textuel(self):
+        voiture = self.creer_voiture('Village inconnu', 9000)
+        response = self.client.get(reverse('location:recherche'), {'ville': 'inconnu'})
+        self.assertEqual(list(response.context['voitures']), [voiture])
+
+    def test_distance_conservee_depuis_le_cache(self):
+        params = {'lat': '5.355', 'lon': '-3.987', 'rayon': '20'}
+        premiere = [v.distance for v in self.client.get(reverse('location:recherche'), params).context['voitures']]
+        en_cache = self.client.get(reverse('location:recherche'), params).context['voitures']
+        self.assertEqual(list(en_cache), [self.cocody, self.plateau])
+        self.assertEqual([v.distance for v in en_cache], premiere)
@@ -0,0 +1,93 @@
+# location/tests/test_holds.py
+import os
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from location.models.core_models import User, Voiture, Reservation
+from location.services.availability_service import AvailabilityService
+from location.services.booking_service import BookingService, DatesIndisponibles
+from location.services.hold_service import HoldService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class HoldServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.debut = date(2030, 3, 10)
+        self.fin = date(2030, 3, 13)
+
+    def _reserver(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation, _ = BookingService.reserver(self.voiture, self.loueur, self.debut, self.fin)
+        return reservation
+
+    def _vieillir(self, reservation):
+        """Simule une réservation créée il y a plus de DUREE secondes, sans hold"""
+        Reservation.objects.filter(pk=reservation.pk).update(
+            date_creation=timezone.now() - timedelta(seconds=HoldService.DUREE + 60)
+        )
+        cache.delete(HoldService.cache_key(self.voiture.pk))
+        reservation.refresh_from_db()
+        return reservation
+
+    def test_reserver_pose_un_hold(self):
+        reservation = self._reserver()
+        self.assertEqual(HoldService.holds(self.voiture.pk), {reservation.pk: (self.debut, self.fin)})
+        self.assertEqual(HoldService.voitures_retenues(date(2030, 3, 12), date(2030, 3, 20)), {self.voiture.pk})
+        self.assertEqual(HoldService.voitures_retenues(self.fin, date(2030, 3, 20)), set())
+
+    def test_recherche_exclut_voiture_retenue(self):
+        self._reserver()
+        disponibles = AvailabilityService.filtrer_disponibles(Voiture.objects.all(), self.debut, self.fin)
+        self.assertNotIn(self.voiture, disponibles)
+        self.assertFalse(self.voiture.est_disponible_pour_periode(self.debut, self.fin))
+
+    def test_paiement_libere_le_hold(self):
+        reservation = self._reserver()
+        reservation.statut = 'confirme'
+        reservation.save()
+        self.assertEqual(HoldService.holds(self.voiture.pk), {})
+        self.assertEqual(HoldService.voitures_retenues(self.debut, self.fin), set())
+
+    def test_hold_actif_bloque_nouvelle_reservation(self):
+        self._reserver()
+        with self.assertRaises(DatesIndisponibles):
+            BookingService.reserver(self.voiture, self.loueur, self.debut, self.fin)
+
+    def test_hold_expire_annule_la_reservation(self):
+        ancienne = self._vieillir(self._reserver())
+        self.assertEqual(HoldService.reservations_expirees(), [ancienne.pk])
+
+        nouvelle = self._reserver()
+        ancienne.refresh_from_db()
+        self.assertEqual(ancienne.statut, 'annule')
+        self.assertEqual(nouvelle.statut, 'attente_paiement')
+
+    def test_reservation_recente_sans_hold_reste_bloquante(self):
+        """Redis indisponible : la réservation récente bloque encore sa période"""
+        reservation = self._reserver()
+        cache.clear()
+        self.assertTrue(HoldService.est_retenue(reservation))
+        self.assertEqual(HoldService.reservations_expirees(), [])
@@ -0,0 +1,37 @@
+# location/tests/test_listing_cache.py
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from location.services.listing_cache_service import ListingCacheService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ListingCacheServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cle_normalisee(self):
+        a = ListingCacheService.make_key('recherche', QueryDict('ville=Abidjan&q=Toyota%20%20Corolla&page=1'))
+        b = ListingCacheService.make_key('recherche', QueryDict('q=toyota+corolla&ville=+abidjan&utm_source=x'))
+        self.assertEqual(a, b)
+
+    def test_invalidation_par_generation(self):
+        params = QueryDict('ville=Abidjan')
+        key = ListingCacheService.make_key('liste', params)
+        ListingCacheService.set(key, [3, 1, 2], 3, 1)
+        self.assertEqual(ListingCacheService.get(key)['ids'], [3, 1, 2])
+
+        ListingCacheService.invalidate()
+        new_key = ListingCacheService.make_key('liste', params)
+        self.assertNotEqual(key, new_key)
+        self.assertIsNone(ListingCacheService.get(new_key))
+
+    def test_compteurs(self):
+        key = ListingCacheService.make_key('liste', QueryDict(''))
+        ListingCacheService.get(key)
+        ListingCacheService.set(key, [], 0, 1)
+        ListingCacheService.get(key)
+        stats = ListingCacheService.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
@@ -0,0 +1,53 @@
+# location/tests/test_pagination.py
+import os
+from django.test import TestCase
+from location.models.core_models import User, Voiture
+from location.pagination import KeysetPaginator, InvalidCursor
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        for i in range(25):
+            Voiture.objects.create(
+                proprietaire=proprietaire,
+                marque='Toyota',
+                modele=f'Modèle {i}',
+                annee=2020,
+                prix_jour=10000 + (i % 5) * 1000,  # Prix en double pour tester l'id
+                ville='Abidjan'
+            )
+
+    def _parcourir(self, paginator):
+        ids, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            ids.extend(v.id for v in page)
+            if not page.has_next:
+                return ids, page
+            cursor = page.next_cursor
+
+    def test_parcours_complet_prix_jour(self):
+        queryset = Voiture.objects.all()
+        paginator = KeysetPaginator(queryset, ['prix_jour', 'id'], 10)
+        ids, derniere_page = self._parcourir(paginator)
+        self.assertEqual(ids, list(queryset.order_by('prix_jour', 'id').values_list('id', flat=True)))
+        self.assertEqual(derniere_page.count, 25)
+        self.assertFalse(derniere_page.count_is_estimate)
+
+    def test_page_precedente(self):
+        paginator = KeysetPaginator(Voiture.objects.all(), ['-date_creation', '-id'], 10)
+        premiere = paginator.page()
+        deuxieme = paginator.page(premiere.next_cursor)
+        retour = paginator.page(deuxieme.previous_cursor)
+        self.assertEqual([v.id for v in retour], [v.id for v in premiere])
+        self.assertFalse(retour.has_previous)
+
+    def test_curseur_invalide(self):
+        paginator = KeysetPaginator(Voiture.objects.all(), ['prix_jour', 'id'], 10)
+        with self.assertRaises(InvalidCursor):
+            paginator.page('falsifie')
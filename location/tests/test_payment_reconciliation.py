@@ -0,0 +1,125 @@
+# location/tests/test_payment_reconciliation.py
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from location.models import Paiement
+from location.models.core_models import User, Voiture, Reservation
+from location.payments.fournisseur_local import FournisseurLocal
+from location.services.payment_reconciliation_service import LimiteurDebit, PaymentReconciliationService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+LIMITES_TEST = {
+    'ORANGE': {'concurrence': 5, 'debit': 0},
+    'WAVE': {'concurrence': 5, 'debit': 0},
+    'PAYPAL': {'concurrence': 5, 'debit': 0},
+}
+
+@override_settings(CACHES=LOCMEM_CACHE, PAYMENT_VERIFICATION_LIMITS=LIMITES_TEST)
+class PaymentReconciliationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.paiements = []
+        methodes = ['ORANGE', 'WAVE', 'PAYPAL']
+        for i in range(12):
+            reservation = Reservation.objects.create(
+                voiture=voiture,
+                client=loueur,
+                date_debut=date(2030, 1, 1) + timedelta(days=3 * i),
+                date_fin=date(2030, 1, 3) + timedelta(days=3 * i),
+                montant_paye=Decimal('30000'),
+                statut='attente_paiement'
+            )
+            self.paiements.append(Paiement.objects.create(
+                reservation=reservation,
+                methode=methodes[i % 3],
+                montant=30000,
+                transaction_id=f"{'attente' if i == 0 else 'tx'}-{i}",
+            ))
+        Paiement.objects.update(date_creation=timezone.now() - timedelta(hours=1))
+
+    def test_verification_parallele(self):
+        with FournisseurLocal(latence=0.1) as fournisseur, override_settings(**fournisseur.settings()):
+            debut = time.monotonic()
+            rapport = PaymentReconciliationService.executer(taille_lot=50)
+            duree = time.monotonic() - debut
+
+        self.assertTrue(rapport['termine'])
+        self.assertEqual(rapport['verifies'], 12)
+        self.assertEqual(rapport['reussis'], 11)
+        # 12 appels + 1 token PayPal de 100 ms chacun : bien moins qu'en séquentiel
+        self.assertLess(duree, 0.8)
+        self.assertGreater(fournisseur.max_simultanes, 1)
+        self.assertLessEqual(fournisseur.max_simultanes, 15)
+
+        statuts = dict(Paiement.objects.values_list('transaction_id', 'statut'))
+        self.assertEqual(statuts['attente-0'], 'EN_ATTENTE')
+        self.assertEqual(statuts['tx-1'], 'REUSSI')
+        self.assertEqual(
+            Reservation.objects.filter(statut='confirme').count(), 11
+        )
+
+    def test_reprise_par_lots(self):
+        with FournisseurLocal(latence=0.01) as fournisseur, override_settings(**fournisseur.settings()):
+            premier = PaymentReconciliationService.executer(taille_lot=5, lots_max=1)
+            self.assertEqual(premier['verifies'], 5)
+            self.assertFalse(premier['termine'])
+            self.assertEqual(cache.get(PaymentReconciliationService.CURSEUR_KEY), self.paiements[4].id)
+
+            # La passe suivante reprend après le curseur
+            suite = PaymentReconciliationService.executer(taille_lot=5)
+            self.assertEqual(suite['verifies'], 7)
+            self.assertEqual(suite['lots'], 2)
+            self.assertTrue(suite['termine'])
+            self.assertIsNone(cache.get(PaymentReconciliationService.CURSEUR_KEY))
+
+    def test_resultat_deja_applique_non_ecrase(self):
+        paiement = self.paiements[1]
+        Paiement.objects.filter(pk=paiement.pk).update(statut='ECHOUE')  # Webhook appliqué entre-temps
+
+        self.assertFalse(PaymentReconciliationService.appliquer(paiement, 'REUSSI', {}))
+        paiement.refresh_from_db()
+        self.assertEqual(paiement.statut, 'ECHOUE')
+        self.assertEqual(paiement.reservation.statut, 'attente_paiement')
+
+    def test_reservation_annulee_non_reconfirmee(self):
+        paiement = self.paiements[1]
+        Reservation.objects.filter(pk=paiement.reservation_id).update(statut='annule')
+
+        self.assertTrue(PaymentReconciliationService.appliquer(paiement, 'REUSSI', {}))
+        paiement.refresh_from_db()
+        self.assertEqual(paiement.statut, 'REUSSI')
+        self.assertEqual(paiement.reservation.statut, 'annule')
+        self.assertIn('a_rembourser', paiement.metadata)
+
+
+class LimiteurDebitTest(TestCase):
+    def test_espacement(self):
+        limiteur = LimiteurDebit(debit=50)
+        debut = time.monotonic()
+        for _ in range(6):
+            limiteur.attendre()
+        self.assertGreaterEqual(time.monotonic() - debut, 0.09)
@@ -76,7 +76,7 @@ class PaymentWorkflowTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
-    @patch('requests.post', timeout=10)
+    @patch('requests.Session.request')
     def test_orange_money_flow(self, mock_post):
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {
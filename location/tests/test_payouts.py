@@ -0,0 +1,172 @@
+# location/tests/test_payouts.py
+import os
+from decimal import Decimal
+from unittest import mock
+import requests
+from django.test import TestCase, override_settings
+from location.models import LotVirement, Portefeuille, Transaction, Virement
+from location.models.core_models import User
+from location.payments.payouts import FournisseurVirement, SimulationVirement, VirementRefuse
+from location.services.payout_service import PayoutService
+from location.services.wallet_service import WalletService
+
+SIMULATION = {
+    'orange': 'location.payments.payouts.SimulationVirement',
+    'wave': 'location.payments.payouts.SimulationVirement',
+}
+
+
+@override_settings(PAYOUT_PROVIDERS=SIMULATION)
+class PayoutServiceTest(TestCase):
+    def setUp(self):
+        SimulationVirement.envoyes.clear()
+
+    def creer_demande(self, username, solde, montant, telephone='0701020304', methode='orange'):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        portefeuille, _ = Portefeuille.objects.get_or_create(proprietaire=user)
+        if solde:
+            WalletService.crediter(portefeuille, solde, f'OUV-{username}')
+        return Transaction.objects.create(
+            portefeuille=portefeuille,
+            user=user,
+            montant=-montant,
+            type_transaction='retrait',
+            payment_method=methode,
+            metadata={'telephone': telephone},
+            reference=f'WDR-{username}'
+        )
+
+    def test_lots_par_fournisseur(self):
+        demandes = [
+            self.creer_demande(f'loueur{i}', 10000, 2000, methode='wave' if i % 2 else 'orange')
+            for i in range(5)
+        ]
+
+        rapport = PayoutService.executer(taille_lot=2)
+
+        self.assertEqual((rapport['envoyes'], rapport['echoues'], rapport['rejetes']), (5, 0, 0))
+        self.assertTrue(rapport['termine'])
+        self.assertEqual(
+            sorted(LotVirement.objects.values_list('fournisseur', 'nb_virements')),
+            [('orange', 1), ('orange', 2), ('wave', 2)]
+        )
+        self.assertFalse(LotVirement.objects.filter(statut='debite').exists())
+        for demande in demandes:
+            demande.refresh_from_db()
+            self.assertEqual((demande.statut, demande.montant, demande.numero), ('valide', Decimal('-2000'), 2))
+            self.assertEqual(demande.virement.statut, 'envoye')
+            self.assertTrue(demande.virement.reference_fournisseur.startswith('SIM-'))
+            self.assertEqual(demande.portefeuille.solde, Decimal('8000'))
+            self.assertTrue(WalletService.controler(demande.portefeuille_id))
+
+    def test_solde_insuffisant_rejete(self):
+        demande = self.creer_demande('loueur', 1000, 5000)
+
+        lot, rejets = PayoutService.preparer('orange')
+
+        demande.refresh_from_db()
+        self.assertEqual(rejets, 1)
+        self.assertEqual((lot.statut, lot.nb_virements), ('termine', 0))
+        self.assertEqual((demande.statut, demande.motif_rejet, demande.numero), ('rejete', "Solde insuffisant", None))
+        self.assertEqual(demande.virement.statut, 'rejete')
+        self.assertEqual(demande.portefeuille.solde, Decimal('1000'))
+
+    def test_refus_recredite_le_portefeuille(self):
+        demande = self.creer_demande('loueur', 5000, 3000, telephone='0700000000')
+
+        rapport = PayoutService.executer()
+
+        demande.refresh_from_db()
+        portefeuille = demande.portefeuille
+        self.assertEqual(rapport['echoues'], 1)
+        self.assertEqual(demande.virement.statut, 'echoue')
+        self.assertEqual(portefeuille.solde, Decimal('5000'))
+        remboursement = portefeuille.transactions.get(type_transaction='remboursement')
+        self.assertEqual((remboursement.montant, remboursement.numero), (Decimal('3000'), 3))
+        self.assertTrue(WalletService.controler(portefeuille.pk))
+
+    def test_reprise_apres_interruption(self):
+        demande = self.creer_demande('loueur', 5000, 2000)
+        lot, _ = PayoutService.preparer('orange')
+        virement = lot.virements.get()
+        # Le fournisseur a reçu le virement avant l'arrêt du worker
+        SimulationVirement.envoyes[str(virement.reference)] = 'SIM-deja-recu'
+
+        rapport = PayoutService.executer()
+
+        virement.refresh_from_db()
+        lot.refresh_from_db()
+        self.assertEqual((rapport['lots'], rapport['envoyes']), (1, 1))
+        self.assertEqual((virement.statut, virement.reference_fournisseur), ('envoye', 'SIM-deja-recu'))
+        self.assertEqual(lot.statut, 'termine')
+        self.assertEqual(LotVirement.objects.count(), 1)
+        self.assertEqual(Portefeuille.objects.get(pk=demande.portefeuille_id).solde, Decimal('3000'))
+
+    def test_erreur_temporaire_retentee(self):
+        self.creer_demande('loueur', 5000, 2000)
+        with mock.patch.object(SimulationVirement, 'envoyer', side_effect=ConnectionError("Délai dépassé")):
+            rapport = PayoutService.executer()
+
+        virement = Virement.objects.get()
+        self.assertEqual(rapport['reportes'], 1)
+        self.assertEqual((virement.statut, virement.tentatives, virement.lot.statut), ('a_envoyer', 1, 'debite'))
+
+        self.assertEqual(PayoutService.executer()['envoyes'], 1)
+
+    def test_issue_inconnue_sans_remboursement(self):
+        demande = self.creer_demande('loueur', 5000, 2000)
+        with mock.patch.object(SimulationVirement, 'envoyer', side_effect=ConnectionError("Délai dépassé")):
+            for _ in range(PayoutService.MAX_TENTATIVES):
+                rapport = PayoutService.executer()
+
+        virement = Virement.objects.get()
+        self.assertEqual(rapport['a_verifier'], 1)
+        self.assertEqual((virement.statut, virement.lot.statut), ('a_verifier', 'termine'))
+        self.assertFalse(Transaction.objects.filter(type_transaction='remboursement').exists())
+        self.assertEqual(Portefeuille.objects.get(pk=demande.portefeuille_id).solde, Decimal('3000'))
+        self.assertFalse(PayoutService.a_notifier(virement.lot_id).exists())
+
+        # Renvoi avec la même référence : le fournisseur avait payé
+        SimulationVirement.envoyes[str(virement.reference)] = 'SIM-deja-recu'
+        self.assertEqual(PayoutService.renvoyer([virement.pk]), 1)
+        self.assertEqual(PayoutService.executer()['envoyes'], 1)
+        virement.refresh_from_db()
+        self.assertEqual((virement.statut, virement.reference_fournisseur), ('envoye', 'SIM-deja-recu'))
+        self.assertEqual(Portefeuille.objects.get(pk=demande.portefeuille_id).solde, Decimal('3000'))
+
+    def test_conflit_d_idempotence_non_refuse(self):
+        reponse = requests.Response()
+        reponse.status_code = 409
+        reponse._content = b'Idempotency-Key already used'
+        with self.assertRaises(requests.HTTPError):
+            FournisseurVirement._refuse(reponse)
+        reponse.status_code = 422
+        with self.assertRaises(VirementRefuse):
+            FournisseurVirement._refuse(reponse)
+
+    def test_lot_termine_non_renvoye(self):
+        self.creer_demande('loueur', 5000, 2000)
+        lot, _ = PayoutService.preparer('orange')
+        PayoutService.envoyer(lot)
+
+        with mock.patch.object(SimulationVirement, 'envoyer') as envoyer:
+            self.assertIsNone(PayoutService.envoyer(lot))
+        envoyer.assert_not_called()
+
+    def test_pas_de_double_remboursement(self):
+        demande = self.creer_demande('loueur', 5000, 3000, telephone='0700000000')
+        lot, _ = PayoutService.preparer('orange')
+        resultats = PayoutService.soumettre('orange', list(lot.virements.all()))
+
+        # Deux passages concurrents sur le même lot
+        PayoutService.enregistrer(lot.pk, resultats)
+        rapport = PayoutService.enregistrer(lot.pk, resultats)
+
+        self.assertEqual(rapport, {'envoyes': 0, 'echoues': 0, 'reportes': 0, 'a_verifier': 0})
+        self.assertEqual(Transaction.objects.filter(type_transaction='remboursement').count(), 1)
+        self.assertEqual(Portefeuille.objects.get(pk=demande.portefeuille_id).solde, Decimal('5000'))
@@ -0,0 +1,58 @@
+# location/tests/test_paypal_auth.py
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from location.payments.fournisseur_local import FournisseurLocal
+from location.payments.paypal_auth import PaypalTokenManager
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PaypalTokenManagerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_token_reutilise_jusqua_expiration(self):
+        with FournisseurLocal(latence=0) as fournisseur:
+            with override_settings(**fournisseur.settings()):
+                tokens = [PaypalTokenManager.obtenir() for _ in range(5)]
+        self.assertEqual(set(tokens), {'token-local'})
+        self.assertEqual(fournisseur.requetes, 1)
+
+    def test_duree_en_cache_avant_expires_in(self):
+        with patch.object(PaypalTokenManager, '_demander', return_value=('token', 32400)), \
+                patch('location.payments.paypal_auth.cache.set') as cache_set:
+            PaypalTokenManager.obtenir()
+        cache_set.assert_called_once_with(
+            PaypalTokenManager.TOKEN_KEY, 'token', timeout=32400 - PaypalTokenManager.MARGE
+        )
+
+    def test_un_seul_renouvellement_simultane(self):
+        appels = []
+
+        def demander():
+            appels.append(1)
+            time.sleep(0.1)
+            return 'token', 32400
+
+        with patch.object(PaypalTokenManager, '_demander', side_effect=demander):
+            threads = [threading.Thread(target=PaypalTokenManager.obtenir) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(appels), 1)
+
+    def test_401_renouvelle_et_rejoue(self):
+        refuse, accepte = MagicMock(status_code=401), MagicMock(status_code=200)
+        cache.set(PaypalTokenManager.TOKEN_KEY, 'revoque')
+        with patch.object(PaypalTokenManager, '_demander', return_value=('nouveau', 32400)), \
+                patch('location.payments.http_client.ProviderClient.request', side_effect=[refuse, accepte]) as appel:
+            response = PaypalTokenManager.requete('GET', 'https://paypal.test/v2/checkout/orders/1')
+        self.assertIs(response, accepte)
+        self.assertEqual(appel.call_args_list[0].kwargs['headers']['Authorization'], 'Bearer revoque')
+        self.assertEqual(appel.call_args_list[1].kwargs['headers']['Authorization'], 'Bearer nouveau')
+        self.assertEqual(cache.get(PaypalTokenManager.TOKEN_KEY), 'nouveau')
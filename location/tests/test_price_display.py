@@ -0,0 +1,63 @@
+# location/tests/test_price_display.py
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from location.services.currency_service import CurrencyService
+from location.services.price_display_service import PriceDisplayService
+from location.templatetags.custom_filters import prix_affiche
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TAUX = {'XOF': '1', 'EUR': '0.00152449', 'USD': '0.00165', 'GBP': '0.0013', 'NGN': '2.55', 'GHS': '0.0205'}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PriceDisplayServiceTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        cache.set(CurrencyService.RATES_KEY, {'rates': TAUX, 'date': 'v1'})
+        CurrencyService._table = None
+        PriceDisplayService._memo = {}
+        self.voitures = [
+            SimpleNamespace(prix_jour=15000, total_sejour=Decimal('45000')),
+            SimpleNamespace(prix_jour=20000, total_sejour=None),
+            SimpleNamespace(prix_jour=15000, total_sejour=None),
+        ]
+
+    def tearDown(self):
+        CurrencyService._table = None
+        PriceDisplayService._memo = {}
+
+    def test_conversion_groupee_de_la_page(self):
+        with patch.object(CurrencyService, 'convert_many', wraps=CurrencyService.convert_many) as convert_many:
+            PriceDisplayService.preparer(self.voitures, 'EUR')
+        convert_many.assert_called_once()
+        self.assertEqual(sorted(convert_many.call_args.args[0]), [15000, 20000, Decimal('45000')])
+
+        self.assertEqual(self.voitures[0].prix_affiches, {'prix_jour': '€ 22,87', 'total_sejour': '€ 68,60'})
+        self.assertEqual(self.voitures[1].prix_affiches, {'prix_jour': '€ 30,49'})
+        self.assertEqual(self.voitures[2].prix_affiches['prix_jour'], '€ 22,87')
+
+    def test_memo_par_devise_et_version(self):
+        PriceDisplayService.preparer(self.voitures, 'EUR')
+        with patch.object(CurrencyService, 'convert_many') as convert_many:
+            PriceDisplayService.preparer(self.voitures, 'EUR')
+        convert_many.assert_not_called()
+
+        # Nouveaux taux publiés : les montants sont reconvertis
+        cache.set(CurrencyService.RATES_KEY, {'rates': {**TAUX, 'EUR': '0.0016'}, 'date': 'v2'})
+        CurrencyService._table.expire = 0
+        PriceDisplayService.preparer(self.voitures, 'EUR')
+        self.assertEqual(self.voitures[0].prix_affiches['prix_jour'], '€ 24,00')
+
+    def test_devise_par_defaut_et_filtre(self):
+        PriceDisplayService.preparer(self.voitures, 'JPY')
+        self.assertEqual(self.voitures[0].prix_affiches['prix_jour'], '15 000 FCFA')
+
+        self.assertEqual(prix_affiche(self.voitures[0]), '15 000 FCFA')
+        self.assertEqual(prix_affiche(self.voitures[0], 'total_sejour'), '45 000 FCFA')
+        # Objet non préparé : montant XOF formaté
+        non_prepare = SimpleNamespace(prix_jour=8000, total_sejour=None)
+        self.assertEqual(prix_affiche(non_prepare), '8 000 FCFA')
+        self.assertEqual(prix_affiche(non_prepare, 'total_sejour'), '')
@@ -0,0 +1,101 @@
+# location/tests/test_provider_client.py
+from unittest.mock import MagicMock, patch
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from location.payments.fournisseur_local import FournisseurLocal
+from location.payments.http_client import Disjoncteur, ProviderClient, ProviderIndisponible
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def reponse(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@patch('location.payments.http_client.time.sleep')
+class ProviderClientTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client_http = ProviderClient('WAVE')
+
+    def test_session_reutilisee_et_metriques(self, sleep):
+        """Les appels partagent les connexions keep-alive et sont comptés"""
+        with FournisseurLocal(latence=0.01) as fournisseur:
+            with override_settings(**fournisseur.settings()):
+                for transaction_id in ['TX-1', 'TX-2', 'TX-3']:
+                    response = self.client_http.get(f"{fournisseur.url}/wave/transactions/{transaction_id}")
+                    self.assertEqual(response.json()['status'], 'completed')
+
+        adapter = self.client_http.session.get_adapter(fournisseur.url)
+        self.assertEqual(len(adapter.poolmanager.pools), 1)
+        with patch.object(ProviderClient, '_clients', {'WAVE': self.client_http}):
+            stats = ProviderClient.metriques()['WAVE']
+        self.assertEqual(stats['appels'], 3)
+        self.assertEqual(stats['echecs'], 0)
+        self.assertEqual(stats['circuit'], 'ferme')
+        self.assertIsNotNone(stats['latence_moyenne_ms'])
+
+    def test_get_rejoue_sur_503(self, sleep):
+        with patch.object(self.client_http.session, 'request', side_effect=[reponse(503), reponse(200)]) as appel:
+            response = self.client_http.get('https://wave.test/transactions/TX-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(appel.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_post_non_rejoue_apres_envoi(self, sleep):
+        """Un POST non idempotent n'est pas renvoyé si la réponse n'est pas arrivée"""
+        with patch.object(self.client_http.session, 'request', side_effect=requests.ReadTimeout()) as appel:
+            with self.assertRaises(requests.ReadTimeout):
+                self.client_http.post('https://wave.test/checkout', json={})
+        self.assertEqual(appel.call_count, 1)
+
+    def test_post_rejoue_si_connexion_impossible(self, sleep):
+        erreurs = [requests.ConnectionError(), reponse(200)]
+        with patch.object(self.client_http.session, 'request', side_effect=erreurs) as appel:
+            response = self.client_http.post('https://wave.test/checkout', json={})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(appel.call_count, 2)
+
+    def test_tentatives_bornees(self, sleep):
+        with patch.object(self.client_http.session, 'request', return_value=reponse(503)) as appel:
+            response = self.client_http.get('https://wave.test/transactions/TX-1')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(appel.call_count, ProviderClient.TENTATIVES)
+
+    def test_circuit_ouvert_echoue_immediatement(self, sleep):
+        self.client_http.disjoncteur = Disjoncteur(seuil=2, duree=60)
+        with patch.object(self.client_http.session, 'request', side_effect=requests.ConnectionError()) as appel:
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    self.client_http.get('https://wave.test/transactions/TX-1')
+            appels = appel.call_count
+            with self.assertRaises(ProviderIndisponible):
+                self.client_http.get('https://wave.test/transactions/TX-1')
+        self.assertEqual(appel.call_count, appels)
+        self.assertEqual(self.client_http.disjoncteur.etat, 'ouvert')
+
+    def test_circuit_semi_ouvert_se_referme(self, sleep):
+        disjoncteur = Disjoncteur(seuil=1, duree=0)
+        disjoncteur.echec()
+        self.assertEqual(disjoncteur.etat, 'semi_ouvert')
+        self.assertTrue(disjoncteur.autoriser())
+        # Un seul appel d'essai à la fois
+        self.assertFalse(disjoncteur.autoriser())
+        disjoncteur.succes()
+        self.assertEqual(disjoncteur.etat, 'ferme')
+
+    def test_essai_libere_sur_toute_erreur(self, sleep):
+        self.client_http.disjoncteur = Disjoncteur(seuil=1, duree=0)
+        self.client_http.disjoncteur.echec()
+        with patch.object(self.client_http.session, 'request', side_effect=requests.exceptions.ChunkedEncodingError()):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.client_http.get('https://wave.test/transactions/TX-1')
+        self.assertFalse(self.client_http.disjoncteur.essai_en_cours)
+        # Nouvel essai possible à l'issue de la durée d'ouverture
+        with patch.object(self.client_http.session, 'request', return_value=reponse(200)):
+            self.assertEqual(self.client_http.get('https://wave.test/transactions/TX-1').status_code, 200)
+        self.assertEqual(self.client_http.disjoncteur.etat, 'ferme')
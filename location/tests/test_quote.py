@@ -0,0 +1,65 @@
+# location/tests/test_quote.py
+import os
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from location.models.core_models import User, Voiture
+from location.services.quote_service import QuoteService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class QuoteServiceTest(TestCase):
+    def test_basse_saison(self):
+        devis = QuoteService.calculer([15000], [0], date(2030, 3, 1), date(2030, 3, 4))
+        self.assertEqual(int(devis['base'][0]), 45000)
+        self.assertEqual(int(devis['frais'][0]), 4500)
+        self.assertEqual(int(devis['total'][0]), 49500)
+
+    def test_haute_saison_et_chauffeur(self):
+        # 30 et 31 mai au tarif normal, 1er juin majoré de 20 %
+        devis = QuoteService.calculer([10000], [5000], date(2030, 5, 30), date(2030, 6, 2))
+        self.assertEqual(int(devis['base'][0]), 32000)
+        self.assertEqual(int(devis['chauffeur'][0]), 15000)
+        self.assertEqual(int(devis['total'][0]), 51700)
+
+    def test_coherent_avec_get_prix_dynamique(self):
+        voiture = Voiture(prix_jour=12345)
+        jours = [date(2030, 7, 1), date(2030, 7, 2)]
+        attendu = round(sum(voiture.get_prix_dynamique(j) for j in jours))
+        devis = QuoteService.calculer([12345], [0], jours[0], date(2030, 7, 3))
+        self.assertEqual(int(devis['base'][0]), attendu)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RechercheTriTotalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.economique = Voiture.objects.create(
+            proprietaire=proprietaire, marque='Kia', modele='Picanto', annee=2020,
+            prix_jour=12000, ville='Abidjan', avec_chauffeur=True, prix_chauffeur=10000
+        )
+        self.sans_chauffeur = Voiture.objects.create(
+            proprietaire=proprietaire, marque='Toyota', modele='Corolla', annee=2020,
+            prix_jour=15000, ville='Abidjan'
+        )
+
+    def _recherche(self, **params):
+        params.update({'date_debut': '2030-03-01', 'date_fin': '2030-03-04', 'tri': 'prix_total'})
+        return list(self.client.get(reverse('location:recherche'), params).context['voitures'])
+
+    def test_tri_par_total(self):
+        voitures = self._recherche()
+        self.assertEqual(voitures, [self.economique, self.sans_chauffeur])
+        self.assertEqual(voitures[0].total_sejour, 39600)
+
+    def test_chauffeur_change_l_ordre(self):
+        voitures = self._recherche(avec_chauffeur='1')
+        self.assertEqual(voitures, [self.sans_chauffeur, self.economique])
+        self.assertEqual(voitures[1].total_sejour, 72600)
@@ -0,0 +1,125 @@
+# location/tests/test_rate_history.py
+import os
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from location.models import CurrencyRateHistory, Paiement
+from location.models.core_models import User, Voiture, Reservation
+from location.services.currency_service import CurrencyService, TauxIndisponibles
+from location.services.rate_history_service import HistoriqueTaux, RateHistoryService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def instant(jour, heure=0):
+    return datetime(2030, 1, jour, heure, tzinfo=dt_timezone.utc)
+
+
+LIGNES = [
+    (instant(3), {'XOF': '1', 'EUR': '0.00152449', 'USD': '0.0017'}),
+    (instant(1), {'XOF': '1', 'EUR': '0.00152449', 'USD': '0.0016'}),
+    (instant(5), {'XOF': '1', 'EUR': '0.00152449', 'USD': '0.0018'}),
+]
+
+
+class HistoriqueTauxTest(SimpleTestCase):
+    def test_as_of(self):
+        historique = HistoriqueTaux(LIGNES)
+        self.assertEqual(len(historique), 3)
+        self.assertEqual(historique.as_of(instant(1))['USD'], Decimal('0.0016'))
+        self.assertEqual(historique.as_of(instant(2, 12))['USD'], Decimal('0.0016'))
+        self.assertEqual(historique.as_of(instant(3))['USD'], Decimal('0.0017'))
+        self.assertEqual(historique.as_of(instant(20))['USD'], Decimal('0.0018'))
+        with self.assertRaises(TauxIndisponibles):
+            historique.as_of(datetime(2029, 12, 31, tzinfo=dt_timezone.utc))
+
+    def test_convert(self):
+        historique = HistoriqueTaux(LIGNES)
+        self.assertEqual(historique.convert(10000, 'xof', 'usd', instant(4)), Decimal('17.00'))
+        self.assertEqual(historique.convert('17', 'USD', 'XOF', instant(4)), Decimal('10000.00'))
+        with self.assertRaises(ValueError):
+            historique.convert(100, 'GBP', 'XOF', instant(4))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RateHistoryServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        CurrencyService._table = None
+        for moment, rates in LIGNES:
+            CurrencyRateHistory.objects.create(date=moment, rates=rates, source='forex_python')
+
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.reservation = Reservation.objects.create(
+            voiture=voiture,
+            client=loueur,
+            date_debut=date(2030, 2, 1),
+            date_fin=date(2030, 2, 3),
+            montant_paye=Decimal('30000'),
+            statut='confirme'
+        )
+
+    def tearDown(self):
+        CurrencyService._table = None
+
+    def creer_paiement(self, montant, moment, devise='XOF'):
+        paiement = Paiement.objects.create(
+            reservation=self.reservation, methode='WAVE', montant=montant, devise_origine=devise
+        )
+        Paiement.objects.filter(pk=paiement.pk).update(date_creation=moment)
+        return paiement
+
+    def test_rafraichissement_enregistre(self):
+        taux = {'XOF': Decimal('1'), 'EUR': Decimal('0.00152449'), 'USD': Decimal('0.0019')}
+        with patch.object(CurrencyService, '_fetch_rates', return_value=taux):
+            CurrencyService.refresh_rates()
+        derniere = CurrencyRateHistory.objects.last()
+        self.assertEqual(derniere.rates['USD'], '0.0019')
+        self.assertEqual(derniere.source, 'forex_python')
+
+    def test_charger_et_as_of(self):
+        historique = RateHistoryService.charger(instant(4), instant(4, 12))
+        # La récupération en vigueur au début de la période est incluse
+        self.assertEqual(historique.dates, [instant(3)])
+        self.assertEqual(RateHistoryService.as_of(instant(6))['USD'], Decimal('0.0018'))
+        with self.assertRaises(TauxIndisponibles):
+            RateHistoryService.as_of(datetime(2029, 1, 1, tzinfo=dt_timezone.utc))
+
+    def test_revaloriser(self):
+        ancien = self.creer_paiement(10000, datetime(2029, 6, 1, tzinfo=dt_timezone.utc))
+        premier = self.creer_paiement(10000, instant(2))
+        second = self.creer_paiement(10000, instant(4))
+        euros = self.creer_paiement(100, instant(6), devise='EUR')
+
+        with self.assertNumQueries(3):
+            lignes = RateHistoryService.revaloriser(Paiement.objects.all(), 'usd')
+
+        self.assertEqual([ligne['id'] for ligne in lignes], [ancien.id, premier.id, second.id, euros.id])
+        self.assertIsNone(lignes[0]['montant_converti'])
+        self.assertEqual(lignes[1]['montant_converti'], Decimal('16.00'))
+        self.assertEqual(lignes[2]['montant_converti'], Decimal('17.00'))
+        self.assertEqual(lignes[3]['montant_converti'], Decimal('118.07'))
+        self.assertEqual(RateHistoryService.revaloriser(Paiement.objects.none()), [])
+        with self.assertRaises(ValueError):
+            RateHistoryService.revaloriser(Paiement.objects.all(), 'JPY')
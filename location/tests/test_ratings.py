@@ -0,0 +1,136 @@
+# location/tests/test_ratings.py
+import os
+from datetime import date
+from decimal import Decimal
+from django.core.management import call_command
+from django.test import TestCase
+from location.models.core_models import (
+    User, Voiture, Reservation, Evaluation, EvaluationLoueur, ProprietaireProfile, LoueurProfile
+)
+
+class RatingAggregatesTest(TestCase):
+    def setUp(self):
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.profil = ProprietaireProfile.objects.create(
+            user=self.proprietaire,
+            cin='99X99999',
+            address="123 Rue Test"
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.clients = [
+            User.objects.create_user(
+                username=f'loueur{i}',
+                email=f'loueur{i}@example.com',
+                password=os.getenv('TEST_PWD'),
+                user_type='LOUEUR'
+            )
+            for i in range(3)
+        ]
+
+    def _evaluer(self, client, note):
+        return Evaluation.objects.create(voiture=self.voiture, client=client, note=note)
+
+    def test_creation_modification_suppression(self):
+        e1 = self._evaluer(self.clients[0], 5)
+        e2 = self._evaluer(self.clients[1], 2)
+        self.voiture.refresh_from_db()
+        self.assertEqual((self.voiture.note_nombre, self.voiture.note_somme), (2, 7))
+        self.assertAlmostEqual(self.voiture.note_moyenne, 3.5)
+        self.assertEqual(self.voiture.histogramme_notes, {1: 0, 2: 1, 3: 0, 4: 0, 5: 1})
+
+        e2.note = 4
+        e2.save()
+        self.voiture.refresh_from_db()
+        self.assertEqual(self.voiture.histogramme_notes, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+        self.assertAlmostEqual(self.voiture.note_moyenne, 4.5)
+
+        e1.delete()
+        e2.delete()
+        self.voiture.refresh_from_db()
+        self.assertEqual(self.voiture.note_nombre, 0)
+        self.assertIsNone(self.voiture.note_moyenne)
+
+    def test_profil_proprietaire(self):
+        self._evaluer(self.clients[0], 5)
+        self._evaluer(self.clients[1], 1)
+        self.profil.refresh_from_db()
+        self.assertEqual(self.profil.evaluations_positives, 1)
+        self.assertEqual(self.profil.evaluations_negatives, 1)
+
+    def test_instance_perimee_n_ecrase_pas_les_agregats(self):
+        voiture = Voiture.objects.get(pk=self.voiture.pk)
+        self._evaluer(self.clients[0], 5)
+        voiture.prix_jour = 16000
+        voiture.save()
+        voiture.refresh_from_db()
+        self.assertEqual(voiture.note_nombre, 1)
+
+    def test_profil_loueur(self):
+        loueur = self.clients[0]
+        profil = LoueurProfile.objects.create(user=loueur)
+        reservation = Reservation.objects.create(
+            voiture=self.voiture,
+            client=loueur,
+            date_debut=date(2030, 1, 10),
+            date_fin=date(2030, 1, 12),
+            montant_paye=Decimal('30000'),
+            statut='termine'
+        )
+        EvaluationLoueur.objects.create(
+            reservation=reservation, evaluateur=self.proprietaire, evalue=loueur, note=4
+        )
+        profil.refresh_from_db()
+        self.assertEqual(profil.note_nombre, 1)
+        self.assertEqual(profil.note_4, 1)
+
+    def test_suppression_en_cascade(self):
+        loueur = self.clients[0]
+        profil = LoueurProfile.objects.create(user=loueur)
+        reservation = Reservation.objects.create(
+            voiture=self.voiture,
+            client=loueur,
+            date_debut=date(2030, 1, 10),
+            date_fin=date(2030, 1, 12),
+            montant_paye=Decimal('30000'),
+            statut='termine'
+        )
+        Evaluation.objects.create(voiture=self.voiture, client=loueur, reservation=reservation, note=5)
+        EvaluationLoueur.objects.create(
+            reservation=reservation, evaluateur=self.proprietaire, evalue=loueur, note=4
+        )
+        self._evaluer(self.clients[1], 3)
+
+        reservation.delete()
+        self.voiture.refresh_from_db()
+        profil.refresh_from_db()
+        self.assertEqual((self.voiture.note_nombre, self.voiture.note_5, self.voiture.note_3), (1, 0, 1))
+        self.assertAlmostEqual(self.voiture.note_moyenne, 3.0)
+        self.assertEqual((profil.note_nombre, profil.note_4), (0, 0))
+
+        Evaluation.objects.all().delete()
+        self.voiture.refresh_from_db()
+        self.profil.refresh_from_db()
+        self.assertEqual((self.voiture.note_nombre, self.voiture.note_somme), (0, 0))
+        self.assertIsNone(self.voiture.note_moyenne)
+        self.assertEqual(self.profil.note_nombre, 0)
+
+    def test_reparation(self):
+        self._evaluer(self.clients[0], 3)
+        self._evaluer(self.clients[1], 5)
+        Voiture.objects.filter(pk=self.voiture.pk).update(note_nombre=0, note_somme=0, note_moyenne=None)
+        call_command('reparer_notes', verbosity=0)
+        self.voiture.refresh_from_db()
+        self.assertEqual((self.voiture.note_nombre, self.voiture.note_3, self.voiture.note_5), (2, 1, 1))
+        self.assertAlmostEqual(self.voiture.note_moyenne, 4.0)
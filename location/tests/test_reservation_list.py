@@ -0,0 +1,93 @@
+# location/tests/test_reservation_list.py
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from location.models import Paiement
+from location.models.core_models import User, Voiture, Reservation
+from location.services.reservation_list_service import ReservationListService
+
+class ReservationListServiceTest(TestCase):
+    def setUp(self):
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.reservations = []
+        for i in range(4):
+            reservation = Reservation.objects.create(
+                voiture=self.voiture,
+                client=self.loueur,
+                date_debut=date(2030, 1, 1) + timedelta(days=5 * i),
+                date_fin=date(2030, 1, 3) + timedelta(days=5 * i),
+                montant_paye=Decimal('30000'),
+                statut='confirme'
+            )
+            self.reservations.append(reservation)
+
+        # Deux paiements sur la première réservation : le plus récent doit être retenu
+        ancien = Paiement.objects.create(reservation=self.reservations[0], methode='ORANGE', montant=30000, statut='ECHOUE')
+        Paiement.objects.filter(pk=ancien.pk).update(date_creation=timezone.now() - timedelta(hours=1))
+        self.recent = Paiement.objects.create(reservation=self.reservations[0], methode='WAVE', montant=30000, statut='REUSSI')
+        Paiement.objects.create(reservation=self.reservations[1], methode='PAYPAL', montant=30000)
+
+    def test_une_seule_requete(self):
+        with self.assertNumQueries(1):
+            paiements = {r.pk: r.dernier_paiement for r in ReservationListService.pour_client(self.loueur)}
+            methodes = {pk: p.get_methode_display() for pk, p in paiements.items() if p}
+
+        self.assertEqual(paiements[self.reservations[0].pk].pk, self.recent.pk)
+        self.assertEqual(paiements[self.reservations[0].pk].statut, 'REUSSI')
+        self.assertEqual(methodes[self.reservations[1].pk], 'PayPal')
+        self.assertIsNone(paiements[self.reservations[2].pk])
+
+    def test_proprietaire(self):
+        reservations = list(ReservationListService.pour_proprietaire(self.proprietaire, statuts=['confirme']))
+        self.assertEqual(len(reservations), 4)
+        self.assertEqual(reservations[-1].dernier_paiement.methode, 'WAVE')
+
+    def test_sans_annotation(self):
+        """Une réservation chargée autrement retrouve son dernier paiement par requête"""
+        reservation = Reservation.objects.get(pk=self.reservations[0].pk)
+        self.assertEqual(reservation.dernier_paiement.pk, self.recent.pk)
+
+    def _requetes_mes_reservations(self):
+        with CaptureQueriesContext(connection) as contexte:
+            response = self.client.get(reverse('mes_reservations'))
+        self.assertEqual(response.status_code, 200)
+        return len(contexte.captured_queries)
+
+    def test_mes_reservations_nombre_de_requetes_constant(self):
+        self.client.force_login(self.loueur)
+        avant = self._requetes_mes_reservations()
+        for i in range(4, 8):
+            reservation = Reservation.objects.create(
+                voiture=self.voiture,
+                client=self.loueur,
+                date_debut=date(2030, 1, 1) + timedelta(days=5 * i),
+                date_fin=date(2030, 1, 3) + timedelta(days=5 * i),
+                montant_paye=Decimal('30000'),
+                statut='confirme'
+            )
+            Paiement.objects.create(reservation=reservation, methode='ORANGE', montant=30000)
+        self.assertEqual(self._requetes_mes_reservations(), avant)
@@ -0,0 +1,51 @@
+# location/tests/test_search.py
+import os
+from django.test import TestCase
+from location.models.core_models import User, Voiture
+from location.services.search_service import VoitureSearchService
+
+class VoitureSearchServiceTest(TestCase):
+    def setUp(self):
+        self.proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.toyota = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan',
+            description='Berline climatisée idéale pour la ville'
+        )
+        self.peugeot = Voiture.objects.create(
+            proprietaire=self.proprietaire,
+            marque='Peugeot',
+            modele='3008',
+            annee=2021,
+            prix_jour=12000,
+            ville='Abidjan',
+            description='SUV familial avec grand coffre'
+        )
+
+    def test_vecteur_maintenu_par_save(self):
+        self.toyota.refresh_from_db()
+        self.assertIsNotNone(self.toyota.search_vector)
+
+    def test_recherche_plein_texte(self):
+        resultats = list(VoitureSearchService.rechercher(Voiture.objects.all(), 'coffre'))
+        self.assertEqual(resultats, [self.peugeot])
+
+    def test_recherche_tolere_les_fautes(self):
+        resultats = list(VoitureSearchService.rechercher(Voiture.objects.all(), 'Toyta'))
+        self.assertIn(self.toyota, resultats)
+        self.assertNotIn(self.peugeot, resultats)
+
+    def test_description_modifiee_reindexee(self):
+        self.toyota.description = 'Cabriolet décapotable'
+        self.toyota.save()
+        resultats = list(VoitureSearchService.rechercher(Voiture.objects.all(), 'décapotable'))
+        self.assertEqual(resultats, [self.toyota])
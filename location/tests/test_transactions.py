@@ -1,7 +1,10 @@
 import os
-from django.test import TestCase
+from unittest import mock
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
 from django.contrib.auth.models import Permission
 from django.contrib.auth import get_user_model
+from ..admin import TransactionAdmin
 from ..models import Portefeuille, Transaction
 
 class TransactionTests(TestCase):
@@ -21,26 +24,31 @@ class TransactionTests(TestCase):
             password='testpass',
             user_type='LOUEUR'
         )
+        Portefeuille.objects.filter(proprietaire=self.client_user).delete()
         self.portefeuille = Portefeuille.objects.create(
             proprietaire=self.client_user,
             solde=1000000
         )
         self.transaction = Transaction.objects.create(
             portefeuille=self.portefeuille,
+            user=self.client_user,
             montant=50000,
             type_transaction='retrait',
             reference='TEST123'
         )
 
-    def test_valider_retrait(self):
+    def test_retrait_non_valide_manuellement(self):
+        # Un retrait est débité et versé par PayoutService
         self.client.login(username='admin', password='testpass')
         response = self.client.post(
             f'/portefeuille/transactions/{self.transaction.id}/valider/',
             {'action': 'valider'}
         )
         self.transaction.refresh_from_db()
-        self.assertEqual(self.transaction.statut, 'valide')
-        self.assertEqual(self.portefeuille.solde, 950000)
+        self.portefeuille.refresh_from_db()
+        self.assertEqual(self.transaction.statut, 'en_attente')
+        self.assertIsNone(self.transaction.numero)
+        self.assertEqual(self.portefeuille.solde, 1000000)
 
     def test_rejeter_retrait(self):
         self.client.login(username='admin', password='testpass')
@@ -52,3 +60,30 @@ class TransactionTests(TestCase):
         self.assertEqual(self.transaction.statut, 'rejete')
         self.assertEqual(self.portefeuille.solde, 1000000)
 
+    def test_admin_passe_par_le_journal(self):
+        request = RequestFactory().post('/admin/')
+        request.user = get_user_model().objects.create_superuser(
+            username='super', email='super@example.com', password='testpass'
+        )
+        modele_admin = TransactionAdmin(Transaction, admin.site)
+        self.assertIn('statut', modele_admin.get_readonly_fields(request, self.transaction))
+        self.assertIn('montant', modele_admin.get_readonly_fields(request, self.transaction))
+
+        depot = Transaction.objects.create(
+            portefeuille=self.portefeuille,
+            user=self.client_user,
+            montant=20000,
+            type_transaction='depot',
+            reference='DEP123'
+        )
+        with mock.patch.object(modele_admin, 'message_user'):
+            modele_admin.valider_transactions(request, Transaction.objects.filter(pk__in=[depot.pk, self.transaction.pk]))
+
+        depot.refresh_from_db()
+        self.transaction.refresh_from_db()
+        self.portefeuille.refresh_from_db()
+        self.assertEqual((depot.statut, depot.numero), ('valide', 1))
+        self.assertEqual(self.transaction.statut, 'en_attente')  # Retrait : PayoutService
+        self.assertEqual(self.portefeuille.solde, 1020000)
+        self.assertFalse(modele_admin.has_change_permission(request, depot))
+        self.assertTrue(modele_admin.has_change_permission(request, self.transaction))
@@ -0,0 +1,83 @@
+# location/tests/test_voiture_detail.py
+import os
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from location.models.core_models import User, Voiture, Reservation, Evaluation, Favoris
+from location.views.voiture_views import VoitureDetail
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VoitureDetailQueryBudgetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        self.loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        self.voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        today = timezone.now().date()
+        for i in range(3):
+            client = User.objects.create_user(
+                username=f'client{i}',
+                email=f'client{i}@example.com',
+                password=os.getenv('TEST_PWD'),
+                user_type='LOUEUR'
+            )
+            Evaluation.objects.create(voiture=self.voiture, client=client, note=4)
+        Reservation.objects.create(
+            voiture=self.voiture,
+            client=self.loueur,
+            date_debut=today - timedelta(days=1),
+            date_fin=today + timedelta(days=2),
+            montant_paye=Decimal('45000'),
+            statut='confirme'
+        )
+        Favoris.objects.create(utilisateur=self.loueur, voiture=self.voiture)
+
+    def _contexte(self, user):
+        request = self.factory.get(f'/voitures/{self.voiture.pk}/')
+        request.user = user
+        return VoitureDetail.as_view()(request, pk=self.voiture.pk).context_data
+
+    def test_budget_cache_froid_puis_chaud(self):
+        with self.assertNumQueries(3):
+            self._contexte(self.loueur)
+        with self.assertNumQueries(1):
+            contexte = self._contexte(AnonymousUser())
+        self.assertEqual(len(contexte['evaluations']), 3)
+
+    def test_contexte_equivalent(self):
+        contexte = self._contexte(self.loueur)
+        self.assertTrue(contexte['in_favoris'])
+        self.assertFalse(contexte['peut_evaluer'])
+        self.assertFalse(contexte['disponible'])
+        self.assertEqual(contexte['disponible'], self.voiture.est_disponible)
+        prochaine = timezone.now().date() + timedelta(days=3)
+        self.assertEqual(contexte['disponibilite_message'], f"Disponible à partir du {prochaine.strftime('%d/%m/%Y')}")
+        self.assertEqual(contexte['note_moyenne'], 4.0)
+
+    def test_nouvelle_evaluation_change_la_version(self):
+        self._contexte(AnonymousUser())
+        Evaluation.objects.create(voiture=self.voiture, client=self.loueur, note=5)
+        self.assertEqual(len(self._contexte(AnonymousUser())['evaluations']), 4)
@@ -0,0 +1,96 @@
+# location/tests/test_wallet_history.py
+import os
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from location.models import Portefeuille, Transaction
+from location.models.core_models import User
+from location.services.wallet_history_service import WalletHistoryService
+from location.services.wallet_service import WalletService
+
+
+class WalletHistoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        Portefeuille.objects.filter(proprietaire=self.user).delete()
+        # Solde antérieur au journal
+        self.portefeuille = Portefeuille.objects.create(proprietaire=self.user, solde=1000)
+
+        debut = timezone.now() - timedelta(days=30)
+        self.attendus = []
+        solde = Decimal('1000')
+        for i in range(25):
+            if i % 5 == 4:
+                ecriture = Transaction.objects.create(
+                    portefeuille=self.portefeuille, user=self.user, montant=-500,
+                    type_transaction='retrait', reference=f'WDR-{i}'
+                )
+                solde_apres = None  # Demande en attente : hors journal
+            elif i % 2:
+                ecriture = self.portefeuille.debiter(200, f'DBT-{i}')
+                solde_apres = solde = solde - 200
+            else:
+                ecriture = self.portefeuille.crediter(300, f'CRD-{i}')
+                solde_apres = solde = solde + 300
+            Transaction.objects.filter(pk=ecriture.pk).update(date_creation=debut + timedelta(hours=i))
+            self.attendus.append((ecriture.pk, solde_apres))
+        self.attendus.reverse()  # Plus récentes d'abord
+        self.portefeuille.refresh_from_db()
+
+    def test_pages_par_curseur_avec_solde(self):
+        vus, curseur = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page = WalletHistoryService.page(self.portefeuille, curseur, par_page=10)
+                vus.extend((transaction.pk, transaction.solde_apres) for transaction in page)
+            self.assertIsNone(page.count)
+            if not page.has_next:
+                break
+            curseur = page.next_cursor
+        self.assertEqual(vus, self.attendus)
+
+        # Retour en arrière depuis la dernière page
+        precedente = WalletHistoryService.page(self.portefeuille, page.previous_cursor, par_page=10)
+        self.assertEqual([(t.pk, t.solde_apres) for t in precedente], self.attendus[10:20])
+
+    def test_retrait_valide_apres_coup(self):
+        """Le solde suit l'ordre du journal, pas la date de la demande"""
+        demande = Transaction.objects.get(reference='WDR-4')
+        WalletService.appliquer(demande)
+        self.assertEqual(demande.solde_apres, Decimal('1500'))
+
+        vus, curseur = {}, None
+        while True:
+            page = WalletHistoryService.page(self.portefeuille, curseur, par_page=10)
+            vus.update((transaction.pk, transaction.solde_apres) for transaction in page)
+            if not page.has_next:
+                break
+            curseur = page.next_cursor
+        attendus = dict(self.attendus)
+        attendus[demande.pk] = Decimal('1500')
+        self.assertEqual(vus, attendus)
+
+    def test_export_csv(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('export_transactions_csv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lignes = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lignes), 26)
+        self.assertTrue(lignes[0].startswith('Date;Type'))
+        self.assertTrue(lignes[-1].endswith(';'))  # Demande en attente
+        self.assertTrue(lignes[-2].endswith(f';{self.attendus[1][1]:.2f}'))
+
+    def test_vue_historique(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('historique_transactions'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), WalletHistoryService.PAR_PAGE)
+        self.assertEqual(self.client.get(reverse('historique_transactions'), {'curseur': 'faux'}).status_code, 404)
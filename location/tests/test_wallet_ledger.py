@@ -0,0 +1,141 @@
+# location/tests/test_wallet_ledger.py
+import os
+import sys
+import threading
+import time
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from location.models import Portefeuille, Transaction
+from location.models.core_models import User
+from location.services.wallet_service import SoldeInsuffisant, WalletService
+
+
+def creer_portefeuille(username, solde=0):
+    user = User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password=os.getenv('TEST_PWD'),
+        user_type='LOUEUR'
+    )
+    portefeuille, _ = Portefeuille.objects.get_or_create(proprietaire=user)
+    if solde:
+        WalletService.crediter(portefeuille, solde, f'OUV-{username}')
+    return portefeuille
+
+
+class WalletLedgerTest(TestCase):
+    def setUp(self):
+        self.portefeuille = creer_portefeuille('loueur')
+
+    def test_ecritures_numerotees(self):
+        credit = self.portefeuille.crediter(5000, "Dépôt initial")
+        debit = self.portefeuille.debiter(2000, "Retrait")
+
+        self.assertEqual(self.portefeuille.solde, Decimal('3000'))
+        self.assertEqual((credit.numero, credit.montant, credit.statut), (1, Decimal('5000'), 'valide'))
+        self.assertEqual((debit.numero, debit.montant), (2, Decimal('-2000')))
+        self.assertEqual(debit.user_id, self.portefeuille.proprietaire_id)
+
+    def test_debit_refuse_sans_ecriture(self):
+        self.portefeuille.crediter(1000, "Dépôt")
+        with self.assertRaises(SoldeInsuffisant):
+            self.portefeuille.debiter(2000, "Retrait")
+        self.portefeuille.refresh_from_db()
+        self.assertEqual(self.portefeuille.solde, Decimal('1000'))
+        self.assertEqual(self.portefeuille.transactions.count(), 1)
+        with self.assertRaises(ValueError):
+            self.portefeuille.crediter(-5, "Négatif")
+
+    def test_ecriture_non_modifiable(self):
+        ecriture = self.portefeuille.crediter(1000, "Dépôt")
+        ecriture.montant = 5000
+        with self.assertRaises(ValidationError):
+            ecriture.save()
+
+    def test_validation_retrait(self):
+        self.portefeuille.crediter(10000, "Dépôt")
+        demande = Transaction.objects.create(
+            portefeuille=self.portefeuille,
+            user=self.portefeuille.proprietaire,
+            montant=4000,
+            type_transaction='retrait',
+            reference='WDR-1'
+        )
+
+        WalletService.appliquer(demande)
+        self.portefeuille.refresh_from_db()
+        demande.refresh_from_db()
+        self.assertEqual(self.portefeuille.solde, Decimal('6000'))
+        self.assertEqual((demande.statut, demande.montant, demande.numero), ('valide', Decimal('-4000'), 2))
+        # Une seconde validation est sans effet
+        with self.assertRaises(ValueError):
+            WalletService.appliquer(demande)
+        self.portefeuille.refresh_from_db()
+        self.assertEqual(self.portefeuille.solde, Decimal('6000'))
+
+    def test_point_de_controle(self):
+        self.portefeuille.crediter(10000, "Dépôt")
+        self.portefeuille.debiter(2500, "Retrait")
+        self.assertEqual(WalletService.controler_tous(), {'controles': 1, 'ecarts': 0})
+        self.portefeuille.refresh_from_db()
+        self.assertEqual((self.portefeuille.solde_controle, self.portefeuille.numero_controle), (Decimal('7500'), 2))
+
+        # Seules les écritures postérieures sont relues ; un écart bloque le point de contrôle
+        self.portefeuille.crediter(500, "Dépôt")
+        Portefeuille.objects.filter(pk=self.portefeuille.pk).update(solde=Decimal('99999'))
+        self.assertFalse(WalletService.controler(self.portefeuille.pk))
+        self.portefeuille.refresh_from_db()
+        self.assertEqual(self.portefeuille.numero_controle, 2)
+
+
+class WalletConcurrenceTest(TransactionTestCase):
+    NB_THREADS = 16
+    OPERATIONS = 25
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest("Verrous de ligne PostgreSQL requis")
+        self.portefeuille = creer_portefeuille('partage', solde=1000)
+
+    def test_credits_et_debits_paralleles(self):
+        depart = threading.Barrier(self.NB_THREADS)
+        resultats = []
+
+        def client(rang):
+            try:
+                depart.wait()
+                for _ in range(self.OPERATIONS):
+                    try:
+                        if rang % 2:
+                            WalletService.crediter(self.portefeuille, 100)
+                            resultats.append(100)
+                        else:
+                            WalletService.debiter(self.portefeuille, 150)
+                            resultats.append(-150)
+                    except SoldeInsuffisant:
+                        resultats.append(0)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client, args=(rang,)) for rang in range(self.NB_THREADS)]
+        debut = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duree = time.perf_counter() - debut
+
+        total = self.NB_THREADS * self.OPERATIONS
+        self.assertEqual(len(resultats), total)
+        sys.stdout.write(f"\n{total} opérations en {duree:.2f}s ({total / duree:.0f}/s)\n")
+
+        self.portefeuille.refresh_from_db()
+        appliques = [montant for montant in resultats if montant]
+        self.assertEqual(self.portefeuille.solde, Decimal('1000') + sum(appliques))
+        self.assertGreaterEqual(self.portefeuille.solde, 0)
+        self.assertEqual(self.portefeuille.nb_ecritures, len(appliques) + 1)
+        numeros = list(self.portefeuille.transactions.order_by('numero').values_list('numero', flat=True))
+        self.assertEqual(numeros, list(range(1, len(appliques) + 2)))
+        self.assertTrue(WalletService.controler(self.portefeuille.pk))
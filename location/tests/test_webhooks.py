@@ -0,0 +1,182 @@
+# location/tests/test_webhooks.py
+import hashlib
+import hmac
+import json
+import os
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from location.models import EvenementWebhook, Paiement
+from location.models.core_models import User, Voiture, Reservation
+from location.services.webhook_service import WebhookService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+SECRET_WAVE = 'secret-wave'
+
+
+@override_settings(CACHES=LOCMEM_CACHE, WAVE_WEBHOOK_SECRET=SECRET_WAVE)
+class WebhookTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        proprietaire = User.objects.create_user(
+            username='proprio',
+            email='proprio@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='PROPRIETAIRE'
+        )
+        loueur = User.objects.create_user(
+            username='loueur',
+            email='loueur@example.com',
+            password=os.getenv('TEST_PWD'),
+            user_type='LOUEUR'
+        )
+        voiture = Voiture.objects.create(
+            proprietaire=proprietaire,
+            marque='Toyota',
+            modele='Corolla',
+            annee=2020,
+            prix_jour=15000,
+            ville='Abidjan'
+        )
+        self.reservation = Reservation.objects.create(
+            voiture=voiture,
+            client=loueur,
+            date_debut=date(2030, 1, 1),
+            date_fin=date(2030, 1, 3),
+            montant_paye=Decimal('30000'),
+            statut='attente_paiement'
+        )
+        self.paiement = Paiement.objects.create(
+            reservation=self.reservation,
+            methode='WAVE',
+            montant=30000,
+            transaction_id='WV-1'
+        )
+
+    def poster_wave(self, data):
+        corps = json.dumps(data).encode()
+        signature = hmac.new(SECRET_WAVE.encode(), corps, hashlib.sha256).hexdigest()
+        return self.client.post(
+            reverse('wave_webhook'), data=corps, content_type='application/json',
+            HTTP_X_WAVE_SIGNATURE=signature
+        )
+
+    def test_ancienne_notification_orange_non_appliquee(self):
+        """L'ancienne notif_url passe par la même file que le webhook, sans rien appliquer"""
+        self.reservation.statut = 'annule'
+        self.reservation.save()
+        data = {'txnid': 'WV-1', 'status': 'SUCCESS'}
+        with patch('location.tasks.webhook_tasks.traiter_webhooks.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('orange_notification'), data=json.dumps(data), content_type='application/json'
+                )
+
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with('ORANGE', 'WV-1')
+        self.assertEqual(EvenementWebhook.objects.get().fournisseur, 'ORANGE')
+        self.paiement.refresh_from_db()
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.paiement.statut, self.reservation.statut), ('EN_ATTENTE', 'annule'))
+
+    def test_reception_rapide_et_dedoublonnee(self):
+        data = {'id': 'evt-1', 'client_reference': 'WV-1', 'status': 'completed'}
+        with patch('location.tasks.webhook_tasks.traiter_webhooks.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.poster_wave(data).status_code, 200)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.poster_wave(data).status_code, 200)
+
+        self.assertEqual(EvenementWebhook.objects.count(), 1)
+        delay.assert_called_once_with('WAVE', 'WV-1')
+        # Rien n'est appliqué pendant la requête
+        self.paiement.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'EN_ATTENTE')
+
+    def test_signature_invalide_non_enregistree(self):
+        response = self.client.post(
+            reverse('wave_webhook'), data=b'{}', content_type='application/json',
+            HTTP_X_WAVE_SIGNATURE='invalide'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EvenementWebhook.objects.exists())
+
+    def test_traitement_dans_l_ordre_de_reception(self):
+        WebhookService.recevoir('WAVE', {'id': 'evt-1', 'client_reference': 'WV-1', 'status': 'failed'})
+        WebhookService.recevoir('WAVE', {'id': 'evt-2', 'client_reference': 'WV-1', 'status': 'completed'})
+        # Échec tardif d'un paiement déjà réussi : sans effet
+        WebhookService.recevoir('WAVE', {'id': 'evt-3', 'client_reference': 'WV-1', 'status': 'failed'})
+
+        rapport = WebhookService.traiter('WAVE', 'WV-1')
+
+        self.assertEqual(rapport, {'traites': 2, 'ignores': 1, 'rejetes': 0, 'erreurs': 0})
+        self.paiement.refresh_from_db()
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'REUSSI')
+        self.assertEqual(self.reservation.statut, 'confirme')
+        self.assertEqual(
+            dict(EvenementWebhook.objects.values_list('event_id', 'statut')),
+            {'evt-1': 'traite', 'evt-2': 'traite', 'evt-3': 'ignore'}
+        )
+        # Un second passage ne retraite rien
+        self.assertEqual(WebhookService.traiter('WAVE', 'WV-1')['traites'], 0)
+
+    def test_erreur_de_verification_bloque_les_suivantes(self):
+        Paiement.objects.filter(pk=self.paiement.pk).update(methode='ORANGE')
+        WebhookService.recevoir('ORANGE', {'txnid': 'WV-1', 'status': 'PENDING'})
+        WebhookService.recevoir('ORANGE', {'txnid': 'WV-1', 'status': 'SUCCESS'})
+
+        with patch.object(WebhookService, 'verifier_orange', side_effect=requests.ConnectionError('indisponible')) as verifier:
+            rapport = WebhookService.traiter('ORANGE', 'WV-1')
+
+        self.assertEqual(rapport['erreurs'], 1)
+        self.assertEqual(verifier.call_count, 1)
+        premier, second = EvenementWebhook.objects.order_by('id')
+        self.assertEqual((premier.statut, premier.tentatives), ('recu', 1))
+        self.assertEqual((second.statut, second.tentatives), ('recu', 0))
+
+        with patch.object(WebhookService, 'verifier_orange', side_effect=['ECHOUE', 'REUSSI']):
+            WebhookService.traiter('ORANGE', 'WV-1')
+        self.paiement.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'REUSSI')
+
+    def test_reservation_annulee_non_reconfirmee(self):
+        Reservation.objects.filter(pk=self.reservation.pk).update(statut='annule')
+        WebhookService.recevoir('WAVE', {'id': 'evt-1', 'client_reference': 'WV-1', 'status': 'completed'})
+
+        self.assertEqual(WebhookService.traiter('WAVE', 'WV-1')['traites'], 1)
+        self.paiement.refresh_from_db()
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'REUSSI')
+        self.assertEqual(self.reservation.statut, 'annule')
+        self.assertIn('a_rembourser', self.paiement.metadata)
+
+    def test_toute_erreur_compte_dans_les_tentatives(self):
+        WebhookService.recevoir('WAVE', {'id': 'evt-1', 'client_reference': 'WV-1', 'status': 'completed'})
+
+        with patch.object(WebhookService, 'appliquer', side_effect=RuntimeError('erreur')):
+            for _ in range(WebhookService.MAX_TENTATIVES):
+                self.assertEqual(WebhookService.traiter('WAVE', 'WV-1')['erreurs'], 1)
+
+        evenement = EvenementWebhook.objects.get()
+        self.assertEqual((evenement.statut, evenement.tentatives), ('echoue', WebhookService.MAX_TENTATIVES))
+        self.paiement.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'EN_ATTENTE')
+
+    def test_signature_paypal_rejetee(self):
+        WebhookService.recevoir(
+            'PAYPAL',
+            {'id': 'WH-1', 'event_type': 'PAYMENT.CAPTURE.COMPLETED', 'resource': {'custom_id': 'WV-1'}},
+            {'Paypal-Transmission-Sig': 'faux'}
+        )
+        with patch.object(WebhookService, 'verifier_paypal', side_effect=ValueError("Signature PayPal invalide")):
+            rapport = WebhookService.traiter('PAYPAL', 'WV-1')
+
+        self.assertEqual(rapport['rejetes'], 1)
+        self.assertEqual(EvenementWebhook.objects.get().statut, 'rejete')
+        self.paiement.refresh_from_db()
+        self.assertEqual(self.paiement.statut, 'EN_ATTENTE')
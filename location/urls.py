@@ -44,8 +44,7 @@ from location.views.payment_views import (
     paiement_en_attente,
     choisir_methode_paiement,
     paiement_annule,
-    FacturePDFView,
-    orange_notification
+    FacturePDFView
 )
 
 from location.views.policy_views import PolicyAcceptanceView
@@ -63,6 +62,7 @@ from location.views.voiture_views import (
 from location.views.portefeuille_views import (
     demande_retrait,
     historique_transactions,
+    export_transactions_csv,
     valider_transaction
 )
 
@@ -85,14 +85,13 @@ from location.views.reward_views import BadgeListView, RewardListView, ClaimRewa
 from location.views.delivery_views import DeliveryPDFView
 
 # Import des webhooks
-from location.webhooks import (
-    orange_webhook,
-    wave_webhook,
-    paypal_webhook,
-    stripe_webhook
-)
+from location.webhooks.orange_webhook import orange_webhook
+from location.webhooks.wave_webhook import wave_webhook
+from location.webhooks.paypal_webhook import paypal_webhook
+from location.webhooks.stripe_webhook import stripe_webhook
 
 from location.views.messaging_views import send_message, message_success
+from location.api import calendrier_disponibilite, check_disponibilites, listing_cache_stats, provider_http_stats
 
 urlpatterns = [
     # URLs de base et authentification
@@ -113,6 +112,10 @@ urlpatterns = [
     path('voiture/favoris/retirer/<int:pk>/', retirer_favoris, name='retirer_favoris'),
     path('recherche/', RechercheVoitures.as_view(), name='recherche'),
     path('favoris/', liste_favoris, name='liste_favoris'),
+    path('api/cache/listing/', listing_cache_stats, name='listing_cache_stats'),
+    path('api/paiements/fournisseurs/', provider_http_stats, name='provider_http_stats'),
+    path('api/voitures/disponibilites/', check_disponibilites, name='check_disponibilites'),
+    path('api/voiture/<int:pk>/calendrier/', calendrier_disponibilite, name='calendrier_disponibilite'),
    
     # URLs réservations et livraisons
     path('reservation/<int:voiture_id>/', reserver_voiture, name='reserver_voiture'),
@@ -132,7 +135,8 @@ urlpatterns = [
     path('paiement/notification/', notification_paiement, name='notification_paiement'),
     path('paiement/en-attente/', paiement_en_attente, name='paiement_en_attente'),
     path('paiement/choisir-methode/<int:reservation_id>/', choisir_methode_paiement, name='choisir_methode_paiement'),
-    path('orange-money/notification/', orange_notification, name='orange_notification'),
+    # Ancienne notif_url des paiements déjà initiés : même traitement que le webhook
+    path('orange-money/notification/', csrf_exempt(orange_webhook), name='orange_notification'),
     
     # URLs dashboard
     path('dashboard/', include([
@@ -150,6 +154,7 @@ urlpatterns = [
     path('portefeuille/', include([
         path('retrait/', login_required(demande_retrait), name='demande_retrait'),
         path('historique/', login_required(historique_transactions), name='historique_transactions'),
+        path('historique/export.csv', login_required(export_transactions_csv), name='export_transactions_csv'),
         path('transactions/<int:transaction_id>/valider/', valider_transaction, name='valider_transaction'),
     ])),
     
@@ -19,6 +19,7 @@ from django.conf import settings
 from axes.helpers import get_lockout_response
 from django.views.decorators.csrf import csrf_protect 
 from location.forms import ProprietaireSignUpForm, LoueurSignUpForm, ProfilForm, ProprietaireDocumentsForm
+from location.services.price_display_service import PriceDisplayService
 from .dashboard_views import loueur_dashboard, proprietaire_dashboard
 import logging
 
@@ -27,7 +28,7 @@ logger = logging.getLogger(__name__)
 
 @require_http_methods(["GET"])
 def accueil(request):
-    voitures = Voiture.objects.all()
+    voitures = PriceDisplayService.preparer(Voiture.objects.all(), getattr(request, 'currency', None))
     return render(request, 'location/accueil.html', {'voitures': voitures})
 
 @ratelimit(key='ip', rate='5/m', block=True)
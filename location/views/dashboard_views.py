@@ -20,6 +20,7 @@ from django.utils.html import escape
 import json
 from location.models.core_models import Voiture, Reservation, DocumentVerification, Favoris, ProprietaireProfile, DrivingHistory
 from ..services.trust_service import TrustService
+from ..services.reservation_list_service import ReservationListService
 from ..permissions import proprietaire_required, loueur_required
 from location.forms import LoueurPreferencesForm, DrivingLicenseForm
 from .utils import calculate_occupancy_rate, verifier_disponibilite
@@ -90,24 +91,24 @@ def proprietaire_dashboard(request):
         )
 
         # Requêtes optimisées pour les réservations
-        reservations_actives = Reservation.objects.filter(
+        reservations_actives = ReservationListService.avec_dernier_paiement(Reservation.objects.filter(
             voiture__proprietaire=request.user,
             statut='confirme',
             date_debut__lte=today,
             date_fin__gte=today
-        ).select_related('voiture', 'client')
+        ).select_related('voiture', 'client'))
         
-        reservations_futures = Reservation.objects.filter(
+        reservations_futures = ReservationListService.avec_dernier_paiement(Reservation.objects.filter(
             voiture__proprietaire=request.user,
             statut='confirme',
             date_debut__gt=today
-        ).select_related('voiture', 'client')
+        ).select_related('voiture', 'client'))
         
-        reservations_passees = Reservation.objects.filter(
+        reservations_passees = ReservationListService.avec_dernier_paiement(Reservation.objects.filter(
             voiture__proprietaire=request.user,
             statut='confirme',
             date_fin__lt=today
-        ).select_related('voiture', 'client')
+        ).select_related('voiture', 'client'))
         
         # Calcul des revenus du mois
         revenus_mois = Reservation.objects.filter(
@@ -207,13 +208,9 @@ def loueur_dashboard(request):
         profile = request.user.loueur_profile
         
         # Optimisation des requêtes
-        reservations = Reservation.objects.filter(
-            client=request.user
-        ).select_related(
-            'voiture__proprietaire'
-        ).prefetch_related(
+        reservations = ReservationListService.pour_client(request.user).prefetch_related(
             'voiture__photos'
-        ).order_by('-date_creation')
+        )
 
         today = timezone.now().date()
         
@@ -324,9 +321,7 @@ def statistiques_proprietaire(request):
     return render(request, 'location/dashboard/statistiques.html', context)
 
 def liste_reservations(request):
-    reservations = Reservation.objects.filter(
-        voiture__proprietaire=request.user
-    ).select_related('voiture', 'client').order_by('-date_debut')
+    reservations = ReservationListService.pour_proprietaire(request.user).order_by('-date_debut')
 
     context = {
         'reservations': reservations,
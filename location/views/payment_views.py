@@ -19,17 +19,17 @@ from django.db import transaction
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone  
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth import get_user_model
 from xhtml2pdf import pisa
 from io import BytesIO
 import requests
 import time
-import hmac
-import hashlib
 import json
 import stripe
 from location.models.core_models import Reservation, Paiement, Portefeuille, Transaction
+from location.payments.http_client import ProviderClient
+from location.payments.paypal_auth import PaypalTokenManager
 from location.forms import PaiementForm
 
 # Configuration du logger
@@ -142,10 +142,9 @@ def initier_cinetpay(request, reservation):
             "metadata": json.dumps({"reservation_id": reservation.id})
         }
 
-        response = requests.post(
+        response = ProviderClient.pour('CINETPAY').post(
             "https://api.cinetpay.com/v2/payment",
-            json=payload,
-            timeout=10
+            json=payload
         )
         response.raise_for_status()
         
@@ -184,16 +183,15 @@ def initier_orange_money(request, reservation):
                 reverse('paiement_annule')
             ),
             "notif_url": request.build_absolute_uri(
-                reverse('orange_notification')
+                reverse('orange_webhook')
             ),
             "lang": "fr"
         }
 
-        response = requests.post(
+        response = ProviderClient.pour('ORANGE').post(
             settings.ORANGE_MONEY_API_URL,
             json=payload,
-            headers={"Authorization": f"Bearer {settings.ORANGE_MONEY_API_KEY}"},
-            timeout=10
+            headers={"Authorization": f"Bearer {settings.ORANGE_MONEY_API_KEY}"}
         )
         response.raise_for_status()
         
@@ -231,14 +229,13 @@ def initier_wave(request, reservation):
             "cancel_url": request.build_absolute_uri(reverse('paiement_annule')),
         }
 
-        response = requests.post(
+        response = ProviderClient.pour('WAVE').post(
             settings.WAVE_API_URL,
             json=payload,
             headers={
                 "Authorization": f"Bearer {settings.WAVE_API_KEY}",
                 "Content-Type": "application/json"
-            },
-            timeout=10
+            }
         )
         response.raise_for_status()
         
@@ -283,14 +280,11 @@ def initier_paypal(request, reservation):
             }
         }
 
-        response = requests.post(
+        response = PaypalTokenManager.requete(
+            'POST',
             f"{settings.PAYPAL_API_URL}/v1/payments/payment",
             json=payload,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {get_paypal_access_token()}"
-            },
-            timeout=10
+            headers={"Content-Type": "application/json"}
         )
         response.raise_for_status()
         
@@ -423,74 +417,6 @@ def _get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     return x_forwarded_for.split(',')[0] if x_forwarded_for else request.META.get('REMOTE_ADDR')
 
-def get_paypal_access_token():
-    """Obtenir un token d'accès PayPal"""
-    auth = (settings.PAYPAL_CLIENT_ID, settings.PAYPAL_SECRET)
-    data = {'grant_type': 'client_credentials'}
-    response = requests.post(
-        f"{settings.PAYPAL_API_URL}/v1/oauth2/token",
-        data=data,
-        auth=auth,
-        headers={"Accept": "application/json", "Accept-Language": "en_US"}
-    )
-    response.raise_for_status()
-    return response.json()['access_token']
-
-@csrf_exempt
-def orange_notification(request):
-    """Notification Orange Money"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            transaction_id = data['txnid']
-            status = data['status']
-            
-            paiement = Paiement.objects.get(transaction_id=transaction_id)
-            if status == 'SUCCESS':
-                paiement.statut = 'reussi'
-                paiement.reservation.statut = 'confirme'
-            else:
-                paiement.statut = 'echoue'
-            
-            paiement.reponse_api = data
-            paiement.reservation.save()
-            paiement.save()
-            
-            return JsonResponse({'status': 'success'})
-        except Exception as e:
-            logger.error(f"Erreur notification Orange: {str(e)}")
-            return JsonResponse({'status': 'error'}, status=400)
-
-@csrf_exempt
-def stripe_webhook(request):
-    """Webhook Stripe"""
-    payload = request.body
-    sig_header = request.META['HTTP_STRIPE_SIGNATURE']
-    event = None
-
-    try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
-        )
-    except ValueError as e:
-        return HttpResponseBadRequest()
-    except stripe.error.SignatureVerificationError as e:
-        return HttpResponseBadRequest()
-
-    if event['type'] == 'charge.succeeded':
-        charge = event['data']['object']
-        try:
-            paiement = Paiement.objects.get(transaction_id=charge['id'])
-            paiement.statut = 'reussi'
-            paiement.reservation.statut = 'confirme'
-            paiement.reponse_api = charge
-            paiement.reservation.save()
-            paiement.save()
-        except Paiement.DoesNotExist:
-            logger.error(f"Paiement Stripe non trouvé: {charge['id']}")
-
-    return HttpResponse(status=200)
-
 @csrf_exempt
 def notification_paiement(request):
     """Notification CinetPay"""
@@ -512,10 +438,10 @@ def notification_paiement(request):
             }
             
             try:
-                response = requests.post(
+                response = ProviderClient.pour('CINETPAY').post(
                     verification_url,
                     json=payload,
-                    timeout=settings.REQUEST_TIMEOUT  # ← Utilisation de la constante
+                    idempotent=True
                 )
                 response.raise_for_status()
             except requests.exceptions.RequestException as e:
@@ -815,13 +741,11 @@ def paypal_execute(request):
             # Exécution du paiement
             url = f"{settings.PAYPAL_API_URL}/v1/payments/payment/{payment_id}/execute"
             payload = {"payer_id": payer_id}
-            response = requests.post(
+            response = PaypalTokenManager.requete(
+                'POST',
                 url,
                 json=payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {get_paypal_access_token()}"
-                }
+                headers={"Content-Type": "application/json"}
             )
             response.raise_for_status()
             
@@ -855,111 +779,6 @@ def paiement_annule(request):
     messages.warning(request, "Paiement annulé")
     return redirect('accueil')
     
-@csrf_exempt
-def paypal_webhook(request):
-    """Gestion des notifications PayPal"""
-    if request.method == 'POST':
-        try:
-            # Vérification de la signature PayPal
-            auth_token = get_paypal_auth_token()
-            transmission_id = request.headers.get('Paypal-Transmission-Id')
-            cert_url = request.headers.get('Paypal-Cert-Url')
-            signature = request.headers.get('Paypal-Transmission-Sig')
-            timestamp = request.headers.get('Paypal-Transmission-Time')
-            
-            verify_data = {
-                "auth_algo": "SHA256withRSA",
-                "cert_url": cert_url,
-                "transmission_id": transmission_id,
-                "transmission_sig": signature,
-                "transmission_time": timestamp,
-                "webhook_id": settings.PAYPAL_WEBHOOK_ID,
-                "webhook_event": request.json()
-            }
-            
-            response = requests.post(
-                f"{settings.PAYPAL_API_URL}/v1/notifications/verify-webhook-signature",
-                json=verify_data,
-                headers={"Authorization": f"Bearer {auth_token}"},
-                timeout=5
-            )
-            response.raise_for_status()
-            
-            if response.json().get('verification_status') != 'SUCCESS':
-                raise ValueError("Signature PayPal invalide")
-            
-            data = request.json()
-            event_type = data.get('event_type')
-            
-            if event_type == 'PAYMENT.CAPTURE.COMPLETED':
-                transaction_id = data.get('resource', {}).get('custom_id')
-                if transaction_id:
-                    payment = Paiement.objects.get(transaction_id=transaction_id)
-                    payment.statut = 'REUSSI'
-                    payment.reponse_api = data
-                    payment.save()
-                    
-                    # Mettre à jour la réservation
-                    payment.reservation.statut = 'CONFIRME'
-                    payment.reservation.save()
-            
-            return JsonResponse({'status': 'success'})
-            
-        except Exception as e:
-            logger.error(f"Erreur webhook PayPal: {str(e)}")
-            return JsonResponse({'status': 'error'}, status=400)
-    
-    return JsonResponse({'status': 'method not allowed'}, status=405)
-
-def get_paypal_auth_token():
-    """Obtient un token d'accès PayPal"""
-    response = requests.post(
-        f"{settings.PAYPAL_API_URL}/v1/oauth2/token",
-        auth=(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_SECRET),
-        data={'grant_type': 'client_credentials'},
-        headers={'Accept': 'application/json'}
-    )
-    response.raise_for_status()
-    return response.json().get('access_token')
-    
-@csrf_exempt
-def wave_webhook(request):
-    """Gestion des notifications Wave"""
-    if request.method == 'POST':
-        try:
-            # Vérification de la signature Wave
-            secret = settings.WAVE_WEBHOOK_SECRET.encode()
-            signature = request.headers.get('X-Wave-Signature')
-            body = request.body
-            
-            # Calcul de la signature HMAC
-            digest = hmac.new(secret, body, hashlib.sha256).hexdigest()
-            
-            if not hmac.compare_digest(digest, signature):
-                raise ValueError("Signature Wave invalide")
-            
-            data = json.loads(body)
-            transaction_id = data.get('client_reference')
-            status = data.get('status')
-            
-            if status == 'completed' and transaction_id:
-                payment = Paiement.objects.get(transaction_id=transaction_id)
-                payment.statut = 'REUSSI'
-                payment.reponse_api = data
-                payment.save()
-                
-                # Mettre à jour la réservation
-                payment.reservation.statut = 'CONFIRME'
-                payment.reservation.save()
-            
-            return JsonResponse({'status': 'success'})
-            
-        except Exception as e:
-            logger.error(f"Erreur webhook Wave: {str(e)}")
-            return JsonResponse({'status': 'error'}, status=400)
-    
-    return JsonResponse({'status': 'method not allowed'}, status=405)
-    
 @login_required
 def webhook_paiement(request, methode):
     """
@@ -1,14 +1,14 @@
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.contrib.auth.decorators import login_required, permission_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone 
 from location.forms import DemandeRetraitForm, ValidationTransactionForm
 from django.contrib import messages
 from location.models.core_models import Transaction
+from location.services.wallet_service import WalletService, SoldeInsuffisant
+from location.services.wallet_history_service import WalletHistoryService
+from location.pagination import InvalidCursor
 from ..forms import ValidationTransactionForm
-from django.http import Http404
-from django.core.mail import send_mail
-from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
 
 @login_required
 def demande_retrait(request):
@@ -20,11 +20,16 @@ def demande_retrait(request):
             montant = form.cleaned_data['montant']
             Transaction.objects.create(
                 portefeuille=portefeuille,
+                user=request.user,
                 montant=-montant,  # Montant négatif pour un retrait
                 type_transaction='retrait',
                 statut='en_attente',
+                payment_method=form.cleaned_data['methode'],
+                metadata={'telephone': form.cleaned_data['telephone']},
                 reference=f'WDR-{request.user.id}-{timezone.now().timestamp()}'
             )
+            # Versée par le prochain lot (PayoutService, tâche virements.executer)
+            messages.success(request, "Demande de retrait enregistrée")
             return redirect('historique_transactions')
     else:
         form = DemandeRetraitForm(user=request.user)
@@ -37,46 +42,25 @@ def demande_retrait(request):
 @login_required
 def historique_transactions(request):
     portefeuille = request.user.portefeuille
-    transactions = portefeuille.transactions.all().order_by('-date')
-    
-    # Pagination
-    paginator = Paginator(transactions, 10)  # 10 transactions par page
-    page_number = request.GET.get('page')
-    
     try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+        page_obj = WalletHistoryService.page(portefeuille, request.GET.get('curseur'))
+    except InvalidCursor:
+        raise Http404("Curseur de pagination invalide")
     
     return render(request, 'location/portefeuille/historique.html', {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'portefeuille': portefeuille
     })
-    
+
 @login_required
-def traiter_retrait(request, transaction_id):
-    if not request.user.is_superuser:
-        raise PermissionDenied
-    
-    transaction = get_object_or_404(Transaction, id=transaction_id, type_transaction='retrait')
-    
-    if request.method == 'POST':
-        # Appel API bancaire ou service de paiement
-        if paiement_reussi := process_paiement_om(transaction):
-            transaction.statut = 'complete'
-            transaction.save()
-            
-            # Notification
-            send_mail(
-                "Retrait effectué",
-                f"Votre retrait de {abs(transaction.montant)} XOF a été traité.",
-                settings.DEFAULT_FROM_EMAIL,
-                [transaction.portefeuille.proprietaire.email]
-            )
-            return redirect('admin:location_transaction_changelist')
-    
-    return render(request, 'admin/traiter_retrait.html', {'transaction': transaction})
+def export_transactions_csv(request):
+    """Historique complet en CSV, envoyé en flux"""
+    response = StreamingHttpResponse(
+        WalletHistoryService.export_csv(request.user.portefeuille),
+        content_type='text/csv; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="transactions-{timezone.localdate():%Y%m%d}.csv"'
+    return response
     
 @login_required
 @permission_required('location.valider_transaction', raise_exception=True)
@@ -89,33 +73,21 @@ def valider_transaction(request, transaction_id):
             action = form.cleaned_data['action']
             
             try:
-                with transaction.atomic():
-                    if action == 'valider':
-                        if transaction.type_transaction == 'retrait':
-                            if transaction.portefeuille.solde >= abs(transaction.montant):
-                                transaction.portefeuille.solde += transaction.montant  # montant est négatif pour les retraits
-                                transaction.portefeuille.save()
-                                transaction.statut = 'valide'
-                                messages.success(request, "Retrait validé avec succès")
-                            else:
-                                messages.error(request, "Solde insuffisant pour ce retrait")
-                                return redirect('historique_transactions')
-                        else:
-                            transaction.statut = 'valide'
-                            messages.success(request, "Transaction validée avec succès")
-                    
-                    elif action == 'rejeter':
-                        transaction.statut = 'rejete'
-                        transaction.motif_rejet = form.cleaned_data['motif_rejet']
-                        messages.warning(request, "Transaction rejetée")
-                    
-                    transaction.traite_par = request.user
-                    transaction.date_traitement = timezone.now()
-                    transaction.save()
-                    
-                    return redirect('historique_transactions')
-            except Exception as e:
-                messages.error(request, f"Une erreur est survenue: {str(e)}")
+                if action == 'valider' and transaction.type_transaction == 'retrait':
+                    # Débit et versement du retrait : PayoutService, jamais à la main
+                    messages.error(request, "Un retrait est versé automatiquement et ne peut pas être validé manuellement")
+                elif action == 'valider':
+                    WalletService.appliquer(transaction, request.user)
+                    messages.success(request, "Transaction validée avec succès")
+                elif action == 'rejeter':
+                    WalletService.rejeter(transaction, request.user, form.cleaned_data['motif_rejet'])
+                    messages.warning(request, "Transaction rejetée")
+                return redirect('historique_transactions')
+            except SoldeInsuffisant:
+                messages.error(request, "Solde insuffisant pour ce retrait")
+                return redirect('historique_transactions')
+            except ValueError as e:
+                messages.error(request, str(e))
     else:
         form = ValidationTransactionForm()
     
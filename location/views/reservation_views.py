@@ -16,6 +16,8 @@ import tempfile
 from location.models import Voiture, Reservation, Favoris, LoyaltyProfile 
 from location.models.loyalty_models import LoyaltyProfile
 from location.forms import ReservationForm
+from location.services.booking_service import BookingService, DatesIndisponibles
+from location.services.reservation_list_service import ReservationListService
 
 logger = logging.getLogger(__name__)
 
@@ -79,51 +81,37 @@ def reserver_voiture(request, voiture_id):
                 messages.error(request, "Dates indisponibles")
                 return redirect('reserver_voiture', voiture_id=voiture_id)
 
-            # 5. Création transactionnelle
+            # 5. Création transactionnelle (verrou sur la voiture + contrainte d'exclusion)
             try:
-                with transaction.atomic():
-                    reservation = form.save(commit=False)
-                    reservation.voiture = voiture
-                    reservation.client = request.user
-            
-                    # Calcul des montants
-                    nb_jours = (date_fin - date_debut).days
-                    montant_base = voiture.prix_jour * nb_jours
-                    montant_chauffeur = voiture.prix_chauffeur * nb_jours if avec_chauffeur else 0
-                    frais_service = round(Decimal((montant_base + montant_chauffeur) * Decimal('0.10')))
-                    
-                    # Gestion caution
-                    caution = voiture.caution_amount if voiture.caution_required else 0
-                    
-                    # Assignation des valeurs
-                    reservation.montant_paye = montant_base + montant_chauffeur
-                    reservation.frais_service = frais_service
-                    reservation.montant_total = montant_base + montant_chauffeur + frais_service + caution
-                    reservation.caution_paid = caution
-                    reservation.caution_status = 'pending' if caution > 0 else 'not_required'
-                    reservation.statut = 'attente_paiement'
-                    reservation.avec_chauffeur = avec_chauffeur
-            
-                    reservation.save()
-                    
-                    # 6. Message de confirmation adapté
-                    msg = f"""
-                    Réservation enregistrée! 
-                    - Total: {reservation.montant_total:,} XOF
-                    - Dont {frais_service:,} XOF de frais
-                    """
-                    if caution > 0:
-                        msg += f"\n- Caution: {caution:,} XOF"
-                    if avec_chauffeur:
-                        msg += f"\n- Chauffeur: {montant_chauffeur:,} XOF"
-                    
-                    messages.success(request, msg)
-                    return redirect('initier_paiement', reservation_id=reservation.id)
-                    
+                reservation, devis = BookingService.reserver(
+                    voiture, request.user, date_debut, date_fin,
+                    avec_chauffeur=avec_chauffeur,
+                    reservation=form.save(commit=False)
+                )
+            except DatesIndisponibles:
+                logger.info(f"Dates déjà prises - Voiture:{voiture_id}, User:{request.user.id}")
+                messages.error(request, "Ces dates viennent d'être réservées. Veuillez choisir une autre période.")
+                return redirect('reserver_voiture', voiture_id=voiture_id)
             except Exception as e:
                 logger.critical(f"Erreur création réservation: {str(e)}", exc_info=True)
                 messages.error(request, "Erreur technique - Contactez le support")
                 return redirect('voiture_detail', pk=voiture_id)
+
+            # 6. Message de confirmation adapté
+            frais_service = devis['frais']
+            caution = reservation.caution_paid
+            msg = f"""
+            Réservation enregistrée! 
+            - Total: {reservation.montant_total:,} XOF
+            - Dont {frais_service:,} XOF de frais
+            """
+            if caution > 0:
+                msg += f"\n- Caution: {caution:,} XOF"
+            if avec_chauffeur:
+                msg += f"\n- Chauffeur: {devis['chauffeur']:,} XOF"
+            
+            messages.success(request, msg)
+            return redirect('initier_paiement', reservation_id=reservation.id)
         else:
             messages.error(request, "Formulaire invalide")
             logger.warning(f"Erreurs formulaire: {form.errors}")
@@ -195,14 +183,10 @@ def mes_reservations(request):
     """
     Affiche les réservations de l'utilisateur avec filtrage par statut
     """
-    reservations = Reservation.objects.filter(
-        client=request.user,
-        statut__in=['confirme', 'attente_paiement', 'termine']
-    ).select_related('voiture', 'voiture__proprietaire').order_by('-date_creation')
-    
-    # Ajout du dernier paiement pour chaque réservation
-    for reservation in reservations:
-        reservation.dernier_paiement = reservation.paiements.order_by('-date_creation').first()
+    # Dernier paiement joint dans la même requête (reservation.dernier_paiement)
+    reservations = ReservationListService.pour_client(
+        request.user, statuts=['confirme', 'attente_paiement', 'termine']
+    )
     
     context = {
         'reservations': reservations,
@@ -215,9 +199,7 @@ def mes_reservations(request):
 @login_required
 def reservations_proprietaire(request):
     """Affiche les réservations des voitures du propriétaire"""
-    reservations = Reservation.objects.filter(
-        voiture__proprietaire=request.user
-    ).select_related('client', 'voiture').order_by('-date_creation')
+    reservations = ReservationListService.pour_proprietaire(request.user)
     
     context = {
         'reservations': reservations,
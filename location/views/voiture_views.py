@@ -4,16 +4,26 @@ from django.views.generic import ListView, DetailView, UpdateView, CreateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.files.storage import default_storage
 from django.core.exceptions import SuspiciousFileOperation
-from django.db.models import Avg, Q
+from django.core.paginator import Page
+from django.db.models import Q
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.urls import reverse
 from location.models.core_models import Voiture, Favoris
 from location.forms import VoitureForm, AdvancedSearchForm
+from location.pagination import KeysetPaginator, InvalidCursor
+from location.services.availability_service import AvailabilityService
+from location.services.geo_service import GeoService
+from location.services.quote_service import QuoteService
+from location.services.search_service import VoitureSearchService
+from location.services.voiture_detail_service import VoitureDetailService
+from location.services.listing_cache_service import ListingCacheService
+from location.services.price_display_service import PriceDisplayService
 from django.contrib.auth.decorators import login_required
 
 
@@ -30,16 +40,81 @@ class VoitureCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         form.instance.proprietaire = self.request.user
         return super().form_valid(form)
         
-class ListeVoitures(ListView):
+class CachedListingMixin:
+    """
+    Met en cache les IDs et le total de chaque page de résultats.
+    La clé dépend des filtres normalisés et de la génération courante
+    (voir ListingCacheService), ce qui évite la requête filtrée et le COUNT.
+    En cas de succès, la page est relue par clé primaire depuis le queryset
+    de la vue : les annotations (distance, pertinence, rang_total) sont
+    conservées.
+    """
+    listing_cache_name = None
+
+    def paginate_queryset(self, queryset, page_size):
+        cache_key = ListingCacheService.make_key(self.listing_cache_name, self.request.GET)
+        entry = ListingCacheService.get(cache_key)
+        
+        if entry is not None:
+            paginator = self.get_paginator(
+                queryset, page_size,
+                orphans=self.get_paginate_orphans(),
+                allow_empty_first_page=self.get_allow_empty()
+            )
+            paginator.__dict__['count'] = entry['count']  # Évite le COUNT
+            voitures = {v.pk: v for v in queryset.filter(pk__in=entry['ids']).order_by()}
+            page = Page([voitures[pk] for pk in entry['ids'] if pk in voitures], entry['number'], paginator)
+            return (paginator, page, page.object_list, page.has_other_pages())
+        
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        ListingCacheService.set(cache_key, [v.pk for v in object_list], paginator.count, page.number)
+        return (paginator, page, object_list, is_paginated)
+
+class KeysetPaginationMixin:
+    """
+    Mode de pagination par curseur, activé par le paramètre ?cursor=
+    (vide pour la première page). Pas d'OFFSET ni de COUNT exact sur les
+    gros résultats : utilisé par l'application mobile et les robots.
+    """
+    cursor_kwarg = 'cursor'
+    keyset_page = None
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        
+        ordering = KeysetPaginator.with_tiebreaker(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        paginator = KeysetPaginator(queryset, ordering, page_size)
+        try:
+            self.keyset_page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Curseur de pagination invalide")
+        return (None, None, self.keyset_page.object_list, False)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['keyset_page'] = self.keyset_page
+        if self.keyset_page is not None:
+            params = self.request.GET.copy()
+            params.pop(self.cursor_kwarg, None)
+            params.pop(self.page_kwarg, None)
+            context['cursor_querystring'] = params.urlencode()
+        return context
+
+class ListeVoitures(KeysetPaginationMixin, CachedListingMixin, ListView):
     model = Voiture
     template_name = 'location/voitures/list.html'
     context_object_name = 'voitures'
     paginate_by = 10
     ordering = ['-date_creation']
+    listing_cache_name = 'liste'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['dashboard_url'] = reverse('location:loueur_dashboard')
+        PriceDisplayService.preparer(context['object_list'], getattr(self.request, 'currency', None))
         return context
 
     def get_queryset(self):
@@ -57,39 +132,39 @@ class VoitureDetail(DetailView):
     template_name = 'location/voiture_detail.html'
     context_object_name = 'voiture'
 
+    def get_queryset(self):
+        return VoitureDetailService.queryset(self.request.user)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         voiture = self.object
         user = self.request.user
         
-        # Disponibilité (utilise les nouvelles méthodes du modèle)
-        context['disponible'] = voiture.est_disponible
+        # Disponibilité (annotations calculées avec la voiture, voir VoitureDetailService)
+        context['disponible'] = VoitureDetailService.est_disponible(voiture)
         context['disponibilite_message'] = self.get_disponibilite_message(voiture)
         
         # Informations utilisateur
         context['user_connected'] = user.is_authenticated
         context['is_loueur'] = user.is_authenticated and user.user_type == 'LOUEUR'
-        context['is_proprietaire'] = user.is_authenticated and user == voiture.proprietaire
+        context['is_proprietaire'] = user.is_authenticated and user.pk == voiture.proprietaire_id
         context['user_is_verified'] = user.is_verified if user.is_authenticated else False
         
-        # Favoris
-        if user.is_authenticated:
-            context['in_favoris'] = Favoris.objects.filter(
-                utilisateur=user,
-                voiture=voiture
-            ).exists()
+        # Favoris et droit d'évaluer (annotations)
+        context['in_favoris'] = voiture.in_favoris
+        context['peut_evaluer'] = voiture.peut_evaluer
         
         # Dates par défaut pour la réservation (demain -> après-demain)
         today = timezone.now().date()
         context['default_start_date'] = (today + timedelta(days=1)).strftime('%Y-%m-%d')
         context['default_end_date'] = (today + timedelta(days=2)).strftime('%Y-%m-%d')
         
-        # Évaluations
-        context['evaluations'] = voiture.evaluations.all().order_by('-date_creation')[:5]
-        context['note_moyenne'] = voiture.evaluations.aggregate(Avg('note'))['note__avg']
-        
-        # Photos supplémentaires
-        context['photos'] = voiture.photos.all()
+        # Évaluations récentes et photos (cache par voiture)
+        contenu = VoitureDetailService.contenu_partage(voiture)
+        context['evaluations'] = contenu['evaluations']
+        context['note_moyenne'] = voiture.note_moyenne  # Agrégat dénormalisé (RatingService)
+        context['histogramme_notes'] = voiture.histogramme_notes
+        context['photos'] = contenu['photos']
         
         return context
 
@@ -98,7 +173,7 @@ class VoitureDetail(DetailView):
         if not voiture.disponible:
             return "Ce véhicule est actuellement indisponible"
             
-        if not voiture.est_disponible:
+        if not VoitureDetailService.est_disponible(voiture):
             next_available = self.get_next_available_date(voiture)
             return f"Disponible à partir du {next_available.strftime('%d/%m/%Y')}" if next_available else "Actuellement en location"
             
@@ -106,13 +181,7 @@ class VoitureDetail(DetailView):
 
     def get_next_available_date(self, voiture):
         """Trouve la prochaine date de disponibilité si la voiture est actuellement occupée"""
-        today = timezone.now().date()
-        next_reservation = voiture.reservations.filter(
-            date_fin__gte=today,
-            statut='confirme'
-        ).order_by('date_fin').first()
-        
-        return next_reservation.date_fin + timedelta(days=1) if next_reservation else None
+        return VoitureDetailService.prochaine_date_disponible(voiture)
 
 @login_required
 def ajouter_voiture(request):
@@ -188,20 +257,22 @@ class ModifierVoiture(UpdateView):
             form.add_error('photo', "Erreur de chemin de fichier")
             return self.form_invalid(form)
         
-class RechercheVoitures(ListView):
+class RechercheVoitures(KeysetPaginationMixin, CachedListingMixin, ListView):
     model = Voiture
     template_name = 'location/recherche.html'
     context_object_name = 'voitures'
     paginate_by = 10
+    listing_cache_name = 'recherche'
+    rayon_defaut_km = 10
+    periode = None
+    devis = None
 
     def get_queryset(self):
         queryset = super().get_queryset().filter(disponible=True)
         form = AdvancedSearchForm(self.request.GET or None)
         
-        # Filtre par ville
-        ville = self.request.GET.get('ville')
-        if ville:
-            queryset = queryset.filter(ville__icontains=ville)
+        # Filtre géographique : point + rayon, ou ville résolue via le gazetteer
+        queryset, par_distance = self.filtrer_localisation(queryset)
 
         # Filtres avancés
         if form.is_valid():
@@ -225,35 +296,78 @@ class RechercheVoitures(ListView):
                 date_debut = datetime.strptime(date_debut, '%Y-%m-%d').date()
                 date_fin = datetime.strptime(date_fin, '%Y-%m-%d').date()
                 
-                # Exclusion des voitures avec réservations en conflit
-                queryset = queryset.exclude(
-                    reservations__date_debut__lt=date_fin,
-                    reservations__date_fin__gt=date_debut,
-                    reservations__statut='confirme'
-                )
+                # Exclusion des voitures avec réservations en conflit (index GiST)
+                queryset = AvailabilityService.filtrer_disponibles(queryset, date_debut, date_fin)
+                if date_fin > date_debut:
+                    self.periode = (date_debut, date_fin)
             except ValueError:
                 pass
         
-        # Filtre par texte
+        # Filtre par texte (plein texte + trigrammes, trié par pertinence)
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(marque__icontains=query) | 
-                Q(modele__icontains=query) |
-                Q(description__icontains=query)
-            )
+            queryset = VoitureSearchService.rechercher(queryset, query)
+        elif par_distance:
+            queryset = queryset.order_by('distance', 'prix_jour')
+        else:
+            queryset = queryset.order_by('prix_jour')
         
-        return queryset.order_by('prix_jour')
+        # Tri par total du séjour (devis NumPy sur tout le résultat)
+        if self.request.GET.get('tri') == 'prix_total' and self.periode:
+            queryset, self.devis = QuoteService.trier_par_total(
+                queryset, *self.periode, avec_chauffeur=self.avec_chauffeur
+            )
+        return queryset
+
+    @property
+    def avec_chauffeur(self):
+        return bool(self.request.GET.get('avec_chauffeur'))
+
+    def filtrer_localisation(self, queryset):
+        """Retourne (queryset, trié_par_distance)"""
+        params = self.request.GET
+        try:
+            rayon = float(params['rayon']) if params.get('rayon') else None
+            if params.get('lat') and params.get('lon'):
+                lat, lon = float(params['lat']), float(params['lon'])
+                if -90 <= lat <= 90 and -180 <= lon <= 180:
+                    return GeoService.filtrer_rayon(queryset, lat, lon, rayon or self.rayon_defaut_km), True
+        except ValueError:
+            rayon = None
+
+        ville = params.get('ville')
+        if ville:
+            filtre = GeoService.filtrer_ville(queryset, ville, rayon)
+            if filtre is not None:
+                return filtre, True
+            # Ville absente du gazetteer : ancienne recherche textuelle
+            return queryset.filter(ville__icontains=ville), False
+        return queryset, False
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        # Total du séjour sur chaque carte quand une période est demandée
+        voitures = list(context['object_list'])
+        if self.periode:
+            devis = self.devis or QuoteService.devis_voitures(
+                voitures, *self.periode, avec_chauffeur=self.avec_chauffeur
+            )
+            for voiture in voitures:
+                voiture.total_sejour = devis.get(voiture.pk)
+
+        # Prix et totaux de la page dans la devise du visiteur, en un passage
+        PriceDisplayService.preparer(voitures, getattr(self.request, 'currency', None))
+        
         # Formulaire de recherche avancée
         context['search_form'] = AdvancedSearchForm(self.request.GET or None)
         
         # Paramètres de recherche
         context.update({
             'ville': self.request.GET.get('ville', ''),
+            'lat': self.request.GET.get('lat', ''),
+            'lon': self.request.GET.get('lon', ''),
+            'rayon': self.request.GET.get('rayon', ''),
             'date_debut': self.request.GET.get('date_debut', ''),
             'date_fin': self.request.GET.get('date_fin', ''),
             'query': self.request.GET.get('q', ''),
@@ -261,7 +375,9 @@ class RechercheVoitures(ListView):
             'prix_max': self.request.GET.get('prix_max', ''),
             'transmission': self.request.GET.get('transmission', ''),
             'climatisation': self.request.GET.get('climatisation', ''),
-            'type_vehicule': self.request.GET.get('type_vehicule', '')
+            'type_vehicule': self.request.GET.get('type_vehicule', ''),
+            'tri': self.request.GET.get('tri', ''),
+            'avec_chauffeur': self.request.GET.get('avec_chauffeur', '')
         })
         
         return context
@@ -12,6 +12,7 @@ from django.utils.http import http_date
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 from decouple import config, Csv
+from celery.schedules import crontab
 
 
 
@@ -119,6 +120,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     
     # Third-party
     'corsheaders',
@@ -150,6 +152,7 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     #'moncaisson.waf_scoring.IPScoringMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'location.middelware.currency.CurrencyMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     #'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -278,12 +281,43 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_TASK_SOFT_TIME_LIMIT = 20 * 60  # 20 minutes
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'expirer-reservations-attente': {
+        'task': 'reservation.expirer_attentes',
+        'schedule': 5 * 60,  # toutes les 5 minutes
+    },
+    'terminer-locations': {
+        'task': 'reservation.terminer_locations',
+        'schedule': crontab(hour=2, minute=0),  # chaque nuit
+    },
+    'relancer-webhooks': {
+        'task': 'webhooks.relancer',
+        'schedule': 60,  # notifications non traitées depuis plus d'une minute
+    },
+    'rafraichir-taux-devises': {
+        'task': 'devises.rafraichir_taux',
+        'schedule': 30 * 60,  # toutes les 30 minutes
+    },
+    'controler-soldes-portefeuilles': {
+        'task': 'portefeuilles.controler_soldes',
+        'schedule': 60 * 60,  # toutes les heures
+    },
+    'executer-virements': {
+        'task': 'virements.executer',
+        'schedule': 10 * 60,  # toutes les 10 minutes
+    },
+}
+# Limite par défaut, appliquée aux tâches qui n'en déclarent pas. Pas dans
+# CELERY_TASK_ANNOTATIONS['*'] : '*' s'applique après les annotations par tâche
+# et les écraserait
+CELERY_TASK_DEFAULT_RATE_LIMIT = '10/m'
 CELERY_TASK_ANNOTATIONS = {
     '*': {
-        'rate_limit': '10/m',
         'max_retries': 3,
         'default_retry_delay': 60,
-    }
+    },
+    # Une tâche par paiement notifié : pas de limite, une rafale est traitée au fil de l'eau
+    'webhooks.traiter': {'rate_limit': None},
 }
 
 # 11. REST FRAMEWORK =========================================================